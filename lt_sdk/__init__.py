@@ -1,18 +1,5 @@
-# TODO Add functions from API here
-from lt_sdk.api.api import (
-    export_graph,
-    import_graph,
-    run_full_pipeline,
-    run_full_simulation,
-    run_functional_simulation,
-    run_graph_pipeline,
-    run_performance_simulation,
-    transform_graph,
-)
-from lt_sdk.config.light_config import LightConfig, get_default_config
-from lt_sdk.graph import run_full_graph_pipeline
-from lt_sdk.inference import lt_inference_server
-from lt_sdk.visuals import plot_lgf_graph
+import importlib
+import sys
 
 __all__ = [
     "import_graph",
@@ -27,6 +14,64 @@ __all__ = [
     "LightConfig"
 ]
 
-run_full_graph_pipeline_sh = run_full_graph_pipeline.main
-lt_inference_server_sh = lt_inference_server.main
-plot_lgf_graph_sh = plot_lgf_graph.main
+# Maps names of this package to (module, attribute). Modules are only imported
+# the first time one of their names is used, so import lt_sdk does not load
+# tensorflow, grpc, plotly or the native libraries
+_LAZY_ATTRS = {
+    "export_graph": ("lt_sdk.api.api", "export_graph"),
+    "import_graph": ("lt_sdk.api.api", "import_graph"),
+    "run_full_pipeline": ("lt_sdk.api.api", "run_full_pipeline"),
+    "run_full_simulation": ("lt_sdk.api.api", "run_full_simulation"),
+    "run_functional_simulation": ("lt_sdk.api.api", "run_functional_simulation"),
+    "run_graph_pipeline": ("lt_sdk.api.api", "run_graph_pipeline"),
+    "run_performance_simulation": ("lt_sdk.api.api", "run_performance_simulation"),
+    "transform_graph": ("lt_sdk.api.api", "transform_graph"),
+    "LightConfig": ("lt_sdk.config.light_config", "LightConfig"),
+    "get_default_config": ("lt_sdk.config.light_config", "get_default_config"),
+    "run_full_graph_pipeline_sh": ("lt_sdk.graph.run_full_graph_pipeline", "main"),
+    "lt_inference_server_sh": ("lt_sdk.inference.lt_inference_server", "main"),
+    "plot_lgf_graph_sh": ("lt_sdk.visuals.plot_lgf_graph", "main"),
+}
+
+_SUBPACKAGES = {
+    "analysis",
+    "api",
+    "benchmarks",
+    "common",
+    "config",
+    "data",
+    "funcsim",
+    "graph",
+    "inference",
+    "perfsim",
+    "proto",
+    "runtime",
+    "verification",
+    "visuals",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        module_name, attr = _LAZY_ATTRS[name]
+        value = getattr(importlib.import_module(module_name), attr)
+    elif name in _SUBPACKAGES:
+        value = importlib.import_module("{0}.{1}".format(__name__, name))
+    else:
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(
+            __name__,
+            name))
+
+    # Later lookups find the name without calling __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()).union(_LAZY_ATTRS, _SUBPACKAGES))
+
+
+# Module __getattr__ (PEP 562) needs python 3.7, import the names eagerly before that
+if sys.version_info < (3, 7):
+    for _name in _LAZY_ATTRS:
+        __getattr__(_name)
@@ -1,10 +1,12 @@
 import argparse
+import json
 import logging
 import os
+from concurrent import futures
 
 import numpy as np
 
-from lt_sdk.common import py_graph_test_util, py_test_util
+from lt_sdk.common import py_test_util
 from lt_sdk.graph import full_graph_pipeline, lgf_graph
 from lt_sdk.graph.run_graph import graph_runner
 from lt_sdk.graph.transform_graph import utils
@@ -38,10 +40,17 @@ def _get_opu_layer_graph(lgf, cal_data, max_nodes=32, opu_only=False):
     for output_edge in lgf.output_edges():
         output_node = lgf.get_node_by_name(output_edge.name)
         if node_filter.matches(output_node, lgf):
-            ordered = list(lgf.bfs(output_node, node_filter=node_filter))
+            ancestors = {
+                node.name for node in lgf.bfs(output_node,
+                                              node_filter=node_filter)
+            }
             break
 
-    ordered.reverse()
+    ordered = [
+        lgf.get_node_by_name(node_name)
+        for node_name in lgf.topological_order()
+        if node_name in ancestors
+    ]
     opu_edges = []
 
     for i, node_obj in enumerate(ordered):
@@ -56,13 +65,12 @@ def _get_opu_layer_graph(lgf, cal_data, max_nodes=32, opu_only=False):
     return opu_edges
 
 
-def _get_outputs(perf_sweep, runner, sw_config):
-    shard_outs = []
+def _iter_outputs(perf_sweep, runners, sw_config):
+    """Yields the outputs of each runner for one test data shard at a time"""
     for shard_indx in range(perf_sweep.num_test_shards()):
         logging.info("-Running inference on test data shard {}".format(shard_indx))
         test_inputs = perf_sweep.get_test_inputs(sw_config, shard_indx)
-        shard_outs.append(runner.run(test_inputs))
-    return shard_outs
+        yield [runner.run(test_inputs) for runner in runners]
 
 
 class BNOffsetTransform(electronic_op_transform.ElectronicOpTransform):
@@ -87,13 +95,145 @@ class BNOffsetTransform(electronic_op_transform.ElectronicOpTransform):
         return self.create_transform_result(to_replace=[offset_node])
 
 
-def collect_data_dict(data_d, shard_outs):
-    for batch in shard_outs.batches:
-        for named_tensor in batch.results:
-            data_d.setdefault(named_tensor.edge_info.name,
-                              []).append(
-                                  utils.tensor_pb_to_array(named_tensor.data,
-                                                           np.float32))
+class LayerErrorStats(object):
+    """
+    Error statistics of the measured outputs of a layer compared to the expected
+    outputs. The statistics are updated one batch at a time with Welford style
+    running means, so memory does not depend on the number of batches
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.max_abs_error = 0.0
+
+        # Running means over all elements
+        self._mean_sq_error = 0.0
+        self._mean_abs_error = 0.0
+        self._mean_abs_expected = 0.0
+        self._mean_product = 0.0
+        self._mean_sq_expected = 0.0
+        self._mean_sq_measured = 0.0
+
+        # Running per channel means over the last axis
+        self.num_rows = 0
+        self.expected_channel_mean = 0.0
+        self.measured_channel_mean = 0.0
+
+    @staticmethod
+    def _update_mean(mean, batch_mean, weight):
+        return mean + weight * (batch_mean - mean)
+
+    def update(self, expected, measured):
+        """
+        Params:
+            expected: a numpy array with the expected outputs of a batch
+            measured: a numpy array with the measured outputs of the same batch
+        """
+        expected = expected.astype(np.float64)
+        measured = measured.astype(np.float64)
+        if expected.size == 0:
+            return
+
+        error = measured - expected
+        abs_error = np.abs(error)
+
+        self.count += expected.size
+        weight = expected.size / self.count
+        self._mean_sq_error = self._update_mean(self._mean_sq_error,
+                                                np.mean(error * error),
+                                                weight)
+        self._mean_abs_error = self._update_mean(self._mean_abs_error,
+                                                 np.mean(abs_error),
+                                                 weight)
+        self._mean_abs_expected = self._update_mean(self._mean_abs_expected,
+                                                    np.mean(np.abs(expected)),
+                                                    weight)
+        self._mean_product = self._update_mean(self._mean_product,
+                                               np.mean(expected * measured),
+                                               weight)
+        self._mean_sq_expected = self._update_mean(self._mean_sq_expected,
+                                                   np.mean(expected * expected),
+                                                   weight)
+        self._mean_sq_measured = self._update_mean(self._mean_sq_measured,
+                                                   np.mean(measured * measured),
+                                                   weight)
+        self.max_abs_error = max(self.max_abs_error, float(np.max(abs_error)))
+
+        expected = np.reshape(expected, [-1, expected.shape[-1]])
+        measured = np.reshape(measured, [-1, measured.shape[-1]])
+        self.num_rows += expected.shape[0]
+        weight = expected.shape[0] / self.num_rows
+        self.expected_channel_mean = self._update_mean(self.expected_channel_mean,
+                                                       np.mean(expected,
+                                                               axis=0),
+                                                       weight)
+        self.measured_channel_mean = self._update_mean(self.measured_channel_mean,
+                                                       np.mean(measured,
+                                                               axis=0),
+                                                       weight)
+
+    def mse(self):
+        return self._mean_sq_error
+
+    def relative_error(self):
+        """Same as py_graph_test_util.GraphTestCase.relative_error()"""
+        return self._mean_abs_error / (self._mean_abs_expected +
+                                       np.finfo(np.float32).eps)
+
+    def cosine_similarity(self):
+        norm = np.sqrt(self._mean_sq_expected * self._mean_sq_measured)
+        if norm == 0:
+            return 1.0 if self._mean_sq_expected == self._mean_sq_measured else 0.0
+        return self._mean_product / norm
+
+    def as_dict(self):
+        return {
+            "mse": self.mse(),
+            "max_abs_error": self.max_abs_error,
+            "relative_error": self.relative_error(),
+            "cosine_similarity": self.cosine_similarity(),
+        }
+
+
+def _get_layer_arrays(out_pb):
+    """Returns a dictionary mapping edge names to arrays for a batch of outputs"""
+    return {
+        named_tensor.edge_info.name: utils.tensor_pb_to_array(named_tensor.data,
+                                                              np.float32)
+        for named_tensor in out_pb.results
+    }
+
+
+def update_layer_stats(layer_stats, expected_outs, measured_outs, executor=None):
+    """
+    Params:
+        layer_stats: a dictionary mapping edge names to LayerErrorStats() objects,
+            missing layers are added
+        expected_outs: a inference_pb2.BatchedInferenceOutput() protobuf
+        measured_outs: a inference_pb2.BatchedInferenceOutput() protobuf with the
+            outputs of the same inputs as expected_outs
+        executor: if given, a concurrent.futures.Executor used to update the
+            layers in parallel
+    """
+    assert (len(expected_outs.batches) == len(measured_outs.batches))
+    for expected_batch, measured_batch in zip(expected_outs.batches,
+                                              measured_outs.batches):
+        expected = _get_layer_arrays(expected_batch)
+        measured = _get_layer_arrays(measured_batch)
+        updates = [(layer_stats.setdefault(name,
+                                           LayerErrorStats()),
+                    expected[name],
+                    measured[name]) for name in expected]
+
+        if executor is None:
+            for stats, exp, meas in updates:
+                stats.update(exp, meas)
+        else:
+            # Each layer has its own stats, so layers can be updated concurrently
+            list(
+                executor.map(lambda update: update[0].update(update[1],
+                                                             update[2]),
+                             updates))
 
 
 def get_layer_errors(workload,
@@ -101,7 +241,19 @@ def get_layer_errors(workload,
                      hw_cfg,
                      opu_only=False,
                      max_nodes=32,
-                     fix_bns=True):
+                     fix_bns=True,
+                     num_stats_threads=1):
+    """
+    Compares the outputs of the layers of a workload before and after running
+    the full graph pipeline. Error statistics are computed one test data shard
+    at a time, with num_stats_threads threads updating the layers in parallel
+
+    Returns:
+        errors: a list with the relative error of each layer
+        names: a list with the name of each layer
+        errors_pb: a performance_data_pb2.RelativeErrorData() protobuf
+        layer_stats: a dictionary mapping layer names to LayerErrorStats() objects
+    """
     num_threads = 64
     perf_sweep = performance_sweep_map.get_sweep(workload, output_dir)
 
@@ -123,8 +275,6 @@ def get_layer_errors(workload,
     pruned_graph = lgf.prune_graph(output_edges=opu_edges)
     runner = graph_runner.GraphRunner(pruned_graph, hw_specs, sw_config, sim_params)
 
-    original_shard_outs = _get_outputs(perf_sweep, runner, sw_config)
-
     # Now get modified
     orig_path = os.path.join(output_dir, "pruned_lgf.pb")
     modified_path = os.path.join(output_dir, "modified_lgf.pb")
@@ -142,47 +292,44 @@ def get_layer_errors(workload,
     modified_lgf = lgf_graph.LightGraph.lgf_pb_to_graph(
         lgf_graph.LightGraph.read_lgf_pb(modified_path))
     modified_pruned_lgf = modified_lgf.prune_graph(output_edges=opu_edges)
-    runner = graph_runner.GraphRunner(modified_pruned_lgf,
-                                      hw_specs,
-                                      sw_config,
-                                      sim_params)
-    modified_shard_outs = _get_outputs(perf_sweep, runner, sw_config)
-
-    assert (len(original_shard_outs) == len(modified_shard_outs))
-
-    # flatten
-    orig_data = {}
-    mod_data = {}
-    logging.info("num shards: {0}".format(len(original_shard_outs)))
-    for i in range(len(original_shard_outs)):
-        logging.info("num batches: {0}".format(len(original_shard_outs[i].batches)))
-        collect_data_dict(orig_data, original_shard_outs[i])
-        collect_data_dict(mod_data, modified_shard_outs[i])
-
-    errors = {}
-    for name in orig_data.keys():
-        errors[name] = py_graph_test_util.GraphTestCase.relative_error(
-            np.concatenate(orig_data[name],
-                           axis=1),
-            np.concatenate(mod_data[name],
-                           axis=1))
-
-    logging.info(errors)
+    modified_runner = graph_runner.GraphRunner(modified_pruned_lgf,
+                                               hw_specs,
+                                               sw_config,
+                                               sim_params)
+
+    # Both graphs run on one shard at a time, so only the outputs of a single
+    # shard are in memory
+    layer_stats = {}
+    executor = None
+    if num_stats_threads > 1:
+        executor = futures.ThreadPoolExecutor(max_workers=num_stats_threads)
+    try:
+        runners = [runner, modified_runner]
+        for original_outs, modified_outs in _iter_outputs(perf_sweep,
+                                                          runners,
+                                                          sw_config):
+            logging.info("num batches: {0}".format(len(original_outs.batches)))
+            update_layer_stats(layer_stats,
+                               original_outs,
+                               modified_outs,
+                               executor=executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    for name, stats in layer_stats.items():
+        logging.info("{0}: {1}".format(name, stats.as_dict()))
+    errors = {name: stats.relative_error() for name, stats in layer_stats.items()}
 
     if fix_bns:
         corrections = {}
         for e in opu_edges:
             if e.name.endswith("FusedBatchNorm"):
                 # get per-channel means
-                orig = np.concatenate(orig_data[e.name], axis=1)
-                mod = np.concatenate(mod_data[e.name], axis=1)
-                orig = np.reshape(orig, [-1, orig.shape[-1]])
-                mod = np.reshape(mod, [-1, mod.shape[-1]])
-
+                stats = layer_stats[e.name]
                 node = modified_lgf.get_node_by_name(e.name)
-                corrections[node.inputs[1].name] = np.mean(mod,
-                                                           axis=0) - np.mean(orig,
-                                                                             axis=0)
+                corrections[node.inputs[1].name] = (stats.measured_channel_mean -
+                                                    stats.expected_channel_mean)
 
         bn_offset_filter = node_filters.name_in_filter("bn_offset")
         offset_transformer = BNOffsetTransform(corrections,
@@ -200,7 +347,10 @@ def get_layer_errors(workload,
 
     errors_pb = performance_data_pb2.RelativeErrorData()
     errors_pb.errors_dict.update(errors)
-    return [errors[e.name] for e in opu_edges], [e.name for e in opu_edges], errors_pb
+    return ([errors[e.name] for e in opu_edges],
+            [e.name for e in opu_edges],
+            errors_pb,
+            layer_stats)
 
 
 def _plot_errors(errors, names, plot_path):
@@ -216,10 +366,17 @@ def main(workload_name, output_dir, hw_cfg, **kwargs):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    errors, names, errors_pb = get_layer_errors(workload_name, output_dir, hw_cfg,
-                                                **kwargs)
+    errors, names, errors_pb, layer_stats = get_layer_errors(workload_name,
+                                                             output_dir,
+                                                             hw_cfg,
+                                                             **kwargs)
     with open(os.path.join(output_dir, "relative_error_data.pb"), "wb") as f:
         f.write(errors_pb.SerializeToString())
+    with open(os.path.join(output_dir, "layer_error_stats.json"), "w") as f:
+        json.dump({name: stats.as_dict() for name, stats in layer_stats.items()},
+                  f,
+                  indent=2,
+                  sort_keys=True)
 
     _plot_errors(errors,
                  names,
@@ -239,6 +396,10 @@ if __name__ == "__main__":
     parser.add_argument("--opu_only", action="store_true", default=False)
     parser.add_argument("--fix_bns", action="store_true", default=False)
     parser.add_argument("--max_nodes", type=int, default=32)
+    parser.add_argument("--num_stats_threads",
+                        type=int,
+                        default=1,
+                        help="threads used to update the error statistics of layers")
     parser.add_argument("--config_name",
                         type=str,
                         default=hardware_configs_pb2.HardwareConfig.Name(
@@ -253,4 +414,5 @@ if __name__ == "__main__":
          hardware_configs_pb2.HardwareConfig.Value(args.config_name),
          opu_only=args.opu_only,
          max_nodes=args.max_nodes,
-         fix_bns=args.fix_bns)
+         fix_bns=args.fix_bns,
+         num_stats_threads=args.num_stats_threads)
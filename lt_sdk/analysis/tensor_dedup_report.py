@@ -0,0 +1,90 @@
+import argparse
+import logging
+
+from lt_sdk.common import py_test_util
+from lt_sdk.graph import lgf_graph
+from lt_sdk.graph.transform_graph import utils
+from lt_sdk.proto import hardware_configs_pb2
+from lt_sdk.proto.configs import config
+from lt_sdk.verification import performance_sweep_map
+
+MB = float(1 << 20)
+
+
+def get_dedup_report(light_graph):
+    """
+    Returns a dictionary with the number of constant tensors and bytes in
+    light_graph, and how many of them are duplicates that are only stored
+    once in the weights file of an LGF written with external weights
+    """
+    num_tensors, num_unique, total_bytes, unique_bytes = \
+        light_graph.const_tensor_dedup_stats()
+
+    return {
+        "num_tensors": num_tensors,
+        "num_unique_tensors": num_unique,
+        "total_bytes": total_bytes,
+        "unique_bytes": unique_bytes,
+        "bytes_saved": total_bytes - unique_bytes,
+    }
+
+
+def log_report(name, report):
+    logging.info(
+        "{0}: {1} tensors ({2} unique), {3:.2f} MB -> {4:.2f} MB, saved {5:.2f} MB "
+        "({6:.1f}%)".format(
+            name,
+            report["num_tensors"],
+            report["num_unique_tensors"],
+            report["total_bytes"] / MB,
+            report["unique_bytes"] / MB,
+            report["bytes_saved"] / MB,
+            100.0 * report["bytes_saved"] / max(report["total_bytes"],
+                                                1)))
+
+
+def main(workloads, lgf_paths, output_dir, hw_cfg):
+    reports = {}
+
+    for workload in workloads:
+        perf_sweep = performance_sweep_map.get_sweep(workload, output_dir)
+        _, sw_config, _ = config.get_config(hw_cfg, perf_sweep.graph_type())
+        reports[workload] = get_dedup_report(perf_sweep.read_graph(sw_config))
+
+    for lgf_path in lgf_paths:
+        reports[lgf_path] = get_dedup_report(lgf_graph.LightGraph.from_pb(lgf_path))
+
+    utils.log_message("Constant Tensor Deduplication")
+    for name, report in reports.items():
+        log_report(name, report)
+
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--workloads",
+        type=str,
+        nargs="*",
+        default=[],
+        help="workload names, must be strings in performance_sweep_map.py")
+    parser.add_argument("--lgf_paths",
+                        type=str,
+                        nargs="*",
+                        default=[],
+                        help="paths to LGF protobufs")
+    parser.add_argument("--output_dir", type=str, default="/tmp/tensor_dedup_report")
+    parser.add_argument("--config_name",
+                        type=str,
+                        default=hardware_configs_pb2.HardwareConfig.Name(
+                            hardware_configs_pb2.DELTA))
+
+    args = parser.parse_args()
+
+    py_test_util.PythonTestProgram.set_root_logger(logging_level=logging.INFO,
+                                                   logging_format="%(message)s")
+    main(args.workloads,
+         args.lgf_paths,
+         args.output_dir,
+         hardware_configs_pb2.HardwareConfig.Value(args.config_name))
@@ -33,9 +33,10 @@ def import_graph(graph_path, config, graph_type=None, input_edges=None):
         lgf_graph.LightGraph: Imported graph.
     """
     if graph_type is None:
-        graph_type = graph_import.infer_import_graph_type(graph_path,
-                                                          config,
-                                                          input_edges=input_edges)
+        _, light_graph = graph_import.infer_and_import_graph(graph_path,
+                                                             config,
+                                                             input_edges=input_edges)
+        return light_graph
 
     graph_importer_cls = graph_import.get_graph_importer(graph_type)
     importer = graph_importer_cls(graph_path, config.sw_config, input_edges=input_edges)
@@ -51,7 +52,9 @@ def transform_graph(graph, config, calibration_data=None):
         graph (lgf_graph.LightGraph): Graph to transform.
         config (light_config.LightConfig): Config for the transformations.
         calibration_data (inference_pb2.BatchedInferenceInput, optional): Data used for\
-        calibration routines. If none provided, it is generated. Defaults to None.
+        calibration routines. Can also be an iterable of shards, such as a\
+        batch.ShardedBatchedInferenceInput, that are streamed during calibration.\
+        If none provided, it is generated. Defaults to None.
 
     Returns:
         lgf_graph.LightGraph: Transformed graph.
@@ -0,0 +1,118 @@
+import argparse
+import json
+import logging
+import sys
+
+from lt_sdk.benchmarks import run_benchmarks
+from lt_sdk.common import py_test_util
+from lt_sdk.graph.transform_graph import utils
+
+
+def _get_metrics(result):
+    """Returns a dictionary mapping metric names to values for a single benchmark"""
+    metrics = {}
+    for phase in run_benchmarks.PHASES:
+        if phase in result["phases"]:
+            metrics["{0}_time".format(phase)] = result["phases"][phase]["wall_time"]
+    metrics["peak_rss_mb"] = result["peak_rss_mb"]
+
+    return metrics
+
+
+def compare(baseline, results, threshold, min_time=0.1):
+    """
+    Params:
+        baseline: a dictionary of results from run_benchmarks.main()
+        results: a dictionary of results from run_benchmarks.main()
+        threshold: a metric regresses if it is more than (1 + threshold) times
+            the baseline value
+        min_time: times where both values are smaller than this many seconds are
+            too noisy to compare and never regress
+
+    Returns:
+        a list of comparisons, each comparison is a tuple (graph_name, metric,
+        baseline_value, value, is_regression)
+    """
+    comparisons = []
+    for name, result in sorted(results["benchmarks"].items()):
+        if name not in baseline["benchmarks"]:
+            logging.warning("No baseline for benchmark {0}".format(name))
+            continue
+
+        baseline_metrics = _get_metrics(baseline["benchmarks"][name])
+        for metric, value in sorted(_get_metrics(result).items()):
+            if metric not in baseline_metrics:
+                continue
+
+            baseline_value = baseline_metrics[metric]
+            is_regression = value > (1 + threshold) * baseline_value
+            if metric.endswith("_time") and max(value, baseline_value) < min_time:
+                is_regression = False
+
+            comparisons.append((name, metric, baseline_value, value, is_regression))
+
+    return comparisons
+
+
+def log_comparisons(comparisons):
+    for name, metric, baseline_value, value, is_regression in comparisons:
+        logging.info("{0:<14} {1:<18} {2:>12.3f} -> {3:>12.3f} ({4:+7.1f}%){5}".format(
+            name,
+            metric,
+            baseline_value,
+            value,
+            100.0 * (value - baseline_value) / max(baseline_value, 1e-9),
+            "  REGRESSION" if is_regression else ""))
+
+
+def main(baseline_path, results_path, threshold, min_time):
+    """Returns the list of comparisons that are regressions"""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    with open(results_path, "r") as f:
+        results = json.load(f)
+
+    comparisons = compare(baseline, results, threshold, min_time=min_time)
+
+    utils.log_message("Benchmark Comparison")
+    log_comparisons(comparisons)
+
+    regressions = [c for c in comparisons if c[-1]]
+    if regressions:
+        logging.info("{0} regressions beyond {1:.0f}%".format(
+            len(regressions),
+            100 * threshold))
+    else:
+        logging.info("No regressions beyond {0:.0f}%".format(100 * threshold))
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline_path",
+                        type=str,
+                        required=True,
+                        help="JSON results of run_benchmarks.py to compare against")
+    parser.add_argument("--results_path",
+                        type=str,
+                        required=True,
+                        help="JSON results of run_benchmarks.py to check")
+    parser.add_argument("--threshold",
+                        type=float,
+                        default=0.1,
+                        help="allowed relative increase of each metric")
+    parser.add_argument("--min_time",
+                        type=float,
+                        default=0.1,
+                        help="phases faster than this many seconds are not compared")
+
+    args = parser.parse_args()
+
+    py_test_util.PythonTestProgram.set_root_logger(logging_level=logging.INFO,
+                                                   logging_format="%(message)s")
+    regressions = main(args.baseline_path,
+                       args.results_path,
+                       args.threshold,
+                       args.min_time)
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,197 @@
+import argparse
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import time
+
+import numpy as np
+
+from lt_sdk.api import api
+from lt_sdk.benchmarks import synthetic_graphs
+from lt_sdk.common import py_test_util
+from lt_sdk.config import light_config
+from lt_sdk.graph.transform_graph import cached_pipeline, standard_transformations, utils
+from lt_sdk.proto import (
+    graph_types_pb2,
+    hardware_configs_pb2,
+    inference_pb2,
+    sw_config_pb2,
+)
+
+PHASES = ["import", "transform", "calibration", "funcsim", "perfsim"]
+
+CALIBRATION_STAGES = {
+    sw_config_pb2.ACTIVATION_SCALE_CALIBRATION,
+    sw_config_pb2.ADC_SCALE_CALIBRATION,
+}
+
+
+def get_peak_rss_mb():
+    """Returns the peak resident set size of this process in MB"""
+    # ru_maxrss is in KB on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+class _PhaseTimer(object):
+    """Records the wall time and the peak RSS at the end of each phase"""
+
+    def __init__(self):
+        self.phases = {phase: {"wall_time": 0.0, "peak_rss_mb": 0.0} for phase in PHASES}
+
+    def run(self, phase, fn, *args):
+        start = time.time()
+        result = fn(*args)
+        self.phases[phase]["wall_time"] += time.time() - start
+        self.phases[phase]["peak_rss_mb"] = get_peak_rss_mb()
+        logging.info("{0}: {1:.3f}s".format(phase, self.phases[phase]["wall_time"]))
+        return result
+
+
+def _transform_graph(light_graph, calibration_data, config, timer):
+    """
+    Same as api.transform_graph(), but the calibration stages are timed
+    separately from the other stages
+    """
+    stage_args = cached_pipeline.StageArgs(calibration_data,
+                                           light_graph,
+                                           config.hw_specs,
+                                           config.sw_config,
+                                           config.sim_params)
+    for stage_type in config.sw_config.standard_transform_stages:
+        stage = standard_transformations.STAGE_MAP[stage_type](stage_args)
+        phase = "calibration" if stage_type in CALIBRATION_STAGES else "transform"
+        utils.log_message("Running stage: {0}".format(stage.name))
+        light_graph = timer.run(phase, stage.transform, light_graph)
+
+    return light_graph
+
+
+def run_benchmark(name, work_dir, hw_cfg, batch_size):
+    """
+    Runs the api flow on the synthetic graph name
+
+    Params:
+        name: a key of synthetic_graphs.GRAPHS
+        work_dir: directory for the saved model of the graph
+        hw_cfg: a hardware_configs_pb2.HardwareConfig enum
+        batch_size: batch size of the calibration and simulation data
+
+    Returns:
+        a dictionary with the wall time and peak RSS of each phase
+    """
+    utils.log_message("Benchmark: {0}".format(name))
+    saved_model_dir = os.path.join(work_dir, name)
+    if os.path.exists(saved_model_dir):
+        shutil.rmtree(saved_model_dir)
+    synthetic_graphs.save_graph(name, saved_model_dir)
+
+    config = light_config.get_default_config(hw_cfg=hw_cfg,
+                                             graph_type=graph_types_pb2.TFSavedModel)
+    config.sim_params.compiled_batch_size = batch_size
+
+    timer = _PhaseTimer()
+    light_graph = timer.run("import",
+                            api.import_graph,
+                            saved_model_dir,
+                            config,
+                            graph_types_pb2.TFSavedModel)
+
+    inp = np.random.uniform(-1,
+                            1,
+                            size=synthetic_graphs.get_input_shape(name, batch_size))
+    data = inference_pb2.BatchedInferenceInput()
+    data.batches.add().CopyFrom(
+        utils.create_inference_inputs(light_graph.input_edges(), [inp]))
+
+    transformed_graph = _transform_graph(light_graph, data, config, timer)
+    timer.run("funcsim", api.run_functional_simulation, transformed_graph, data, config)
+    timer.run("perfsim", api.run_performance_simulation, transformed_graph, config)
+
+    return {
+        "phases": timer.phases,
+        "peak_rss_mb": get_peak_rss_mb(),
+        "num_nodes": len(transformed_graph.nodes()),
+    }
+
+
+def main(graph_names, work_dir, output_path, hw_cfg, batch_size):
+    """
+    Runs the benchmarks for graph_names and writes the results to a JSON file at
+    output_path. Each benchmark runs in a new process so the peak RSS only
+    includes that benchmark
+    """
+    results = {
+        "metadata": {
+            "date": datetime.datetime.now().isoformat(),
+            "hostname": platform.node(),
+            "hw_cfg": hardware_configs_pb2.HardwareConfig.Name(hw_cfg),
+            "batch_size": batch_size,
+        },
+        "benchmarks": {},
+    }
+
+    os.makedirs(work_dir, exist_ok=True)
+    for name in graph_names:
+        with multiprocessing.get_context("spawn").Pool(
+                1,
+                initializer=py_test_util.PythonTestProgram.set_root_logger,
+                initargs=(logging.INFO,
+                          "%(message)s")) as p:
+            results["benchmarks"][name] = p.apply(run_benchmark,
+                                                  (name,
+                                                   work_dir,
+                                                   hw_cfg,
+                                                   batch_size))
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+    utils.log_message("Benchmark Results")
+    for name, result in results["benchmarks"].items():
+        logging.info("{0}: {1}, peak RSS {2:.1f} MB".format(
+            name,
+            ", ".join("{0} {1:.3f}s".format(phase,
+                                            result["phases"][phase]["wall_time"])
+                      for phase in PHASES),
+            result["peak_rss_mb"]))
+    logging.info("Wrote results to {0}".format(output_path))
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--graphs",
+                        type=str,
+                        nargs="*",
+                        default=sorted(synthetic_graphs.GRAPHS),
+                        choices=sorted(synthetic_graphs.GRAPHS),
+                        help="synthetic graphs to benchmark")
+    parser.add_argument("--work_dir", type=str, default="/tmp/lt_benchmarks")
+    parser.add_argument("--output_path",
+                        type=str,
+                        default="/tmp/lt_benchmarks/results.json",
+                        help="path for the JSON results")
+    parser.add_argument("--config_name",
+                        type=str,
+                        default=hardware_configs_pb2.HardwareConfig.Name(
+                            hardware_configs_pb2.DELTA))
+    parser.add_argument("--batch_size", type=int, default=8)
+
+    args = parser.parse_args()
+
+    py_test_util.PythonTestProgram.set_root_logger(logging_level=logging.INFO,
+                                                   logging_format="%(message)s")
+    main(args.graphs,
+         args.work_dir,
+         args.output_path,
+         hardware_configs_pb2.HardwareConfig.Value(args.config_name),
+         args.batch_size)
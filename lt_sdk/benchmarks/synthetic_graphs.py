@@ -0,0 +1,85 @@
+import numpy as np
+import tensorflow as tf
+
+from lt_sdk.graph.export_graph import tf_graph_exporter
+
+
+def _get_weights(name, shape):
+    return tf.get_variable(name,
+                           shape=shape,
+                           dtype=tf.float32,
+                           initializer=tf.random_normal_initializer(0,
+                                                                    0.1))
+
+
+def mlp_graph(inp_tensor, num_layers=4, width=512):
+    """Fully connected layers with a bias and relu"""
+    x = inp_tensor
+    for i in range(num_layers):
+        w = _get_weights("weights_{0}".format(i), [int(x.shape[-1]), width])
+        bias = np.random.uniform(-1, 1, size=(width,)).astype(np.float32)
+        x = tf.nn.relu(tf.add(tf.matmul(x, w), bias), name="relu_{0}".format(i))
+
+    return tf.identity(x, name="output")
+
+
+def conv_stack_graph(inp_tensor, num_layers=4, channels=32):
+    """3x3 convolutions with a bias and relu"""
+    x = inp_tensor
+    for i in range(num_layers):
+        w = _get_weights("filters_{0}".format(i), [3, 3, int(x.shape[-1]), channels])
+        bias = np.random.uniform(-1, 1, size=(channels,)).astype(np.float32)
+        x = tf.nn.conv2d(x, w, strides=1, padding="SAME")
+        x = tf.nn.relu(tf.add(x, bias), name="relu_{0}".format(i))
+
+    return tf.identity(x, name="output")
+
+
+def batch_matmul_graph(inp_tensor, num_layers=4):
+    """Batched matrix multiplications of the input with square weights"""
+    x = inp_tensor
+    width = int(x.shape[-1])
+    for i in range(num_layers):
+        w = _get_weights("weights_{0}".format(i), [int(x.shape[1]), width, width])
+        x = tf.nn.relu(tf.matmul(x, w), name="relu_{0}".format(i))
+
+    return tf.identity(x, name="output")
+
+
+# Maps a graph name to a tuple (graph_fn, input_shape), the first dim of
+# input_shape is the batch dim
+GRAPHS = {
+    "mlp": (mlp_graph, [None, 512]),
+    "conv_stack": (conv_stack_graph, [None, 32, 32, 16]),
+    "batch_matmul": (batch_matmul_graph, [None, 16, 64, 64]),
+}
+
+
+def get_input_shape(name, batch_size):
+    _, input_shape = GRAPHS[name]
+    return [batch_size] + input_shape[1:]
+
+
+def save_graph(name, saved_model_dir, seed=0):
+    """
+    Saves the synthetic graph name as a TF saved model in saved_model_dir
+
+    Params:
+        name: a key of GRAPHS
+        saved_model_dir: directory for the saved model, must not exist
+        seed: random seed for the weights
+    """
+    graph_fn, input_shape = GRAPHS[name]
+    np.random.seed(seed)
+
+    graph = tf.Graph()
+    with graph.as_default():
+        tf.set_random_seed(seed)
+        inp_tensor = tf.placeholder(tf.float32, shape=input_shape, name="input")
+        output_tensor = graph_fn(inp_tensor)
+        with tf.Session(graph=graph) as sess:
+            sess.run(tf.global_variables_initializer())
+            tf_graph_exporter.ExportTFSavedModel.save_model(saved_model_dir,
+                                                            sess,
+                                                            [inp_tensor],
+                                                            [output_tensor])
@@ -0,0 +1,72 @@
+import ctypes
+
+
+class _LazyFunction(object):
+    """
+    Records the argtypes and restype of a function of a LazyLibrary that is not
+    loaded yet, calling it loads the library
+    """
+
+    def __init__(self, library, name):
+        self.__dict__["_library"] = library
+        self.__dict__["_name"] = name
+        self.__dict__["_attrs"] = {}
+
+    def __setattr__(self, name, value):
+        self._attrs[name] = value
+
+    def __getattr__(self, name):
+        if name in self._attrs:
+            return self._attrs[name]
+        return getattr(self._library._get_function(self._name), name)
+
+    def __call__(self, *args):
+        return self._library._get_function(self._name)(*args)
+
+
+class LazyLibrary(object):
+    """
+    A ctypes.CDLL that is only loaded the first time one of its functions is
+    called. Function signatures can be set before the library is loaded the same
+    way as for a ctypes.CDLL, for example lib.Fn.argtypes = (ctypes.c_void_p,)
+    """
+
+    def __init__(self, path):
+        """
+        Params:
+            path: path to the shared library
+        """
+        self._path = path
+        self._lib = None
+        self._lazy_functions = {}
+
+    def _load(self):
+        if self._lib is None:
+            self._lib = ctypes.CDLL(self._path)
+
+            # Apply the signatures set before loading, the loaded functions are
+            # stored as attributes so later lookups do not go through __getattr__
+            for name, lazy_function in self._lazy_functions.items():
+                function = getattr(self._lib, name)
+                for attr, value in lazy_function._attrs.items():
+                    setattr(function, attr, value)
+                setattr(self, name, function)
+
+        return self._lib
+
+    def _get_function(self, name):
+        self._load()
+        if name not in self.__dict__:
+            setattr(self, name, getattr(self._lib, name))
+        return self.__dict__[name]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        if self._lib is not None:
+            return self._get_function(name)
+
+        if name not in self._lazy_functions:
+            self._lazy_functions[name] = _LazyFunction(self, name)
+        return self._lazy_functions[name]
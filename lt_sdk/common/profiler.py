@@ -0,0 +1,253 @@
+import atexit
+import logging
+import multiprocessing.util
+import os
+import resource
+import threading
+import time
+
+from lt_sdk.visuals import chrome_trace
+
+# Formatted with the pid, so processes can share an output dir
+TRACE_FILENAME = "profile_trace_{0}.json"
+SUMMARY_FILENAME = "profile_summary_{0}.txt"
+
+# Categories of spans
+STAGE = "Stage"
+TRANSFORM = "Transform"
+RUNNER = "GraphRunner"
+
+_PAGE_SIZE_MB = os.sysconf("SC_PAGE_SIZE") / float(1 << 20)
+
+
+def get_rss_mb():
+    """Returns the current resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE_MB
+    except (IOError, IndexError, ValueError):
+        # Peak RSS in KB when /proc is not available
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+class Span(object):
+    """Wall time and memory of a single region of code, use as a context manager"""
+
+    def __init__(self, profiler, name, category):
+        self._profiler = profiler
+        self.name = name
+        self.category = category
+        self.track = None
+        self.start = None
+        self.duration = None
+        self.rss_start_mb = None
+        self.rss_end_mb = None
+
+    def __enter__(self):
+        self.rss_start_mb = get_rss_mb()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration = time.perf_counter() - self.start
+        self.rss_end_mb = get_rss_mb()
+        self.track = "{0} {1}".format(os.getpid(), threading.current_thread().name)
+        self._profiler.add_span(self)
+
+
+class _NullSpan(object):
+    """Span used when profiling is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Profiler(object):
+    """Collects spans and exports them as a chrome trace and a summary table"""
+
+    def __init__(self):
+        self._spans = []
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def span(self, name, category):
+        return Span(self, name, category)
+
+    def add_span(self, span):
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def write_trace(self, path):
+        """Writes the spans to path in the Chrome Trace Event JSON format"""
+        spans = sorted(self.spans(), key=lambda s: s.start)
+        with open(path, "w") as f, chrome_trace.ChromeTraceWriter(f) as writer:
+            for span in spans:
+                writer.add_region(
+                    span.track,
+                    span.name,
+                    1e6 * (span.start - self._start),
+                    1e6 * span.duration,
+                    category=span.category,
+                    args={
+                        "rss_start_mb": round(span.rss_start_mb, 3),
+                        "rss_end_mb": round(span.rss_end_mb, 3),
+                    })
+
+    def get_summary(self):
+        """
+        Returns a list of tuples (category, name, count, total_time, max_time,
+        max_rss_delta_mb) for the spans with the same category and name, sorted by
+        total_time, times are in seconds
+        """
+        summary = {}
+        for span in self.spans():
+            key = (span.category, span.name)
+            count, total_time, max_time, max_rss_delta = summary.get(key, (0, 0, 0, 0))
+            summary[key] = (count + 1,
+                            total_time + span.duration,
+                            max(max_time,
+                                span.duration),
+                            max(max_rss_delta,
+                                span.rss_end_mb - span.rss_start_mb))
+
+        rows = [key + value for key, value in summary.items()]
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+    def format_summary(self):
+        lines = [
+            "{0:<12} {1:<50} {2:>7} {3:>11} {4:>11} {5:>11} {6:>12}".format(
+                "category",
+                "name",
+                "count",
+                "total (s)",
+                "mean (ms)",
+                "max (ms)",
+                "max dRSS MB")
+        ]
+        for category, name, count, total_time, max_time, max_rss_delta in \
+                self.get_summary():
+            lines.append(
+                "{0:<12} {1:<50} {2:>7} {3:>11.3f} {4:>11.3f} {5:>11.3f} {6:>12.1f}".
+                format(category,
+                       name,
+                       count,
+                       total_time,
+                       1e3 * total_time / count,
+                       1e3 * max_time,
+                       max_rss_delta))
+
+        return "\n".join(lines)
+
+    def write(self, output_dir):
+        """Writes the chrome trace and summary table to output_dir"""
+        os.makedirs(output_dir, exist_ok=True)
+        self.write_trace(os.path.join(output_dir, TRACE_FILENAME.format(os.getpid())))
+        with open(os.path.join(output_dir, SUMMARY_FILENAME.format(os.getpid())),
+                  "w") as f:
+            f.write(self.format_summary() + "\n")
+
+        logging.info("Wrote profile to {0}".format(output_dir))
+
+
+# Profiler of this process, None if profiling is disabled
+_PROFILER = None
+_OUTPUT_DIRS = []
+
+# Number of spans when the profile was last written by flush()
+_NUM_FLUSHED_SPANS = None
+
+
+def enable(output_dir=None):
+    """
+    Enables profiling for this process
+
+    Params:
+        output_dir: if given, the profile is written to this dir when the
+            process exits
+    """
+    global _PROFILER
+    if _PROFILER is None:
+        _PROFILER = Profiler()
+        atexit.register(flush)
+
+    if output_dir and output_dir not in _OUTPUT_DIRS:
+        _OUTPUT_DIRS.append(output_dir)
+
+
+def get_output_dirs():
+    """Returns the dirs the profile of this process is written to"""
+    return list(_OUTPUT_DIRS)
+
+
+def flush():
+    """
+    Writes the profile of this process to the output dirs given to enable(),
+    does nothing if there are no new spans since the last flush().
+
+    atexit handlers do not run when multiprocessing ends a worker process, so
+    worker processes call this before they stop
+    """
+    global _NUM_FLUSHED_SPANS
+    if _PROFILER is None or not _OUTPUT_DIRS:
+        return
+
+    num_spans = len(_PROFILER.spans())
+    if num_spans == _NUM_FLUSHED_SPANS:
+        return
+
+    for output_dir in _OUTPUT_DIRS:
+        _PROFILER.write(output_dir)
+    _NUM_FLUSHED_SPANS = num_spans
+
+
+def init_worker(output_dirs, initializer=None, initargs=()):
+    """
+    Initializer of multiprocessing pool workers. Enables profiling with
+    output_dirs from the parent process, the profile is written when the worker
+    exits after the pool is closed. Then calls initializer(*initargs) if given
+    """
+    for output_dir in output_dirs:
+        enable(output_dir)
+
+    # Finalizers with an exit priority run in the exit path of every
+    # multiprocessing worker, unlike atexit handlers
+    multiprocessing.util.Finalize(None, flush, exitpriority=0)
+
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def enable_from_config(sw_config):
+    """Enables profiling if sw_config.profile_dir is set"""
+    if sw_config.profile_dir:
+        enable(sw_config.profile_dir)
+
+
+def is_enabled():
+    return _PROFILER is not None
+
+
+def get_profiler():
+    """Returns the Profiler of this process, or None if profiling is disabled"""
+    return _PROFILER
+
+
+def span(name, category):
+    """
+    Returns a context manager that records the wall time and memory of the code
+    it wraps when profiling is enabled, and does nothing otherwise
+    """
+    if _PROFILER is None:
+        return _NULL_SPAN
+
+    return _PROFILER.span(name, category)
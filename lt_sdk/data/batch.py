@@ -76,3 +76,77 @@ def pad_and_batch_tensor(tensor, batch_size, allow_padding=True):
     batched_tensors = np.split(padded_tensor, num_batches, axis=0)
 
     return batched_tensors
+
+
+class ShardedBatchedInferenceInput(object):
+    """Batched inputs split into shards that are only loaded when they are used.
+
+    Can be iterated over multiple times, each iteration loads the shards one at a
+    time so only a single shard needs to be in memory.
+    """
+
+    def __init__(self, num_shards, get_shard, max_batches=None):
+        """
+        Args:
+            num_shards (int): number of shards
+            get_shard (Callable[[int], inference_pb2.BatchedInferenceInput]): function
+            that loads the shard with the given index
+            max_batches (int, optional): if provided, iterating stops after this
+            many batches in total over all the shards. The last shard is truncated
+            and the remaining shards are not loaded
+        """
+        self._num_shards = num_shards
+        self._get_shard = get_shard
+        self._max_batches = max_batches
+
+    def __len__(self):
+        return self._num_shards
+
+    def __iter__(self):
+        num_batches = 0
+        for i in range(self._num_shards):
+            if self._max_batches is not None and num_batches >= self._max_batches:
+                return
+
+            shard = self._get_shard(i)
+            if self._max_batches is not None:
+                del shard.batches[self._max_batches - num_batches:]
+            num_batches += len(shard.batches)
+            yield shard
+
+
+def iter_shards(inputs):
+    """Iterates over the shards of batched inputs.
+
+    Args:
+        inputs (inference_pb2.BatchedInferenceInput or Iterable): a single Batched
+        Input protobuf or an iterable of Batched Input protobufs
+
+    Yields:
+        inference_pb2.BatchedInferenceInput: Batched Input protobuf for each shard
+    """
+    if isinstance(inputs, inference_pb2.BatchedInferenceInput):
+        yield inputs
+    else:
+        for shard in inputs:
+            yield shard
+
+
+def first_batch(inputs):
+    """Returns the first batch of batched inputs.
+
+    Args:
+        inputs (inference_pb2.BatchedInferenceInput or Iterable): a single Batched
+        Input protobuf or an iterable of Batched Input protobufs
+
+    Raises:
+        ValueError: occurs if there are no batches in the inputs
+
+    Returns:
+        inference_pb2.InferenceInput: the first batch
+    """
+    for shard in iter_shards(inputs):
+        if shard.batches:
+            return shard.batches[0]
+
+    raise ValueError("Batched inputs do not contain any batches")
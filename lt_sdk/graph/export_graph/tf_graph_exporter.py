@@ -13,6 +13,7 @@ from tensorflow.python.saved_model import (
 )
 from tensorflow.python.saved_model import utils as tf_utils
 
+from lt_sdk.graph import external_weights
 from lt_sdk.graph.export_graph import graph_exporter
 from lt_sdk.graph.import_graph import tf_saved_model_base_importer
 from lt_sdk.graph.transform_graph import utils
@@ -40,7 +41,8 @@ class ExportTFSavedModel(graph_exporter.ExportGraph):
         node_def.attr["SrcT"].list.type.extend(self._get_tf_dtypes(lnf.inputs))
         node_def.attr["DstT"].list.type.extend(self._get_tf_dtypes(lnf.outputs))
         node_def.attr["DstT"].list.type.extend([tf.int8.as_datatype_enum])
-        node_def.attr["serialized_subgraph"].s = lnf.subgraph.graph.SerializeToString()
+        node_def.attr["serialized_subgraph"].s = external_weights.materialized(
+            lnf.subgraph.graph).SerializeToString()
         node_def.attr["serialized_spec"].s = self._hw_specs.SerializeToString()
         node_def.attr["serialized_sw_config"].s = self._sw_config.SerializeToString()
         node_def.attr["serialized_params"].s = self._sim_params.SerializeToString()
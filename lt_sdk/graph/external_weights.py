@@ -0,0 +1,222 @@
+import glob
+import hashlib
+import os
+
+import numpy as np
+
+from lt_sdk.proto import lgf_pb2
+
+# Side-car file storing the tensor contents of a LGF file, named after the LGF
+# file and a digest of its contents
+WEIGHTS_FILE_EXT = ".weights"
+WEIGHTS_FILE_FORMAT = "{0}.{1}" + WEIGHTS_FILE_EXT
+DIGEST_LENGTH = 16
+
+# Tensors in the weights file start at multiples of this many bytes
+ALIGNMENT = 64
+
+# Smaller tensors are kept inside the LGF protobuf
+MIN_EXTERNAL_BYTES = 1024
+
+# Maps a weights file path to a np.memmap. The contents at a weights file path
+# never change, and a memmap stays valid after its file is removed
+_MEMMAPS = {}
+
+
+def _get_memmap(path):
+    if path not in _MEMMAPS:
+        _MEMMAPS[path] = np.memmap(path, dtype=np.uint8, mode="r")
+
+    return _MEMMAPS[path]
+
+
+def has_external_data(tensor_pb):
+    return tensor_pb.HasField("external_data")
+
+
+def get_tensor_content(tensor_pb):
+    """
+    Returns the contents of tensor_pb, only the pages of the weights file used by
+    tensor_pb are read from disk for external tensors
+    """
+    if not has_external_data(tensor_pb):
+        return tensor_pb.tensor_content
+
+    external_data = tensor_pb.external_data
+    memmap = _get_memmap(external_data.path)
+    return memmap[external_data.offset:external_data.offset + external_data.length]
+
+
+def _iter_const_tensors(nodes):
+    for node in nodes:
+        if node.HasField(lgf_pb2.LNF.const.DESCRIPTOR.name):
+            yield node.const.value
+        elif node.HasField(lgf_pb2.LNF.variable.DESCRIPTOR.name):
+            yield node.variable.const.value
+        elif node.HasField(lgf_pb2.LNF.subgraph.DESCRIPTOR.name):
+            yield from _iter_const_tensors(node.subgraph.graph.nodes)
+
+
+def iter_const_tensors(lgf_pb):
+    """Yields the common_pb2.Tensor() of every constant in lgf_pb, including subgraphs"""
+    yield from _iter_const_tensors(lgf_pb.nodes)
+
+
+def has_external_tensors(lgf_pb):
+    return any(has_external_data(t) for t in iter_const_tensors(lgf_pb))
+
+
+def map_weights_files(lgf_pb):
+    """
+    Memory maps the weights files used by lgf_pb without reading them. A mapped
+    file keeps its contents even if it is removed, so lgf_pb can still be read
+    after the files on disk are rewritten
+    """
+    for tensor_pb in iter_const_tensors(lgf_pb):
+        if has_external_data(tensor_pb):
+            _get_memmap(tensor_pb.external_data.path)
+
+
+def _get_file_digest(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+
+    return hasher.hexdigest()[:DIGEST_LENGTH]
+
+
+def write_weights_file(lgf_pb, lgf_pb_path, min_external_bytes=MIN_EXTERNAL_BYTES):
+    """
+    Moves the contents of large tensors in lgf_pb to a weights file next to
+    lgf_pb_path, see externalize(). The weights file is named after a digest of
+    its contents, so it is never modified once written. A LGF file written
+    afterwards always references its own weights file, and graphs that reference
+    an older weights file keep reading the same bytes
+
+    Params:
+        lgf_pb: a lgf_pb2.LGF() protobuf that will be modified in place
+        lgf_pb_path: path the LGF file will be written to
+        min_external_bytes: tensors with fewer bytes are kept inside lgf_pb
+
+    Returns:
+        the path of the weights file
+    """
+    tmp_path = "{0}{1}.{2}.tmp".format(lgf_pb_path, WEIGHTS_FILE_EXT, os.getpid())
+    with open(tmp_path, "wb") as f:
+        externalize(lgf_pb, f, "", min_external_bytes=min_external_bytes)
+
+    weights_path = WEIGHTS_FILE_FORMAT.format(lgf_pb_path, _get_file_digest(tmp_path))
+    for tensor_pb in iter_const_tensors(lgf_pb):
+        if has_external_data(tensor_pb):
+            tensor_pb.external_data.path = os.path.basename(weights_path)
+
+    os.replace(tmp_path, weights_path)
+    return weights_path
+
+
+def remove_stale_weights_files(lgf_pb_path, weights_path=None):
+    """
+    Removes the weights files of lgf_pb_path other than weights_path, these
+    are left over from earlier writes of lgf_pb_path
+    """
+    stale_paths = glob.glob(WEIGHTS_FILE_FORMAT.format(glob.escape(lgf_pb_path), "*"))
+    stale_paths.append(lgf_pb_path + WEIGHTS_FILE_EXT)
+    for path in stale_paths:
+        if path != weights_path and os.path.exists(path):
+            os.remove(path)
+
+
+def resolve_paths(lgf_pb, base_dir):
+    """Makes the relative external data paths in lgf_pb relative to base_dir"""
+    for tensor_pb in iter_const_tensors(lgf_pb):
+        if has_external_data(tensor_pb) and not os.path.isabs(
+                tensor_pb.external_data.path):
+            tensor_pb.external_data.path = os.path.join(base_dir,
+                                                        tensor_pb.external_data.path)
+
+
+def materialize(lgf_pb):
+    """Moves the contents of all external tensors in lgf_pb back into lgf_pb"""
+    for tensor_pb in iter_const_tensors(lgf_pb):
+        if has_external_data(tensor_pb):
+            tensor_pb.tensor_content = bytes(get_tensor_content(tensor_pb))
+            tensor_pb.ClearField("external_data")
+
+
+def materialized(lgf_pb):
+    """
+    Returns lgf_pb if it does not have external tensors, otherwise returns a copy
+    of lgf_pb with the external tensors materialized
+    """
+    if not has_external_tensors(lgf_pb):
+        return lgf_pb
+
+    lgf_pb_copy = lgf_pb2.LGF()
+    lgf_pb_copy.CopyFrom(lgf_pb)
+    materialize(lgf_pb_copy)
+    return lgf_pb_copy
+
+
+def _content_key(content):
+    return hashlib.sha256(content).digest()
+
+
+def get_dedup_stats(lgf_pb):
+    """
+    Returns a tuple (num_tensors, num_unique_tensors, total_bytes, unique_bytes)
+    for the constant tensors in lgf_pb, where tensors with identical contents are
+    only counted once for num_unique_tensors and unique_bytes
+    """
+    num_tensors = 0
+    total_bytes = 0
+    unique_sizes = {}
+    for tensor_pb in iter_const_tensors(lgf_pb):
+        content = get_tensor_content(tensor_pb)
+        num_tensors += 1
+        total_bytes += len(content)
+        unique_sizes[_content_key(content)] = len(content)
+
+    return num_tensors, len(unique_sizes), total_bytes, sum(unique_sizes.values())
+
+
+def externalize(lgf_pb, f, path, min_external_bytes=MIN_EXTERNAL_BYTES):
+    """
+    Moves the contents of large tensors in lgf_pb to a weights file. Tensors with
+    identical contents are interned, they are written once and share an offset
+
+    Params:
+        lgf_pb: a lgf_pb2.LGF() protobuf that will be modified in place
+        f: a file object opened for writing bytes, the weights file
+        path: path stored in lgf_pb to reference the weights file
+        min_external_bytes: tensors with fewer bytes are kept inside lgf_pb
+
+    Returns:
+        the number of bytes written to f
+    """
+    offset = 0
+    interned_offsets = {}
+    for tensor_pb in iter_const_tensors(lgf_pb):
+        content = get_tensor_content(tensor_pb)
+        if len(content) < min_external_bytes:
+            if has_external_data(tensor_pb):
+                tensor_pb.tensor_content = bytes(content)
+                tensor_pb.ClearField("external_data")
+            continue
+
+        key = _content_key(content)
+        if key not in interned_offsets:
+            padding = -offset % ALIGNMENT
+            f.write(b"\0" * padding)
+            offset += padding
+
+            f.write(content)
+            interned_offsets[key] = offset
+            offset += len(content)
+
+        tensor_pb.ClearField("tensor_content")
+        tensor_pb.external_data.path = path
+        tensor_pb.external_data.offset = interned_offsets[key]
+        tensor_pb.external_data.length = len(content)
+
+    return offset
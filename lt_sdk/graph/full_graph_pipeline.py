@@ -1,3 +1,4 @@
+from lt_sdk.data import batch
 from lt_sdk.graph.export_graph import graph_exporter_map
 from lt_sdk.graph.import_graph import graph_importer_map
 from lt_sdk.graph.transform_graph import standard_transformations, utils
@@ -7,7 +8,7 @@ from lt_sdk.proto import lgf_pb2
 def extract_edge_from_data(calibration_data):
     """Return an EdgeInfo for the input data, in case it isn't specified in the graph."""
     input_edges = []
-    for named_tensor in calibration_data.batches[0].inputs:
+    for named_tensor in batch.first_batch(calibration_data).inputs:
         e = lgf_pb2.EdgeInfo()
         e.CopyFrom(named_tensor.edge_info)
         if e.shape.batch_dim_indx < 0:
@@ -38,7 +39,8 @@ def main(import_graph_path,
         export_graph_path: path to export the transformed graph
         export_graph_type: a graph_types_pb2.GraphType enum specifying the type of
             the exported graph
-        calibration_data: a inference_pb2.BatchedInferenceInput() protobuf (if None
+        calibration_data: a inference_pb2.BatchedInferenceInput() protobuf or an
+            iterable of inference_pb2.BatchedInferenceInput() shards (if None
             generate random data)
         hw_specs: a hw_spec_pb2.HardwareSpecs() protobuf
         sw_config: a sw_config_pb2.SoftwareConfig() protobuf
@@ -1,8 +1,43 @@
 import ctypes
 import os
 
+import numpy as np
+
+from lt_sdk.common import lazy_library
 from lt_sdk.proto import calibration_pb2, common_pb2
-from lt_sdk.visuals import plot_histograms
+
+
+class HistogramArrays(object):
+    """
+    Histograms of a HistogramCollection stored as contiguous numpy arrays, row i
+    of each array belongs to keys[i]
+
+    hist is a 2-D int64 array of counts, rows of histograms with fewer bins than
+    the largest one are padded with zeros, num_bins stores the actual number of
+    bins of each row. values is a 2-D float32 array indexed by
+    calibration_pb2.CalibrationHistogram.ValueType
+    """
+
+    NUM_VALUES = len(calibration_pb2.CalibrationHistogram.ValueType.values())
+
+    def __init__(self, keys, hist, num_bins, values):
+        self.keys = keys
+        self.hist = hist
+        self.num_bins = num_bins
+        self.values = values
+        self.index = {key: i for i, key in enumerate(keys.tolist())}
+
+    def row(self, key):
+        """Returns the row of the arrays that belongs to key"""
+        return self.index[key]
+
+    def get_histogram(self, key):
+        """Returns the histogram of key as a calibration_pb2.CalibrationHistogram()"""
+        i = self.row(key)
+        cal_hist_pb = calibration_pb2.CalibrationHistogram()
+        cal_hist_pb.hist.extend(self.hist[i, :self.num_bins[i]].tolist())
+        cal_hist_pb.value.extend(self.values[i].tolist())
+        return cal_hist_pb
 
 
 class HistogramCollection(object):
@@ -14,7 +49,7 @@ class HistogramCollection(object):
     graph_collection.GraphCollection() object
     """
 
-    lib = ctypes.CDLL(
+    lib = lazy_library.LazyLibrary(
         os.path.join(os.path.dirname(__file__),
                      "lib_histogram_collection.so"))
 
@@ -70,6 +105,78 @@ class HistogramCollection(object):
 
         return cal_hist_pb
 
+    def _get_keys_array(self, keys):
+        if keys is None:
+            keys = self.get_keys()
+        return np.array(list(keys), dtype=np.uint32)
+
+    def _iter_histograms(self, keys):
+        """
+        Yields a calibration_pb2.CalibrationHistogram() for each key in keys. The
+        same protobuf is parsed into for every key, so it is only valid until the
+        next one is yielded
+        """
+        # Bind the functions once and parse into the same protobuf, this avoids
+        # most of the per key overhead of get_histogram()
+        get_histogram = self.lib.GetHistogram
+        clear_proto_string = self.lib.ClearProtoString
+        histogram_size = ctypes.c_uint()
+        cal_hist_pb = calibration_pb2.CalibrationHistogram()
+
+        for key in keys.tolist():
+            histogram_ptr = get_histogram(self._obj, key, ctypes.byref(histogram_size))
+            cal_hist_pb.ParseFromString(histogram_ptr[:histogram_size.value])
+            clear_proto_string(self._obj)
+            yield cal_hist_pb
+
+    @staticmethod
+    def _new_values_array(num_keys):
+        return np.full((num_keys,
+                        HistogramArrays.NUM_VALUES),
+                       np.nan,
+                       dtype=np.float32)
+
+    def get_histogram_values(self, keys=None):
+        """
+        Same as get_histogram_arrays(keys).values, without copying the counts of
+        the histograms into a dense array
+
+        Params:
+            keys: an iterable of keys, all the keys in the collection if not given
+
+        Returns:
+            a 2-D float32 numpy array indexed by key position and
+            calibration_pb2.CalibrationHistogram.ValueType
+        """
+        keys = self._get_keys_array(keys)
+        values = self._new_values_array(len(keys))
+        for i, cal_hist_pb in enumerate(self._iter_histograms(keys)):
+            values[i, :len(cal_hist_pb.value)] = cal_hist_pb.value
+
+        return values
+
+    def get_histogram_arrays(self, keys=None):
+        """
+        Params:
+            keys: an iterable of keys, all the keys in the collection if not given
+
+        Returns:
+            a HistogramArrays() with the histograms of keys
+        """
+        keys = self._get_keys_array(keys)
+        counts = []
+        values = self._new_values_array(len(keys))
+        for i, cal_hist_pb in enumerate(self._iter_histograms(keys)):
+            counts.append(np.array(cal_hist_pb.hist, dtype=np.int64))
+            values[i, :len(cal_hist_pb.value)] = cal_hist_pb.value
+
+        num_bins = np.array([c.size for c in counts], dtype=np.int64)
+        hist = np.zeros((len(keys), num_bins.max() if len(keys) else 0), dtype=np.int64)
+        for i, c in enumerate(counts):
+            hist[i, :c.size] = c
+
+        return HistogramArrays(keys, hist, num_bins, values)
+
     def initialize_empty_histogram(self, key, num_bins):
         self.lib.InitializeEmptyHistogram(self._obj, key, num_bins)
 
@@ -79,6 +186,21 @@ class HistogramCollection(object):
     def update_histogram_mode(self, key, mode):
         self.lib.UpdateHistogramMode(self._obj, key, mode)
 
+    def get_histogram_modes(self, keys):
+        """Returns a numpy array with the calibration_pb2.HistogramMode of each key"""
+        get_mode = self.lib.GetHistogramMode
+        return np.array([get_mode(self._obj, int(key)) for key in keys], dtype=np.uint32)
+
+    def update_histogram_modes(self, keys, modes):
+        """
+        Params:
+            keys: a list of keys
+            modes: a calibration_pb2.HistogramMode, or an array with one mode per key
+        """
+        update_mode = self.lib.UpdateHistogramMode
+        for key, mode in zip(keys, np.broadcast_to(modes, (len(keys),)).tolist()):
+            update_mode(self._obj, int(key), mode)
+
     def get_quant_scales(self,
                          quant_method,
                          sw_config,
@@ -124,7 +246,26 @@ class HistogramCollection(object):
     def set_histogram_max_val(self, key, max_val):
         self.lib.SetHistogramMaxVal(self._obj, key, max_val)
 
+    def get_histogram_max_vals(self, keys):
+        """Returns a float64 numpy array with the histogram max value of each key"""
+        get_max_val = self.lib.GetHistogramMaxVal
+        return np.array([get_max_val(self._obj, int(key)) for key in keys],
+                        dtype=np.float64)
+
+    def set_histogram_max_vals(self, keys, max_vals):
+        """
+        Params:
+            keys: a list of keys
+            max_vals: a float, or an array with one max value per key
+        """
+        set_max_val = self.lib.SetHistogramMaxVal
+        for key, max_val in zip(keys, np.broadcast_to(max_vals, (len(keys),)).tolist()):
+            set_max_val(self._obj, int(key), max_val)
+
     def plot_histograms(self, output_dir, plot_title_map={}):
-        keys = self.get_keys()
-        cal_hist_pb_map = {k: self.get_histogram(k) for k in keys}
+        # Plotting needs plotly, only import it when histograms are plotted
+        from lt_sdk.visuals import plot_histograms
+
+        hist_arrays = self.get_histogram_arrays()
+        cal_hist_pb_map = {k: hist_arrays.get_histogram(k) for k in hist_arrays.index}
         plot_histograms.main(cal_hist_pb_map, output_dir, plot_title_map=plot_title_map)
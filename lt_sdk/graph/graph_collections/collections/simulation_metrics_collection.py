@@ -1,6 +1,7 @@
 import ctypes
 import os
 
+from lt_sdk.common import lazy_library
 from lt_sdk.proto import performance_data_pb2
 
 
@@ -13,7 +14,7 @@ class SimulationMetricsCollection(object):
     graph_collection.GraphCollection() object
     """
 
-    lib = ctypes.CDLL(
+    lib = lazy_library.LazyLibrary(
         os.path.join(os.path.dirname(__file__),
                      "lib_simulation_metrics_collection.so"))
 
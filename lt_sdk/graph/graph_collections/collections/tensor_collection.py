@@ -1,6 +1,7 @@
 import ctypes
 import os
 
+from lt_sdk.common import lazy_library
 from lt_sdk.proto import common_pb2
 
 
@@ -13,8 +14,9 @@ class TensorCollection(object):
     graph_collection.GraphCollection() object
     """
 
-    lib = ctypes.CDLL(os.path.join(os.path.dirname(__file__),
-                                   "lib_tensor_collection.so"))
+    lib = lazy_library.LazyLibrary(
+        os.path.join(os.path.dirname(__file__),
+                     "lib_tensor_collection.so"))
 
     lib.GetTensor.argtypes = (ctypes.c_void_p,
                               ctypes.c_char_p,
@@ -1,6 +1,7 @@
 import ctypes
 import os
 
+from lt_sdk.common import lazy_library
 from lt_sdk.proto import common_pb2
 
 
@@ -14,7 +15,7 @@ class VariableCollection(object):
     graph_collection.GraphCollection() object
     """
 
-    lib = ctypes.CDLL(
+    lib = lazy_library.LazyLibrary(
         os.path.join(os.path.dirname(__file__),
                      "lib_variable_collection.so"))
 
@@ -1,7 +1,7 @@
 import ctypes
 import os
 
-from lt_sdk.common import context_manager_utils
+from lt_sdk.common import context_manager_utils, lazy_library
 from lt_sdk.graph.graph_collections.collections import (
     histogram_collection,
     simulation_metrics_collection,
@@ -14,7 +14,9 @@ class GraphCollectionBase(object):
     """
     Base class for wrappers around cpp classes
     """
-    lib = ctypes.CDLL(os.path.join(os.path.dirname(__file__), "lib_graph_collection.so"))
+    lib = lazy_library.LazyLibrary(
+        os.path.join(os.path.dirname(__file__),
+                     "lib_graph_collection.so"))
 
     lib.CreateGraphCollection.restype = ctypes.c_void_p
     lib.CreateNullGraphCollection.restype = ctypes.c_void_p
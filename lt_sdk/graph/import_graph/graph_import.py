@@ -1,34 +1,264 @@
+import logging
+import os
 import pprint
 
+from google.protobuf import descriptor, message
+
 from lt_sdk.graph.import_graph import graph_importer_map
+from lt_sdk.proto import graph_types_pb2, lgf_pb2
 
+SAVED_MODEL_FILE = "saved_model.pb"
+CHECKPOINT_META_EXT = ".meta"
+ONNX_EXT = ".onnx"
 
-def infer_import_graph_type(graph_path, config, input_edges=None):
+# An ONNX ModelProto starts with the varint ir_version field (field 1)
+ONNX_IR_VERSION_TAG = 0x08
+
+
+# Only this many bytes are read to detect a lgf_pb2.LGF() file
+LGF_SNIFF_SIZE = 1 << 20
+
+# Wire types of fixed size protobuf field types, other scalars are varints
+_FIXED_WIRE_TYPES = {
+    descriptor.FieldDescriptor.TYPE_DOUBLE: 1,
+    descriptor.FieldDescriptor.TYPE_FIXED64: 1,
+    descriptor.FieldDescriptor.TYPE_SFIXED64: 1,
+    descriptor.FieldDescriptor.TYPE_FLOAT: 5,
+    descriptor.FieldDescriptor.TYPE_FIXED32: 5,
+    descriptor.FieldDescriptor.TYPE_SFIXED32: 5,
+}
+
+
+class _TruncatedError(Exception):
+    """Raised when a field continues past the end of the bytes read"""
+
+
+def _read_varint(data, pos):
+    """Returns (value, position after the varint) of the varint at data[pos]"""
+    value = 0
+    shift = 0
+    while pos < len(data):
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+        if shift >= 64:
+            raise ValueError("Varint is too long")
+
+    raise _TruncatedError()
+
+
+def _get_wire_types(field):
+    if field.type in [
+            descriptor.FieldDescriptor.TYPE_MESSAGE,
+            descriptor.FieldDescriptor.TYPE_STRING,
+            descriptor.FieldDescriptor.TYPE_BYTES
+    ]:
+        return {2}
+
+    wire_type = _FIXED_WIRE_TYPES.get(field.type, 0)
+    if field.label == field.LABEL_REPEATED:
+        # Packed repeated scalars
+        return {wire_type, 2}
+    return {wire_type}
+
+
+def _prefix_matches(data, message_descriptor):
     """
+    Returns True if data, a serialized message that may be cut off at any point,
+    only contains fields of message_descriptor with matching wire types. Message
+    fields are checked recursively, so other protobufs such as tf.GraphDef() that
+    often parse as a lgf_pb2.LGF() with unknown fields are rejected
+    """
+    pos = 0
+    try:
+        while pos < len(data):
+            tag, pos = _read_varint(data, pos)
+            wire_type = tag & 0x7
+            field = message_descriptor.fields_by_number.get(tag >> 3)
+            if field is None or wire_type not in _get_wire_types(field):
+                return False
 
-    Args:
-        graph_path (str): [description]
-        config (light_config.LightConfig): [description]
+            if wire_type == 0:
+                _, pos = _read_varint(data, pos)
+            elif wire_type == 1:
+                pos += 8
+            elif wire_type == 5:
+                pos += 4
+            else:
+                length, pos = _read_varint(data, pos)
+                value = data[pos:pos + length]
+                pos += length
+                if (field.type == descriptor.FieldDescriptor.TYPE_MESSAGE and
+                        not _prefix_matches(value, field.message_type)):
+                    return False
+    except _TruncatedError:
+        pass
+    except ValueError:
+        return False
 
-    Raises:
-        TypeError: [description]
+    return True
+
+
+def _is_lgf_file(graph_path):
+    """
+    Returns True if the first LGF_SNIFF_SIZE bytes of graph_path look like a
+    lgf_pb2.LGF() that starts with a node
+    """
+    with open(graph_path, "rb") as f:
+        data = f.read(LGF_SNIFF_SIZE)
+
+    # Nodes are field 1 and are serialized first
+    nodes_tag = (lgf_pb2.LGF.NODES_FIELD_NUMBER << 3) | 2
+    if not data or data[0] != nodes_tag:
+        return False
+
+    if not _prefix_matches(data, lgf_pb2.LGF.DESCRIPTOR):
+        return False
+
+    # Check the type of the first node if it was read completely
+    try:
+        length, pos = _read_varint(data, 1)
+    except (_TruncatedError, ValueError):
+        return False
+    if pos + length <= len(data):
+        node = lgf_pb2.LNF()
+        try:
+            node.ParseFromString(data[pos:pos + length])
+        except message.DecodeError:
+            return False
+        return node.WhichOneof("node") is not None
+
+    return True
+
+
+def _has_onnx_header(graph_path):
+    with open(graph_path, "rb") as f:
+        header = f.read(2)
+
+    # ir_version is a small positive int, so it fits in a single varint byte
+    return (len(header) == 2 and header[0] == ONNX_IR_VERSION_TAG and
+            0 < header[1] < 0x80)
+
+
+def sniff_import_graph_type(graph_path):
+    """Detects the graph type from the files at graph_path without importing the graph.
+
+    Args:
+        graph_path (str): File path to graph.
 
     Returns:
-        [type]: [description]
+        graph_types_pb2.GraphType: Detected graph type, or None if the graph type
+        could not be detected.
     """
+    if os.path.isdir(graph_path):
+        files = os.listdir(graph_path)
+        if SAVED_MODEL_FILE in files:
+            return graph_types_pb2.TFSavedModel
+        if any(f.endswith(CHECKPOINT_META_EXT) for f in files):
+            return graph_types_pb2.TFTrainingCheckpoint
+        return None
+
+    if not os.path.isfile(graph_path):
+        return None
+
+    if graph_path.endswith(ONNX_EXT):
+        return graph_types_pb2.ONNXModel
+
+    if _is_lgf_file(graph_path):
+        return graph_types_pb2.LGFProtobuf
+
+    if _has_onnx_header(graph_path):
+        return graph_types_pb2.ONNXModel
+
+    return None
+
+
+def _import_by_trial(graph_path, config, input_edges=None, skip_graph_type=None):
     for graph_type, importer_cls in graph_importer_map.GRAPH_IMPORTER_MAP.items():
+        if graph_type == skip_graph_type:
+            continue
+
         try:
             importer = importer_cls(graph_path,
                                     config.sw_config,
                                     input_edges=input_edges)
-            _ = importer.as_light_graph()
-            return graph_type
+            return graph_type, importer.as_light_graph()
         except Exception:
             continue
 
     raise TypeError(f"Provided graph {graph_path} is not a valid graph type. \
                       The graph must be one of the following types:\n\
-                      {pprint.pformat(graph_importer_map.keys())}")
+                      {pprint.pformat(graph_importer_map.GRAPH_IMPORTER_MAP.keys())}")
+
+
+def infer_import_graph_type(graph_path, config, input_edges=None):
+    """Infers the type of the graph at graph_path. The graph type is detected from
+    the files when possible, otherwise each importer is tried until one succeeds.
+
+    Args:
+        graph_path (str): File path to graph.
+        config (light_config.LightConfig): Config for importing graph.
+        input_edges (list of lgf_pb2.EdgeInfo): Specifies the input edges\
+        that will be used to run the graph. Defaults to None.
+
+    Raises:
+        TypeError: occurs if no importer can import the graph.
+
+    Returns:
+        graph_types_pb2.GraphType: Inferred graph type.
+    """
+    graph_type = sniff_import_graph_type(graph_path)
+    if graph_type is not None:
+        return graph_type
+
+    graph_type, _ = _import_by_trial(graph_path, config, input_edges=input_edges)
+    return graph_type
+
+
+def infer_and_import_graph(graph_path, config, input_edges=None):
+    """Infers the type of the graph at graph_path and imports it, so the graph only
+    has to be imported once. If the graph type cannot be detected from the files,
+    or the importer of the detected type fails, each importer is tried until one
+    succeeds.
+
+    Args:
+        graph_path (str): File path to graph.
+        config (light_config.LightConfig): Config for importing graph.
+        input_edges (list of lgf_pb2.EdgeInfo): Specifies the input edges\
+        that will be used to run the graph. Defaults to None.
+
+    Raises:
+        TypeError: occurs if no importer can import the graph.
+
+    Returns:
+        tuple: (graph_types_pb2.GraphType, lgf_graph.LightGraph) for the inferred
+        graph type and the imported graph.
+    """
+    graph_type = sniff_import_graph_type(graph_path)
+    if graph_type is None:
+        return _import_by_trial(graph_path, config, input_edges=input_edges)
+
+    logging.info("Detected graph type {0} for {1}".format(
+        graph_types_pb2.GraphType.Name(graph_type),
+        graph_path))
+    try:
+        importer = get_graph_importer(graph_type)(graph_path,
+                                                  config.sw_config,
+                                                  input_edges=input_edges)
+        return graph_type, importer.as_light_graph()
+    except Exception as e:
+        logging.warning("Could not import {0} as {1}, trying all importers: {2}".format(
+            graph_path,
+            graph_types_pb2.GraphType.Name(graph_type),
+            e))
+
+    return _import_by_trial(graph_path,
+                            config,
+                            input_edges=input_edges,
+                            skip_graph_type=graph_type)
 
 
 def get_graph_importer(graph_type):
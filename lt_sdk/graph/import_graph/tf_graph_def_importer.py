@@ -20,6 +20,10 @@ class ImportTFGraphDef(tf_saved_model_importer.ImportTFSavedModel):
 
         super().__init__(graph_path, *args, **kwargs)
 
+    def _update_graph_digest(self, hasher):
+        # The graph def might not come from graph_path
+        hasher.update(self._graph_def.SerializeToString(deterministic=True))
+
     def _get_output_tensor_and_node_names(self):
         self._output_tensor_names = []
         self._output_node_names = []
@@ -1,4 +1,6 @@
+import hashlib
 import logging
+import os
 import re
 
 import tensorflow as tf
@@ -22,6 +24,9 @@ class ImportTFSavedModelBase(graph_importer.ImportGraph):
     RUN_1_BATCH_SIZE = 1
     RUN_2_BATCH_SIZE = 2
 
+    IMPORT_CACHE_FILE_FORMAT = "import_{}.pb"
+    HASH_CHUNK_SIZE = 1 << 20
+
     def __init__(self,
                  *args,
                  input_names=None,
@@ -37,7 +42,11 @@ class ImportTFSavedModelBase(graph_importer.ImportGraph):
         self._required_nodes = set()
         self._allow_multiple_batch_dims = allow_multiple_batch_dims
 
-        self.load_graph_session(self.read_graph)
+        # Skip tensorflow entirely if the graph is in the import cache
+        self._import_cache_path = self._get_import_cache_path()
+        self._cached_light_graph = self._load_from_import_cache()
+        if self._cached_light_graph is None:
+            self.load_graph_session(self.read_graph)
 
     DATA_TYPE_MAP = {
         tf.float32: (dtypes_pb2.DT_FLOAT,
@@ -328,6 +337,70 @@ class ImportTFSavedModelBase(graph_importer.ImportGraph):
 
         return strings
 
+    def _update_graph_digest(self, hasher):
+        """Updates hasher with the contents of the files at self._graph_path"""
+        if os.path.isdir(self._graph_path):
+            paths = []
+            for root, dirs, files in os.walk(self._graph_path):
+                dirs.sort()
+                paths.extend(os.path.join(root, f) for f in sorted(files))
+        else:
+            paths = [self._graph_path]
+
+        for path in paths:
+            hasher.update(os.path.relpath(path, self._graph_path).encode())
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+
+    def _get_import_cache_path(self):
+        """
+        Returns the path of the cached LightGraph for this import, or None if
+        self._sw_config.import_cache_dir is not set. The path depends on a digest
+        of the graph files, the ignore nodes filter, the input edges, and the
+        arguments of the importer
+        """
+        if not self._sw_config.import_cache_dir:
+            return None
+
+        hasher = hashlib.sha256()
+        hasher.update(type(self).__name__.encode())
+        self._update_graph_digest(hasher)
+        hasher.update(
+            self._sw_config.ignore_nodes_filter.SerializeToString(deterministic=True))
+        if self._input_edges:
+            for key in sorted(self._input_edges):
+                hasher.update(
+                    self._input_edges[key].SerializeToString(deterministic=True))
+        hasher.update(
+            repr((sorted(self._input_tensor_names or []),
+                  sorted(self._output_tensor_names or []),
+                  self._allow_multiple_batch_dims)).encode())
+
+        return os.path.join(self._sw_config.import_cache_dir,
+                            self.IMPORT_CACHE_FILE_FORMAT.format(hasher.hexdigest()))
+
+    def _load_from_import_cache(self):
+        cache_path = self._import_cache_path
+        if cache_path is None or not os.path.exists(cache_path):
+            return None
+
+        logging.info("Loading imported graph from cache: {0}".format(cache_path))
+        return lgf_graph.LightGraph.lgf_pb_to_graph(
+            lgf_graph.LightGraph.read_lgf_pb(cache_path))
+
+    def _write_to_import_cache(self, light_graph):
+        cache_path = self._import_cache_path
+        if cache_path is None:
+            return
+
+        # Files are replaced when using external weights, so concurrent imports
+        # never read a partially written graph
+        os.makedirs(self._sw_config.import_cache_dir, exist_ok=True)
+        lgf_graph.LightGraph.write_lgf_pb(light_graph.as_lgf_pb(),
+                                          cache_path,
+                                          use_external_weights=True)
+
     def load_graph_session(self, read_graph_fn):
         """
         Loads a graph into a session, sets self._meta_graph_def to a meta_graph_def
@@ -677,6 +750,9 @@ class ImportTFSavedModelBase(graph_importer.ImportGraph):
         return meta_graph_info
 
     def as_light_graph(self):
+        if self._cached_light_graph is not None:
+            return self._cached_light_graph
+
         # Nodes, inputs, outputs
         nodes = [
             self._tf_node_def_to_lnf(tf_node_def) for tf_node_def in self._graph_def.node
@@ -693,8 +769,11 @@ class ImportTFSavedModelBase(graph_importer.ImportGraph):
         meta_graph_info = self._tf_meta_graph_def_to_lgf_meta_graph_info(
             self._meta_graph_def)
 
-        return lgf_graph.LightGraph(nodes,
-                                    input_edges=input_edges,
-                                    output_edges=output_edges,
-                                    output_node_names=output_node_names,
-                                    meta_graph_info=meta_graph_info)
+        light_graph = lgf_graph.LightGraph(nodes,
+                                           input_edges=input_edges,
+                                           output_edges=output_edges,
+                                           output_node_names=output_node_names,
+                                           meta_graph_info=meta_graph_info)
+        self._write_to_import_cache(light_graph)
+
+        return light_graph
@@ -1,3 +1,6 @@
+import os
+
+from lt_sdk.graph import external_weights
 from lt_sdk.proto import lgf_pb2, node_filters, ops_pb2
 
 
@@ -27,6 +30,12 @@ class LightGraph(object):
 
     IS_CONST_ATTR = "is_constant"
 
+    # Nodes are never mutated, so graphs derived from this graph can share them
+    _SHARE_NODES = True
+
+    # The graph never changes, so it can be returned instead of an identical copy
+    _IMMUTABLE = True
+
     def __init__(self,
                  nodes,
                  input_edges=None,
@@ -41,11 +50,44 @@ class LightGraph(object):
             output_nodes: a optional list of strings corresponding to output node names
             meta_graph_info: an optional lgf_pb2.MetaGraphInfo() protobuf
         """
+        self._init_graph([self._copy_node(node) for node in nodes],
+                         input_edges=input_edges,
+                         output_edges=output_edges,
+                         output_node_names=output_node_names,
+                         meta_graph_info=meta_graph_info)
+
+    @classmethod
+    def _from_shared_nodes(cls,
+                           nodes,
+                           input_edges=None,
+                           output_edges=None,
+                           output_node_names=None,
+                           meta_graph_info=None):
+        """
+        Returns a new graph that uses the given nodes without copying them, so
+        unchanged nodes can be shared between a graph and the graphs derived from
+        it. The nodes must never be mutated after calling this function, see
+        __init__() for params
+        """
+        light_graph = cls.__new__(cls)
+        light_graph._init_graph(list(nodes),
+                                input_edges=input_edges,
+                                output_edges=output_edges,
+                                output_node_names=output_node_names,
+                                meta_graph_info=meta_graph_info)
+        return light_graph
+
+    def _init_graph(self,
+                    nodes,
+                    input_edges=None,
+                    output_edges=None,
+                    output_node_names=None,
+                    meta_graph_info=None):
         input_edges = input_edges or []
         output_edges = output_edges or []
         output_node_names = output_node_names or []
 
-        self._nodes = [self._copy_node(node) for node in nodes]
+        self._nodes = nodes
         self._input_edges = []
         input_names = set()
         for edge_info in input_edges:
@@ -95,6 +137,10 @@ class LightGraph(object):
             v in self._node_to_output_node_names.items()
         }
 
+        # Computed lazily by self.topological_order() and self.node_index()
+        self._topological_order = None
+        self._node_index = None
+
         # Make sure required nodes are in the graph
         for node_name in self._meta_graph_info.required_nodes:
             if node_name not in self._node_dict:
@@ -131,6 +177,17 @@ class LightGraph(object):
         """
         return [self._copy_node(node) for node in self._nodes]
 
+    def _shared_nodes(self):
+        """
+        Returns the nodes in the graph without copying them, in the same order
+        as self.nodes(). The returned nodes must not be mutated, copy a node
+        before changing it
+        """
+        if not self._SHARE_NODES:
+            return self.nodes()
+
+        return list(self._nodes)
+
     def node_dict(self):
         return {node.name: node for node in self.nodes()}
 
@@ -189,44 +246,93 @@ class LightGraph(object):
                     output_edges=None,
                     output_node_names=None,
                     include_inputs=True):
-        """Returns a new light_graph object."""
+        """
+        Returns a light_graph object with only the nodes needed to compute the
+        outputs. Returns this graph if no nodes would be removed
+        """
         # Inputs and outputs of pruned graph are the same
         input_edges = input_edges or self.input_edges()
         output_edges = output_edges or self.output_edges()
         output_node_names = output_node_names or self.output_node_names()
 
-        # Node filter for input nodes
-        input_node_filter = node_filters.and_filter(*[
-            node_filters.not_filter(node_filters.name_is_filter(e.name))
-            for e in input_edges
-        ])
-
-        # Get the root nodes for pruning, include required nodes
-        root_nodes = [self.get_node_by_name(e.name) for e in output_edges] + [
-            self.get_node_by_name(node_name) for node_name in output_node_names
-        ] + [
-            self.get_node_by_name(node_name)
-            for node_name in self._meta_graph_info.required_nodes
-        ]
+        nodes = self._get_pruned_nodes(input_edges,
+                                       output_edges,
+                                       output_node_names,
+                                       include_inputs=include_inputs)
 
-        # Only keep nodes that the outputs depend on
+        # Make sure inputs and outputs come from the original graph
+        input_edges = [self.get_edge(e.name, e.port) for e in input_edges]
+        output_edges = [self.get_edge(e.name, e.port) for e in output_edges]
+
+        # Nothing to prune, nodes are only reordered for a new graph
+        if (self._IMMUTABLE and len(nodes) == len(self._nodes)
+                and input_edges == self._input_edges
+                and output_edges == self._output_edges
+                and list(output_node_names) == self._output_node_names):
+            return self
+
+        # Unchanged nodes are shared with the pruned graph
+        if not self._SHARE_NODES:
+            nodes = [self._copy_node(node) for node in nodes]
+
+        return LightGraph._from_shared_nodes(nodes,
+                                             input_edges=input_edges,
+                                             output_edges=output_edges,
+                                             output_node_names=output_node_names,
+                                             meta_graph_info=self.meta_graph_info())
+
+    def _get_pruned_nodes(self,
+                          input_edges,
+                          output_edges,
+                          output_node_names,
+                          include_inputs=True):
+        """
+        Returns the nodes of the graph that are kept by self.prune_graph(), in the
+        order of the pruned graph. The nodes are not copied
+        """
+        # The BFS from the outputs stops at input nodes
+        input_node_names = {e.name for e in input_edges}
+
+        # Get the root nodes for pruning, include required nodes but do not stop
+        # at input nodes for them
+        roots = [(e.name, input_node_names) for e in output_edges] + [
+            (node_name, input_node_names) for node_name in output_node_names
+        ] + [(node_name, set()) for node_name in self._meta_graph_info.required_nodes]
+
+        # Nodes with all their inputs already kept, when stopping at input nodes
+        # and when not stopping at input nodes
+        closed_node_names = {True: set(), False: set()}
+
+        # Only keep nodes that the outputs depend on, this visits nodes in the
+        # same order as self._bfs() from each root
         nodes = []
         node_names = set()
-        for i, root_node in enumerate(root_nodes):
-            # Do not use the input node filter for required nodes
-            if i < (len(output_edges) + len(output_node_names)):
-                node_filter = input_node_filter
-            else:
-                node_filter = None
-
-            for node in self.bfs(root_node, node_filter=node_filter):
+        for root_name, excluded_node_names in roots:
+            root_node = self._node_dict[root_name]
+            if root_name.startswith("^") or root_name in excluded_node_names:
+                continue
+
+            stops_at_inputs = bool(excluded_node_names)
+            visited_node_names = {root_name}
+            queue = [root_node]
+            for node in queue:
                 if node.name not in node_names:
                     nodes.append(node)
                     node_names.add(node.name)
 
-        # Make sure inputs and outputs come from the original graph
-        input_edges = [self.get_edge(e.name, e.port) for e in input_edges]
-        output_edges = [self.get_edge(e.name, e.port) for e in output_edges]
+                # Inputs of closed nodes are already kept
+                if (node.name in closed_node_names[False]
+                        or (stops_at_inputs and node.name in closed_node_names[True])):
+                    continue
+
+                for input_name in self._node_to_input_node_names[node.name]:
+                    if (input_name not in visited_node_names
+                            and input_name not in excluded_node_names
+                            and not input_name.startswith("^")):
+                        visited_node_names.add(input_name)
+                        queue.append(self._node_dict[input_name])
+
+            closed_node_names[stops_at_inputs].update(visited_node_names)
 
         # Add input nodes if necessary
         if include_inputs:
@@ -235,11 +341,63 @@ class LightGraph(object):
                     nodes.append(self._node_dict[e.name])
                     node_names.add(e.name)
 
-        return LightGraph(nodes,
-                          input_edges=input_edges,
-                          output_edges=output_edges,
-                          output_node_names=output_node_names,
-                          meta_graph_info=self.meta_graph_info())
+        return nodes
+
+    def node_index(self):
+        """
+        Returns a node_filters.NodeIndex for the nodes in the graph, used to find
+        the nodes that match a filter. Cached since the graph is immutable
+        """
+        if self._node_index is not None:
+            return self._node_index
+
+        node_index = node_filters.NodeIndex(self._nodes)
+        if self._IMMUTABLE:
+            self._node_index = node_index
+
+        return node_index
+
+    def get_matching_nodes(self, node_filter, node_index=None):
+        """
+        Returns a list of the nodes in the graph that match the given
+        node_filters.NodeFilter, in the same order as self.nodes()
+        """
+        return [
+            self._copy_node(self._node_dict[node_name])
+            for node_name in node_filter.get_matching_node_names(self,
+                                                                 node_index=node_index)
+        ]
+
+    def topological_order(self):
+        """
+        Returns a list of node names where every node comes after its inputs,
+        including control inputs. Nodes in a cycle, such as a while loop, come
+        last in the order of self.nodes(). Cached since the graph is immutable
+        """
+        if self._topological_order is not None:
+            return list(self._topological_order)
+
+        num_inputs = {
+            node_name: len(input_node_names)
+            for node_name, input_node_names in self._node_to_input_node_names.items()
+        }
+        order = [node.name for node in self._nodes if num_inputs[node.name] == 0]
+        for node_name in order:
+            for output_name in self._node_to_output_node_names[node_name]:
+                num_inputs[output_name] -= 1
+                if num_inputs[output_name] == 0:
+                    order.append(output_name)
+
+        if len(order) < len(self._nodes):
+            ordered_node_names = set(order)
+            order.extend(node.name
+                         for node in self._nodes
+                         if node.name not in ordered_node_names)
+
+        if self._IMMUTABLE:
+            self._topological_order = order
+
+        return list(order)
 
     def bfs(self,
             root_node,
@@ -258,6 +416,18 @@ class LightGraph(object):
                 filter with this graph. Note that if the root_node does not match the
                 provided filter, no nodes will be returned.
         """
+        for node in self._bfs(root_node,
+                              bidirectional=bidirectional,
+                              node_filter=node_filter,
+                              skip_control_inputs=skip_control_inputs):
+            yield self._copy_node(node)
+
+    def _bfs(self,
+             root_node,
+             bidirectional=False,
+             node_filter=None,
+             skip_control_inputs=False):
+        """Same as self.bfs() but yields the nodes of the graph without copying them"""
         # Check for unsupported cases
         if bidirectional and skip_control_inputs:
             raise ValueError("Bidirectional BFS is currently unsupported when" +
@@ -281,7 +451,7 @@ class LightGraph(object):
         frontier = []
         while current_nodes:
             for parent_node in current_nodes:
-                yield self._copy_node(parent_node)
+                yield parent_node
 
                 # Default uses inputs for child nodes
                 if skip_control_inputs:
@@ -383,18 +553,63 @@ class LightGraph(object):
 
     @staticmethod
     def read_lgf_pb(lgf_pb_path):
-        """Reads a LGF Proto from the binary file at lgf_pb_path"""
+        """
+        Reads a LGF Proto from the binary file at lgf_pb_path. Tensors stored in
+        an external weights file are not read, they are loaded lazily when
+        utils.tensor_pb_to_array() is called on them. The weights file is memory
+        mapped right away, so rewriting lgf_pb_path later does not change the
+        tensors of the returned protobuf
+        """
         light_graph = lgf_pb2.LGF()
         with open(lgf_pb_path, "rb") as f:
             light_graph.ParseFromString(f.read())
 
+        external_weights.resolve_paths(light_graph,
+                                       os.path.dirname(os.path.abspath(lgf_pb_path)))
+        external_weights.map_weights_files(light_graph)
+
         return light_graph
 
     @staticmethod
-    def write_lgf_pb(lgf_pb, lgf_pb_path):
-        """Writes lgf_pb as a binary file to lgf_pb_path"""
-        with open(lgf_pb_path, "wb") as f:
-            f.write(lgf_pb.SerializeToString())
+    def write_lgf_pb(lgf_pb, lgf_pb_path, use_external_weights=False):
+        """
+        Writes lgf_pb as a binary file to lgf_pb_path
+
+        If use_external_weights is True, large constant tensors are stored in an
+        aligned weights file next to lgf_pb_path and referenced by offset from the
+        const nodes. Identical tensors are only stored once in the weights file.
+        Otherwise all tensors are stored inside the written protobuf.
+
+        The weights file is named after a digest of its contents, and replacing
+        lgf_pb_path is the last step. A reader therefore never pairs a LGF file
+        with the weights of a different write
+        """
+        if not use_external_weights:
+            with open(lgf_pb_path, "wb") as f:
+                f.write(external_weights.materialized(lgf_pb).SerializeToString())
+            external_weights.remove_stale_weights_files(lgf_pb_path)
+            return
+
+        lgf_pb_copy = lgf_pb2.LGF()
+        lgf_pb_copy.CopyFrom(lgf_pb)
+        weights_path = external_weights.write_weights_file(lgf_pb_copy, lgf_pb_path)
+
+        tmp_path = "{0}.{1}.tmp".format(lgf_pb_path, os.getpid())
+        with open(tmp_path, "wb") as f:
+            f.write(lgf_pb_copy.SerializeToString())
+        os.replace(tmp_path, lgf_pb_path)
+
+        # Graphs read from the old files in this process have them memory mapped
+        external_weights.remove_stale_weights_files(lgf_pb_path, weights_path)
+
+    def const_tensor_dedup_stats(self):
+        """
+        Returns a tuple (num_tensors, num_unique_tensors, total_bytes, unique_bytes)
+        for the constant tensors in this graph, see external_weights.get_dedup_stats()
+        """
+        lgf_pb = lgf_pb2.LGF()
+        lgf_pb.nodes.extend(self._nodes)
+        return external_weights.get_dedup_stats(lgf_pb)
 
     @staticmethod
     def from_pb(lgf_pb_path):
@@ -406,3 +621,7 @@ class MutableLightGraph(LightGraph):
     def get_node_by_name(self, node_name):
         """Returns the node in the graph with the given node_name."""
         return self._node_dict[node_name]
+
+    # Nodes of a mutable graph can change, so they cannot be shared
+    _SHARE_NODES = False
+    _IMMUTABLE = False
@@ -1,8 +1,9 @@
 import logging
 import os
 import shutil
+import threading
 
-from lt_sdk.common import py_file_utils
+from lt_sdk.common import profiler, py_file_utils
 from lt_sdk.graph.export_graph import graph_exporter, graph_exporter_map
 from lt_sdk.graph.graph_collections import graph_collection
 from lt_sdk.graph.run_graph.run_external_graph import external_graph_runner_map
@@ -10,6 +11,104 @@ from lt_sdk.graph.transform_graph import utils
 from lt_sdk.proto import graph_types_pb2, inference_pb2, lgf_pb2
 
 
+def get_edge_key(input_edges):
+    """Returns a hashable key for a list of lgf_pb2.EdgeInfo() protobufs"""
+    return tuple((e.name, e.port) for e in input_edges)
+
+
+class PreparedGraph(object):
+    """
+    A graph that is pruned, exported and loaded once for fixed input and output
+    edges, and can then be run many times. Inputs may have any batch size
+    """
+
+    def __init__(self, runner, input_edges, output_edges):
+        """
+        Params:
+            runner: the GraphRunner object preparing the graph
+            input_edges: a list of lgf_pb2.EdgeInfo() protobufs
+            output_edges: a list of lgf_pb2.EdgeInfo() protobufs
+        """
+        self._edge_key = get_edge_key(input_edges)
+        self._output_edges = output_edges
+        self._lock = threading.Lock()
+
+        # Prune graph
+        with profiler.span("prune graph", profiler.RUNNER):
+            light_graph = runner._light_graph.prune_graph(input_edges=input_edges,
+                                                          output_edges=output_edges,
+                                                          include_inputs=False)
+
+        # Collapse graph if it is not fully supported
+        if not (runner.is_fully_supported(light_graph)):
+            with profiler.span("collapse graph", profiler.RUNNER):
+                light_graph = graph_exporter.ExportGraph.get_collapsed_light_graph(
+                    light_graph)
+
+        # Create exporter
+        graph_type = runner.get_graph_type(light_graph)
+        exporter = graph_exporter_map.GRAPH_EXPORTER_MAP[graph_type](
+            light_graph,
+            runner._hw_spec,
+            runner._sw_config,
+            runner._sim_params,
+            graph_coll=runner._graph_coll)
+
+        # Export the graph
+        with profiler.span("export graph", profiler.RUNNER):
+            self._tmp_dir = py_file_utils.mkdtemp()
+            graph_path = os.path.join(self._tmp_dir, "graph_path")
+            exporter.export_graph(graph_path)
+
+        # External graph runner
+        with profiler.span("load external runner", profiler.RUNNER):
+            self._external_runner = external_graph_runner_map.EXTERNAL_GRAPH_RUNNER_MAP[
+                graph_type](graph_path,
+                            runner._hw_spec,
+                            runner._sw_config,
+                            runner._sim_params,
+                            graph_coll=runner._graph_coll)
+
+        # Outputs of collapsed graph may have different names than output of
+        # original graph
+        self._output_map = GraphRunner._create_output_map(output_edges, light_graph)
+
+    def run(self, inputs):
+        """
+        Params:
+            inputs: a inference_pb2.BatchedInferenceInput() protobuf with the input
+                edges the graph was prepared for
+
+        Returns:
+            outputs: a inference_pb2.BatchedInferenceOutput() protobuf object, see
+                GraphRunner.run()
+        """
+        with profiler.span("check inputs", profiler.RUNNER):
+            GraphRunner._check_inputs(inputs)
+            for inf_inp in inputs.batches:
+                edge_key = get_edge_key([nt.edge_info for nt in inf_inp.inputs])
+                if edge_key != self._edge_key:
+                    raise ValueError("Graph prepared for inputs {0}, got {1}".format(
+                        self._edge_key,
+                        edge_key))
+
+        # Run inference, external runners are not guaranteed to be thread safe
+        outputs = inference_pb2.BatchedInferenceOutput()
+        with profiler.span("run external runner", profiler.RUNNER), self._lock:
+            for inf_inp in inputs.batches:
+                outputs.batches.add().CopyFrom(self._external_runner.run(inf_inp))
+
+        with profiler.span("align outputs", profiler.RUNNER):
+            return GraphRunner._get_aligned_outputs(outputs,
+                                                    self._output_edges,
+                                                    self._output_map)
+
+    def close(self):
+        """Removes the exported graph"""
+        with profiler.span("clean up", profiler.RUNNER):
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
 class GraphRunner(object):
     """
     Class that can run any LightGraph
@@ -31,6 +130,11 @@ class GraphRunner(object):
         self._sim_params = sim_params
         self._graph_coll = graph_coll or graph_collection.NullGraphCollection()
         self._check_consistent_edges(self._light_graph)
+        profiler.enable_from_config(self._sw_config)
+
+        # Maps input edge keys to PreparedGraph objects, see run_prepared()
+        self._prepared_graphs = {}
+        self._prepared_graphs_lock = threading.Lock()
 
     @staticmethod
     def is_fully_supported(light_graph):
@@ -153,56 +257,60 @@ class GraphRunner(object):
                 outputs.batches[i].results[j] corresponds to the edge output_edges[j]
                 from batch inputs.batches[i]
         """
-        # Check inputs and get output_edges
-        self._check_inputs(inputs)
         if output_edges is None:
             output_edges = self._light_graph.output_edges()
 
-        # Prune graph
-        input_edges = [nt.edge_info for nt in inputs.batches[0].inputs]
-        light_graph = self._light_graph.prune_graph(input_edges=input_edges,
-                                                    output_edges=output_edges,
-                                                    include_inputs=False)
-
-        # Collapse graph if it is not fully supported
-        if not (self.is_fully_supported(light_graph)):
-            light_graph = graph_exporter.ExportGraph.get_collapsed_light_graph(
-                light_graph)
+        prepared_graph = self.prepare(
+            input_edges=[nt.edge_info for nt in inputs.batches[0].inputs],
+            output_edges=output_edges)
+        try:
+            return prepared_graph.run(inputs)
+        finally:
+            prepared_graph.close()
 
-        # Create exporter
-        graph_type = self.get_graph_type(light_graph)
-        exporter = graph_exporter_map.GRAPH_EXPORTER_MAP[graph_type](
-            light_graph,
-            self._hw_spec,
-            self._sw_config,
-            self._sim_params,
-            graph_coll=self._graph_coll)
+    def prepare(self, input_edges=None, output_edges=None):
+        """
+        Params:
+            input_edges: a list of lgf_pb2.EdgeInfo() protobufs, if None will use
+                self._light_graph.input_edges()
+            outputs_edges: a list of lgf_pb2.EdgeInfo() protobufs, if None will use
+                self._light_graph.output_edges()
 
-        # Export the graph
-        tmp_dir = py_file_utils.mkdtemp()
-        graph_path = os.path.join(tmp_dir, "graph_path")
-        exporter.export_graph(graph_path)
+        Returns:
+            a PreparedGraph object, the caller must close it
+        """
+        return PreparedGraph(self,
+                             input_edges or self._light_graph.input_edges(),
+                             output_edges or self._light_graph.output_edges())
 
-        # External graph runner
-        external_runner = external_graph_runner_map.EXTERNAL_GRAPH_RUNNER_MAP[
-            graph_type](graph_path,
-                        self._hw_spec,
-                        self._sw_config,
-                        self._sim_params,
-                        graph_coll=self._graph_coll)
-
-        # Run inference
-        outputs = inference_pb2.BatchedInferenceOutput()
-        for inf_inp in inputs.batches:
-            outputs.batches.add().CopyFrom(external_runner.run(inf_inp))
+    def get_prepared_graph(self, input_edges=None):
+        """
+        Returns a PreparedGraph object for input_edges and the outputs of the
+        graph. It is prepared the first time it is requested and then reused until
+        self.close() is called
+        """
+        input_edges = input_edges or self._light_graph.input_edges()
+        edge_key = get_edge_key(input_edges)
+        with self._prepared_graphs_lock:
+            if edge_key not in self._prepared_graphs:
+                self._prepared_graphs[edge_key] = self.prepare(input_edges=input_edges)
+            return self._prepared_graphs[edge_key]
 
-        # Clean up
-        shutil.rmtree(tmp_dir)
+    def run_prepared(self, inputs):
+        """
+        Same as self.run(inputs), but the graph is only pruned, exported and
+        loaded the first time its input edges are seen. Used to serve many
+        requests with the same graph
+        """
+        return self.get_prepared_graph(
+            [nt.edge_info for nt in inputs.batches[0].inputs]).run(inputs)
 
-        # Re-align outputs because outputs of collapsed graph may have different
-        # names than output of original graph
-        output_map = self._create_output_map(output_edges, light_graph)
-        return self._get_aligned_outputs(outputs, output_edges, output_map)
+    def close(self):
+        """Removes the graphs prepared by self.get_prepared_graph()"""
+        with self._prepared_graphs_lock:
+            for prepared_graph in self._prepared_graphs.values():
+                prepared_graph.close()
+            self._prepared_graphs.clear()
 
     def run_single_batch(self, inputs, output_edges=None):
         """
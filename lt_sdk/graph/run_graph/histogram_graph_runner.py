@@ -1,10 +1,23 @@
+import hashlib
+import json
 import logging
+import os
+import shutil
 
+import numpy as np
+
+from lt_sdk.data import batch
 from lt_sdk.graph.run_graph import graph_runner
 from lt_sdk.graph.transform_graph.node_transformers.generic_transforms import (
     opu_op_transform,
 )
-from lt_sdk.proto import calibration_pb2, lgf_pb2, node_filters
+from lt_sdk.proto import (
+    calibration_pb2,
+    inference_pb2,
+    lgf_pb2,
+    node_filters,
+    sw_config_pb2,
+)
 
 
 class HistogramGraphRunner(graph_runner.GraphRunner):
@@ -12,7 +25,33 @@ class HistogramGraphRunner(graph_runner.GraphRunner):
     Graph Runner that can manage histograms/cal data.
     """
 
-    def __init__(self, light_graph, hw_spec, sw_config, sim_params, graph_coll):
+    # In single pass mode, histogram ranges are the smallest power of two
+    # larger than this factor times the max value seen in the seed batches
+    SINGLE_PASS_RANGE_HEADROOM = 2.0
+
+    # Phases of a calibration run saved in checkpoints
+    COLLECT_MAX = "collect_max"
+    POPULATE = "populate"
+
+    CHECKPOINT_STATE_FILE = "calibration_state.json"
+    CHECKPOINT_GRAPH_COLL_FILE_FORMAT = "graph_collection_{0}.bin"
+
+    def __init__(self,
+                 light_graph,
+                 hw_spec,
+                 sw_config,
+                 sim_params,
+                 graph_coll,
+                 single_pass=False,
+                 checkpoint_dir=None):
+        """
+        If single_pass is True, run() collects max values from the seed batches
+        only, see run(). Only calibration should set this, other users of the
+        histograms expect ranges from all the batches.
+
+        If checkpoint_dir is given, run() saves checkpoints to a subdir of
+        checkpoint_dir and resumes from them, see run()
+        """
         super().__init__(light_graph,
                          hw_spec,
                          sw_config,
@@ -25,60 +64,497 @@ class HistogramGraphRunner(graph_runner.GraphRunner):
         # Checks
         assert (not graph_coll.is_null())
         self._hist_coll = graph_coll.histogram_collection()
+        self._single_pass = single_pass
+        self._checkpoint_root_dir = checkpoint_dir
+        self._checkpoint_dir = None
+        self._checkpoint_index = 0
 
-    def _update_hist_coll(self, hist_keys):
-        for index, key in enumerate(hist_keys.keys):
-            mode = self._hist_coll.get_histogram_mode(key)
+    @staticmethod
+    def _get_adaptive_max_val(max_val, range_headroom):
+        return np.exp2(np.ceil(np.log2(max_val * range_headroom)))
 
-            # Do nothing
-            if mode in {calibration_pb2.HM_INVALID, calibration_pb2.HM_PADDING}:
-                continue
+    def _update_hist_coll(self, keys, range_headroom=None):
+        keys = np.array(keys, dtype=np.uint32)
+        modes = self._hist_coll.get_histogram_modes(keys)
 
-            # Convert max to populate
-            elif mode == calibration_pb2.HM_UPDATE_MAX:
-                hist_max_val = self._hist_coll.get_histogram_max_val(key)
-                if self._sw_config.ignore_empty_histograms and hist_max_val == 0:
-                    # Set max value to arbitrary number
-                    self._hist_coll.set_histogram_max_val(key, 1)
-                else:
-                    # Max value should be non-zero
-                    assert (hist_max_val > 0)
-                self._hist_coll.update_histogram_mode(key,
-                                                      calibration_pb2.HM_POPULATE_HIST)
+        # Invalid update, histograms in HM_INVALID or HM_PADDING mode are skipped
+        invalid = ~np.isin(modes,
+                           [
+                               calibration_pb2.HM_INVALID,
+                               calibration_pb2.HM_PADDING,
+                               calibration_pb2.HM_UPDATE_MAX
+                           ])
+        if np.any(invalid):
+            raise ValueError(
+                "Cannot update histogram collection mode when current mode is {}".
+                format(modes[invalid][0]))
 
-            # Invalid update
-            else:
-                raise ValueError(
-                    "Cannot update histogram collection mode when current mode is {}".
-                    format(mode))
+        # Convert max to populate
+        keys = keys[modes == calibration_pb2.HM_UPDATE_MAX]
+        hist_max_vals = self._hist_coll.get_histogram_max_vals(keys)
+        non_empty = np.ones(keys.shape, dtype=bool)
+        if self._sw_config.ignore_empty_histograms:
+            # Set max value of empty histograms to arbitrary number
+            non_empty = hist_max_vals != 0
+            self._hist_coll.set_histogram_max_vals(keys[~non_empty], 1)
 
-    def convert_to_populate_mode(self):
+        # Max value should be non-zero
+        assert (np.all(hist_max_vals[non_empty] > 0))
+        if range_headroom is not None:
+            self._hist_coll.set_histogram_max_vals(
+                keys[non_empty],
+                self._get_adaptive_max_val(hist_max_vals[non_empty],
+                                           range_headroom))
+
+        self._hist_coll.update_histogram_modes(keys, calibration_pb2.HM_POPULATE_HIST)
+
+    def _get_hist_keys(self):
+        """Returns a list of common_pb2.HistKeys() protobufs in the graph"""
+        all_hist_keys = []
         for node in self._light_graph.nodes():
             if self._hist_filter.matches(node, self._light_graph):
                 if node.HasField(lgf_pb2.LNF.collect_hist.DESCRIPTOR.name):
-                    self._update_hist_coll(node.collect_hist.hist_keys)
+                    all_hist_keys.append(node.collect_hist.hist_keys)
                 elif node.WhichOneof("node") in self._sw_config.node_types.opu_nodes:
                     matmul = opu_op_transform.OPUOpTransform.get_matmul_from_opu_node(
                         node)
-                    self._update_hist_coll(matmul.hist_keys_before_adc)
-                    self._update_hist_coll(matmul.hist_keys_after_adc)
+                    all_hist_keys.append(matmul.hist_keys_before_adc)
+                    all_hist_keys.append(matmul.hist_keys_after_adc)
+
+        return all_hist_keys
+
+    def _get_all_hist_keys(self):
+        """Returns a list of all the histogram keys in the graph"""
+        return [key for hist_keys in self._get_hist_keys() for key in hist_keys.keys]
+
+    def convert_to_populate_mode(self, range_headroom=None):
+        """
+        Converts histograms from HM_UPDATE_MAX mode to HM_POPULATE_HIST mode. If
+        range_headroom is provided, the histogram max values are increased to the
+        smallest power of two larger than range_headroom times the current max value
+        """
+        self._update_hist_coll(self._get_all_hist_keys(), range_headroom=range_headroom)
+
+    def _check_histogram_ranges(self):
+        """Warns about histograms that did not contain the entire distribution"""
+        keys = np.array(self._get_all_hist_keys(), dtype=np.uint32)
+        modes = self._hist_coll.get_histogram_modes(keys)
+        keys = keys[modes == calibration_pb2.HM_POPULATE_HIST]
+        values = self._hist_coll.get_histogram_values(keys)
+
+        cal_hist = calibration_pb2.CalibrationHistogram
+        hist_max = values[:, cal_hist.HISTOGRAM_MAX]
+        dist_max = values[:, cal_hist.DISTRIBUTION_MAX]
+        clipped = dist_max > hist_max
+        for key, key_hist_max, key_dist_max in zip(keys[clipped],
+                                                   hist_max[clipped],
+                                                   dist_max[clipped]):
+            logging.debug("Histogram %d clipped: max %f, distribution max %f",
+                          key,
+                          key_hist_max,
+                          key_dist_max)
+
+        num_clipped = np.count_nonzero(clipped)
+        if num_clipped:
+            logging.warning(
+                "%d histograms saw values outside of the range found from the seed " +
+                "batches, increase num_calibration_seed_batches if scales differ " +
+                "from two pass calibration",
+                num_clipped)
+
+    def _run_shards(self, inputs, output_edges=None):
+        """
+        Performs super().run() on each shard of inputs. Outputs are only returned
+        when inputs is a single inference_pb2.BatchedInferenceInput() protobuf,
+        otherwise they are discarded so only one shard is in memory at a time
+        """
+        if isinstance(inputs, inference_pb2.BatchedInferenceInput):
+            return super().run(inputs, output_edges=output_edges)
+
+        for shard in batch.iter_shards(inputs):
+            super().run(shard, output_edges=output_edges)
+
+        return None
+
+    @staticmethod
+    def _iter_chunks(inputs, chunk_size, num_skip_batches=0, skip_fn=None):
+        """
+        Yields inference_pb2.BatchedInferenceInput() with chunk_size batches,
+        starting after the first num_skip_batches batches of inputs. If skip_fn
+        is provided, it is called on each of the skipped batches
+        """
+        chunk = inference_pb2.BatchedInferenceInput()
+        for shard in batch.iter_shards(inputs):
+            if skip_fn is not None:
+                for inf_inputs in shard.batches[:num_skip_batches]:
+                    skip_fn(inf_inputs)
+
+            shard_batches = shard.batches[num_skip_batches:]
+            num_skip_batches = max(num_skip_batches - len(shard.batches), 0)
+            for inf_inputs in shard_batches:
+                chunk.batches.add().CopyFrom(inf_inputs)
+                if len(chunk.batches) == chunk_size:
+                    yield chunk
+                    chunk = inference_pb2.BatchedInferenceInput()
+
+        if chunk.batches:
+            yield chunk
+
+    @staticmethod
+    def _get_scales_array(scales_data):
+        scales = []
+        for pair in scales_data.data:
+            if pair.HasField(
+                    calibration_pb2.NodeScalePair.scale_info_list.DESCRIPTOR.name):
+                scales.extend(s.scale for s in pair.scale_info_list.l)
+            else:
+                scales.append(pair.scale_info.scale)
+
+        return np.array(scales)
+
+    def _scales_converged(self, scales, prev_scales):
+        rel_diff = np.abs(scales - prev_scales) / np.maximum(
+            np.abs(prev_scales),
+            np.finfo(np.float32).eps)
+        return np.all(rel_diff < self._sw_config.calibration_convergence_tolerance)
+
+    def _new_state(self, phase):
+        """Returns the state of a calibration run at the start of phase"""
+        return {
+            "phase": phase,
+            "num_batches": 0,
+            "inputs_digest": "",
+            "prev_scales": None,
+            "num_converged_checks": 0,
+        }
+
+    def _run_chunks(self, state, inputs, get_scales_data=None, output_edges=None):
+        """
+        Runs the batches of inputs after the first state["num_batches"] through
+        super().run() a chunk at a time and updates state.
+
+        If get_scales_data is provided and
+        self._sw_config.calibration_convergence_check_interval > 0, chunks have
+        calibration_convergence_check_interval batches and this stops once the
+        scales from get_scales_data() have converged.
+
+        If checkpoints are enabled, a checkpoint is saved every
+        calibration_checkpoint_interval batches. The checkpoint stores a digest of
+        the batches run so far, when resuming it must match the skipped batches
+        """
+        check_interval = self._sw_config.calibration_convergence_check_interval
+        check_convergence = get_scales_data is not None and check_interval > 0
+        checkpoint_interval = max(self._sw_config.calibration_checkpoint_interval, 1)
+        patience = max(self._sw_config.calibration_convergence_patience, 1)
+
+        prev_scales = state["prev_scales"]
+        if prev_scales is not None:
+            prev_scales = np.array(prev_scales)
+
+        # Recompute the digest of the skipped batches
+        checkpoint_digest = state["inputs_digest"]
+        state["inputs_digest"] = ""
+
+        def update_digest(inf_inputs):
+            state["inputs_digest"] = self._chain_digest(state["inputs_digest"],
+                                                        inf_inputs)
+
+        checked_digest = False
+        for chunk in self._iter_chunks(
+                inputs,
+                check_interval if check_convergence else checkpoint_interval,
+                num_skip_batches=state["num_batches"],
+                skip_fn=update_digest):
+            if not checked_digest:
+                self._check_inputs_digest(state, checkpoint_digest)
+                checked_digest = True
+
+            super().run(chunk, output_edges=output_edges)
+            for inf_inputs in chunk.batches:
+                update_digest(inf_inputs)
+            prev_num_batches = state["num_batches"]
+            state["num_batches"] += len(chunk.batches)
+
+            converged = False
+            if check_convergence:
+                scales = self._get_scales_array(get_scales_data())
+                if prev_scales is not None and self._scales_converged(
+                        scales,
+                        prev_scales):
+                    state["num_converged_checks"] += 1
+                else:
+                    state["num_converged_checks"] = 0
+                prev_scales = scales
+                state["prev_scales"] = scales.tolist()
+                converged = state["num_converged_checks"] >= patience
+
+            if (self._checkpoint_dir is not None and
+                    state["num_batches"] // checkpoint_interval >
+                    prev_num_batches // checkpoint_interval):
+                self._save_checkpoint(state)
+
+            if converged:
+                logging.info("-HistogramGraphRunner scales converged")
+                break
+
+        if not checked_digest:
+            self._check_inputs_digest(state, checkpoint_digest)
+
+    @staticmethod
+    def _chain_digest(digest, inf_inputs):
+        """Returns the digest of the batches of digest followed by inf_inputs"""
+        hasher = hashlib.sha256(digest.encode("utf-8"))
+        hasher.update(inf_inputs.SerializeToString(deterministic=True))
+        return hasher.hexdigest()
 
-    def run(self, inputs, output_edges=None):
+    def _check_inputs_digest(self, state, checkpoint_digest):
+        """
+        Raises a ValueError if the batches skipped when resuming from a
+        checkpoint are not the batches the checkpoint was saved with
+        """
+        if state["inputs_digest"] != checkpoint_digest:
+            raise ValueError(
+                "Calibration inputs do not match the first {0} batches of checkpoint "
+                "{1}, remove it to start over".format(state["num_batches"],
+                                                      self._checkpoint_dir))
+
+    def _populate_until_converged(self, inputs, get_scales_data, output_edges=None):
+        """
+        Populates the histograms calibration_convergence_check_interval batches at
+        a time and stops once the scales from get_scales_data() have converged
+        """
+        state = self._new_state(self.POPULATE)
+        self._run_chunks(state,
+                         inputs,
+                         get_scales_data=get_scales_data,
+                         output_edges=output_edges)
+
+        logging.info("-HistogramGraphRunner populated histograms with %d batches",
+                     state["num_batches"])
+
+    def _populate(self, inputs, get_scales_data=None, output_edges=None):
+        if (get_scales_data is not None and
+                self._sw_config.calibration_convergence_check_interval > 0):
+            return self._populate_until_converged(inputs,
+                                                  get_scales_data,
+                                                  output_edges=output_edges)
+
+        return self._run_shards(inputs, output_edges=output_edges)
+
+    def _get_seed_inputs(self, inputs):
+        num_seed_batches = max(self._sw_config.num_calibration_seed_batches, 1)
+        seed_inputs = inference_pb2.BatchedInferenceInput()
+        for shard in batch.iter_shards(inputs):
+            seed_inputs.batches.extend(
+                shard.batches[:num_seed_batches - len(seed_inputs.batches)])
+            if len(seed_inputs.batches) >= num_seed_batches:
+                break
+
+        return seed_inputs
+
+    def _run_single_pass(self, inputs, get_scales_data=None, output_edges=None):
+        # Collect max from the seed batches only
+        seed_inputs = self._get_seed_inputs(inputs)
+        logging.info("-HistogramGraphRunner collecting max from %d seed batches",
+                     len(seed_inputs.batches))
+        super().run(seed_inputs, output_edges=output_edges)
+
+        self.convert_to_populate_mode(range_headroom=self.SINGLE_PASS_RANGE_HEADROOM)
+
+        # Populate histograms with all the batches
+        logging.info("-HistogramGraphRunner populating histograms")
+        outputs = self._populate(inputs,
+                                 get_scales_data=get_scales_data,
+                                 output_edges=output_edges)
+        self._check_histogram_ranges()
+
+        return outputs
+
+    @staticmethod
+    def _update_inputs_digest(hasher, inputs):
+        """
+        Updates hasher with a fingerprint of inputs: the number of shards, the
+        number of batches in the first shard and the contents of the first batch.
+        It is cheap to compute but does not cover the other batches, see
+        self._check_inputs_digest()
+        """
+        num_shards = 1
+        if not isinstance(inputs, inference_pb2.BatchedInferenceInput):
+            num_shards = len(inputs)
+
+        first_shard = next(batch.iter_shards(inputs), None)
+        num_batches = len(first_shard.batches) if first_shard is not None else 0
+        hasher.update("{0} {1}".format(num_shards, num_batches).encode("utf-8"))
+        if num_batches:
+            hasher.update(first_shard.batches[0].SerializeToString(deterministic=True))
+
+    def _get_checkpoint_dir(self, inputs):
+        """
+        Returns the checkpoint dir of this calibration run. The dir depends on a
+        digest of the calibration graph, the software config and a fingerprint of
+        inputs, so different calibration graphs never share checkpoints. Inputs
+        with the same fingerprint share a dir, resuming from a checkpoint of
+        different inputs raises a ValueError
+        """
+        sw_config = sw_config_pb2.SoftwareConfig()
+        sw_config.CopyFrom(self._sw_config)
+        sw_config.ClearField("calibration_checkpoint_dir")
+        sw_config.ClearField("calibration_checkpoint_interval")
+
+        hasher = hashlib.sha256()
+        hasher.update(self._light_graph.as_lgf_pb().SerializeToString(deterministic=True))
+        hasher.update(sw_config.SerializeToString(deterministic=True))
+        hasher.update(str(self._single_pass).encode("utf-8"))
+        self._update_inputs_digest(hasher, inputs)
+
+        return os.path.join(self._checkpoint_root_dir, hasher.hexdigest())
+
+    def _save_checkpoint(self, state):
+        """
+        Saves the graph collection and state to self._checkpoint_dir. The state
+        file is replaced after the new graph collection is written, so a run that
+        dies while saving resumes from the previous checkpoint
+        """
+        os.makedirs(self._checkpoint_dir, exist_ok=True)
+        prev_graph_coll_path = os.path.join(
+            self._checkpoint_dir,
+            self.CHECKPOINT_GRAPH_COLL_FILE_FORMAT.format(self._checkpoint_index))
+
+        self._checkpoint_index += 1
+        state["checkpoint_index"] = self._checkpoint_index
+        self._graph_coll.serialize_to_file(
+            os.path.join(
+                self._checkpoint_dir,
+                self.CHECKPOINT_GRAPH_COLL_FILE_FORMAT.format(self._checkpoint_index)))
+
+        state_path = os.path.join(self._checkpoint_dir, self.CHECKPOINT_STATE_FILE)
+        with open(state_path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(state_path + ".tmp", state_path)
+
+        if os.path.exists(prev_graph_coll_path):
+            os.remove(prev_graph_coll_path)
+
+    def _load_checkpoint(self):
+        """
+        Loads the graph collection of the checkpoint in self._checkpoint_dir and
+        returns its state, returns a new state if there is no checkpoint
+        """
+        state_path = os.path.join(self._checkpoint_dir, self.CHECKPOINT_STATE_FILE)
+        if not os.path.exists(state_path):
+            return self._new_state(self.COLLECT_MAX)
+
+        with open(state_path, "r") as f:
+            state = json.load(f)
+
+        self._checkpoint_index = state["checkpoint_index"]
+        self._graph_coll.parse_from_file(
+            os.path.join(
+                self._checkpoint_dir,
+                self.CHECKPOINT_GRAPH_COLL_FILE_FORMAT.format(self._checkpoint_index)))
+        logging.info("-HistogramGraphRunner resuming from checkpoint %s: %s after %d " +
+                     "batches",
+                     self._checkpoint_dir,
+                     state["phase"],
+                     state["num_batches"])
+
+        return state
+
+    def _run_with_checkpoints(self, inputs, get_scales_data=None, output_edges=None):
+        """Same as run(), but saves checkpoints and resumes from them"""
+        self._checkpoint_dir = self._get_checkpoint_dir(inputs)
+        state = self._load_checkpoint()
+
+        if state["phase"] == self.COLLECT_MAX:
+            if self._single_pass:
+                max_inputs = self._get_seed_inputs(inputs)
+                range_headroom = self.SINGLE_PASS_RANGE_HEADROOM
+            else:
+                max_inputs = inputs
+                range_headroom = None
+
+            logging.info("-HistogramGraphRunner collecting max")
+            self._run_chunks(state, max_inputs, output_edges=output_edges)
+            self.convert_to_populate_mode(range_headroom=range_headroom)
+
+            state = self._new_state(self.POPULATE)
+            self._save_checkpoint(state)
+
+        if state["phase"] == self.POPULATE:
+            logging.info("-HistogramGraphRunner populating histograms")
+            self._run_chunks(state,
+                             inputs,
+                             get_scales_data=get_scales_data,
+                             output_edges=output_edges)
+            logging.info("-HistogramGraphRunner populated histograms with %d batches",
+                         state["num_batches"])
+            if self._single_pass:
+                self._check_histogram_ranges()
+
+        # The histograms are complete, a later run starts over
+        shutil.rmtree(self._checkpoint_dir)
+        return None
+
+    def run(self, inputs, output_edges=None, get_scales_data=None):
         """
         Performs super().run() twice. The first time, super().run() updates the
         max values in self._graph_coll.histogram_collection(). The second time,
         super().run() updates the counts in the histograms in
         self._graph_coll.histogram_collection()
 
+        inputs can either be a single inference_pb2.BatchedInferenceInput() protobuf
+        or an iterable of inference_pb2.BatchedInferenceInput() shards, such as a
+        batch.ShardedBatchedInferenceInput(). Shards are streamed through
+        super().run() one at a time during each pass, so the iterable must support
+        being iterated over more than once.
+
         Returns the inference_pb2.BatchedInferenceOutput() produced. These should be the
-        same during the first and second time super().run() is called.
+        same during the first and second time super().run() is called. Returns None
+        when inputs are sharded.
+
+        If the runner was created with single_pass=True, the first super().run()
+        only uses the seed batches. Histogram ranges are then rounded up to a power
+        of two with some headroom, so values somewhat larger than the ones in the
+        seed batches still fall into the histograms during the single pass over all
+        the batches. The ranges are not adapted after that, values outside of them
+        are clipped and only reported with a warning. Scales can differ from two
+        pass calibration when the range of the data drifts past the headroom.
+
+        If get_scales_data is provided and
+        self._sw_config.calibration_convergence_check_interval > 0, the histograms
+        are populated a few batches at a time and get_scales_data() is called after
+        each check interval. get_scales_data() should return a
+        calibration_pb2.QuantScalesData() protobuf computed from the current
+        histograms. Populating the histograms stops early once the scales have
+        converged. Outputs are not collected in this mode and None is returned.
+
+        If the runner was created with a checkpoint_dir, the graph collection
+        and the number of batches run in the current pass are saved every
+        self._sw_config.calibration_checkpoint_interval batches, and a later run
+        of the same calibration graph with the same inputs resumes from the last
+        checkpoint. The histograms are the same as without checkpoints, since
+        every batch is still run exactly once per pass. The checkpoints are
+        removed once the histograms are populated. Outputs are not collected in
+        this mode and None is returned.
         """
+        if self._checkpoint_root_dir:
+            return self._run_with_checkpoints(inputs,
+                                              get_scales_data=get_scales_data,
+                                              output_edges=output_edges)
+
+        if self._single_pass:
+            return self._run_single_pass(inputs,
+                                         get_scales_data=get_scales_data,
+                                         output_edges=output_edges)
+
         # Collect max
         logging.info("-HistogramGraphRunner collecting max")
-        super().run(inputs, output_edges=output_edges)
+        self._run_shards(inputs, output_edges=output_edges)
 
         self.convert_to_populate_mode()
 
         # Populate histograms
         logging.info("-HistogramGraphRunner populating histograms")
-        return super().run(inputs, output_edges=output_edges)
+        return self._populate(inputs,
+                              get_scales_data=get_scales_data,
+                              output_edges=output_edges)
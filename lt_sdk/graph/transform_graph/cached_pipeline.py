@@ -1,6 +1,7 @@
 import logging
 import os
 
+from lt_sdk.common import profiler
 from lt_sdk.graph import lgf_graph
 from lt_sdk.graph.transform_graph import utils
 
@@ -48,20 +49,22 @@ class PipelineStage(object):
     def write_stage(self, light_graph):
         fname = self._cache_fname()
         lgf_pb = light_graph.as_lgf_pb()
-        lgf_graph.LightGraph.write_lgf_pb(lgf_pb, fname)
+        lgf_graph.LightGraph.write_lgf_pb(lgf_pb, fname, use_external_weights=True)
 
     def transform(self, light_graph):
-        if self._sw_config.cache_dir:
-            cached = self.load()
-            if cached:
-                logging.info("-Loaded from cached file!")
-                return cached
-
-        logging.info("-Executing.")
-        new_graph = self.execute(light_graph)
-        if self._sw_config.cache_dir:
-            self.write_stage(new_graph)
-        return new_graph
+        with profiler.span(self.name, profiler.STAGE):
+            if self._sw_config.cache_dir:
+                cached = self.load()
+                if cached:
+                    logging.info("-Loaded from cached file!")
+                    return cached
+
+            logging.info("-Executing.")
+            new_graph = self.execute(light_graph)
+            if self._sw_config.cache_dir:
+                with profiler.span("{0} write cache".format(self.name), profiler.STAGE):
+                    self.write_stage(new_graph)
+            return new_graph
 
 
 class FnStage(PipelineStage):
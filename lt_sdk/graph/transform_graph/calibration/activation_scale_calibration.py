@@ -47,7 +47,9 @@ def main(light_graph,
 
     Params:
         light_graph: a LightGraph object that has not been transformed
-        calibration_data: a inference_pb2.BatchedInferenceInput() protobufs
+        calibration_data: a inference_pb2.BatchedInferenceInput() protobuf or an
+            iterable of inference_pb2.BatchedInferenceInput() shards, see
+            HistogramGraphRunner.run()
         hw_specs: a hw_spec_pb2.HardwareSpecs() protobuf
         sw_config: a sw_config_pb2.SoftwareConfig() protobuf
         sim_params: a sim_params_pb2.SimulationParams() protobuf
@@ -67,12 +69,20 @@ def main(light_graph,
                                       hist_coll))
         calib_graph = convert_to_calib_graph.process_transforms(light_graph)
 
-        runner = histogram_graph_runner.HistogramGraphRunner(calib_graph,
-                                                             hw_specs,
-                                                             sw_config,
-                                                             sim_params,
-                                                             graph_coll)
-        runner.run(calibration_data)
+        runner = histogram_graph_runner.HistogramGraphRunner(
+            calib_graph,
+            hw_specs,
+            sw_config,
+            sim_params,
+            graph_coll,
+            single_pass=sw_config.single_pass_calibration,
+            checkpoint_dir=sw_config.calibration_checkpoint_dir)
+        runner.run(calibration_data,
+                   get_scales_data=lambda: get_scales_data(
+                       hist_coll,
+                       nodes_to_calibrate,
+                       convert_to_calib_graph,
+                       sw_config))
 
         # Get scales data
         logging.info("-Computing Scales")
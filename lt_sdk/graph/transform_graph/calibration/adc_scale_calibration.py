@@ -75,7 +75,9 @@ def main(light_graph, calibration_data, hw_specs, sw_config, sim_params):
     Params:
         light_graph: graph that has already been quantized and transformed to
             use custom ops
-        calibration_data: a inference_pb2.BatchedInferenceInput() protobufs
+        calibration_data: a inference_pb2.BatchedInferenceInput() protobuf or an
+            iterable of inference_pb2.BatchedInferenceInput() shards, see
+            HistogramGraphRunner.run()
         hw_specs: a hw_spec_pb2.HardwareSpecs() protobuf
         sw_config: a sw_config_pb2.SoftwareConfig() protobuf
         sim_params: a sim_params_pb2.SimulationParams() protobuf
@@ -103,8 +105,16 @@ def main(light_graph, calibration_data, hw_specs, sw_config, sim_params):
             hw_specs,
             sw_config,
             get_virtual_sim_params(sim_params),
-            graph_coll)
-        runner.run(calibration_data)
+            graph_coll,
+            single_pass=sw_config.single_pass_calibration,
+            checkpoint_dir=sw_config.calibration_checkpoint_dir)
+        runner.run(calibration_data,
+                   get_scales_data=lambda: get_scales_data(hist_coll,
+                                                           light_graph,
+                                                           convert_to_calib_graph,
+                                                           hw_specs,
+                                                           sw_config,
+                                                           sim_params))
 
         # Get scales data
         logging.info("-Computing Scales")
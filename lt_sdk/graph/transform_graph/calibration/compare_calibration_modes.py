@@ -0,0 +1,127 @@
+import logging
+
+import numpy as np
+
+from lt_sdk.graph.transform_graph import utils
+from lt_sdk.graph.transform_graph.calibration import (
+    activation_scale_calibration,
+    adc_scale_calibration,
+)
+from lt_sdk.proto import calibration_pb2, sw_config_pb2
+
+
+def _get_scales(node_scale_pair):
+    if node_scale_pair.HasField(
+            calibration_pb2.NodeScalePair.scale_info_list.DESCRIPTOR.name):
+        return np.array([s.scale for s in node_scale_pair.scale_info_list.l])
+    else:
+        return np.array([node_scale_pair.scale_info.scale])
+
+
+def compare_quant_scales_data(scales_data, other_scales_data):
+    """
+    Params:
+        scales_data: a calibration_pb2.QuantScalesData() protobuf
+        other_scales_data: a calibration_pb2.QuantScalesData() protobuf for the
+            same nodes as scales_data
+
+    Returns:
+        a dictionary mapping node names to the max relative difference between
+        the scales of that node
+    """
+    other_scales = {
+        pair.node_info.node_name: _get_scales(pair) for pair in other_scales_data.data
+    }
+
+    rel_diffs = {}
+    for pair in scales_data.data:
+        scales = _get_scales(pair)
+        diff = np.abs(scales - other_scales[pair.node_info.node_name])
+        rel_diffs[pair.node_info.node_name] = float(
+            np.max(diff / np.maximum(np.abs(scales),
+                                     np.finfo(np.float32).eps)))
+
+    return rel_diffs
+
+
+def log_report(name, rel_diffs):
+    utils.log_message("{} single pass vs two pass".format(name))
+    for node_name, rel_diff in sorted(rel_diffs.items(), key=lambda x: -x[1]):
+        logging.info("{0}: {1:.3e}".format(node_name, rel_diff))
+    if rel_diffs:
+        logging.info("Max relative difference: {0:.3e}".format(max(rel_diffs.values())))
+        logging.info("Mean relative difference: {0:.3e}".format(
+            np.mean(list(rel_diffs.values()))))
+
+
+def _get_sw_configs(sw_config):
+    two_pass_sw_config = sw_config_pb2.SoftwareConfig()
+    two_pass_sw_config.CopyFrom(sw_config)
+    two_pass_sw_config.single_pass_calibration = False
+
+    single_pass_sw_config = sw_config_pb2.SoftwareConfig()
+    single_pass_sw_config.CopyFrom(sw_config)
+    single_pass_sw_config.single_pass_calibration = True
+
+    return two_pass_sw_config, single_pass_sw_config
+
+
+def compare_activation_scales(light_graph,
+                              calibration_data,
+                              hw_specs,
+                              sw_config,
+                              sim_params,
+                              nodes_to_calibrate):
+    """
+    Runs activation scale calibration with two pass and single pass histograms,
+    see activation_scale_calibration.main() for params
+
+    Returns:
+        a dictionary mapping node names to the max relative difference of the
+        activation scales
+    """
+    two_pass_sw_config, single_pass_sw_config = _get_sw_configs(sw_config)
+    two_pass_data = activation_scale_calibration.main(light_graph,
+                                                      calibration_data,
+                                                      hw_specs,
+                                                      two_pass_sw_config,
+                                                      sim_params,
+                                                      nodes_to_calibrate)
+    single_pass_data = activation_scale_calibration.main(light_graph,
+                                                         calibration_data,
+                                                         hw_specs,
+                                                         single_pass_sw_config,
+                                                         sim_params,
+                                                         nodes_to_calibrate)
+
+    rel_diffs = compare_quant_scales_data(two_pass_data, single_pass_data)
+    log_report("Activation Scales", rel_diffs)
+
+    return rel_diffs
+
+
+def compare_adc_scales(light_graph, calibration_data, hw_specs, sw_config, sim_params):
+    """
+    Runs ADC scale calibration with two pass and single pass histograms,
+    see adc_scale_calibration.main() for params
+
+    Returns:
+        a dictionary mapping node names to the max relative difference of the
+        ADC scales
+    """
+    two_pass_sw_config, single_pass_sw_config = _get_sw_configs(sw_config)
+    two_pass_data, _ = adc_scale_calibration.main(light_graph,
+                                                  calibration_data,
+                                                  hw_specs,
+                                                  two_pass_sw_config,
+                                                  sim_params)
+    single_pass_data, _ = adc_scale_calibration.main(light_graph,
+                                                     calibration_data,
+                                                     hw_specs,
+                                                     single_pass_sw_config,
+                                                     sim_params)
+
+    rel_diffs = compare_quant_scales_data(two_pass_data, single_pass_data)
+    log_report("ADC Scales", rel_diffs)
+
+    return rel_diffs
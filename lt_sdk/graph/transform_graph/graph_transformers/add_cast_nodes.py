@@ -12,11 +12,16 @@ from lt_sdk.graph.transform_graph.graph_transformers import graph_transform
 from lt_sdk.graph.transform_graph.node_transformers.generic_transforms import (
     base_transform,
 )
-from lt_sdk.proto import graph_types_pb2, lgf_pb2, ops_pb2, transform_result_pb2
+from lt_sdk.proto import graph_types_pb2, lgf_pb2, transform_result_pb2
 
 
 class AddCastNodes(graph_transform.GraphTransform):
 
+    TEMPLATE_FILE_FORMAT = "cast_node_template_{}_{}_{}_{}.pb"
+
+    # Original cast nodes, one per (input dtype, output dtype) pair
+    _TEMPLATE_CACHE = {}
+
     def __init__(self, sw_config):
         self._sw_config = sw_config
 
@@ -32,7 +37,7 @@ class AddCastNodes(graph_transform.GraphTransform):
         return name
 
     @staticmethod
-    def _get_original_tf_node(lnf_node, sw_config, op=ops_pb2.CAST):
+    def _build_original_tf_node(lnf_node, sw_config):
         g = tf.Graph()
         with g.as_default():
             with tf.Session(graph=g) as sess:
@@ -61,6 +66,70 @@ class AddCastNodes(graph_transform.GraphTransform):
         tf_node = light_graph.get_node_by_name(lnf_node.name)
         return tf_node.original
 
+    @staticmethod
+    def _get_template_key(lnf_node):
+        return (lnf_node.inputs[0].dtype.t,
+                lnf_node.inputs[0].dtype.p,
+                lnf_node.outputs[0].dtype.t,
+                lnf_node.outputs[0].dtype.p)
+
+    @staticmethod
+    def _get_template_path(key, sw_config):
+        if not sw_config.cache_dir:
+            return None
+
+        return os.path.join(sw_config.cache_dir,
+                            AddCastNodes.TEMPLATE_FILE_FORMAT.format(*key))
+
+    @staticmethod
+    def _get_template(lnf_node, sw_config):
+        """
+        Returns a lgf_pb2.OriginalNode() protobuf for a cast node with the same
+        input and output dtypes as lnf_node. Templates are cached in memory
+        and in sw_config.cache_dir if it is set.
+        """
+        key = AddCastNodes._get_template_key(lnf_node)
+        if key in AddCastNodes._TEMPLATE_CACHE:
+            return AddCastNodes._TEMPLATE_CACHE[key]
+
+        template = lgf_pb2.OriginalNode()
+        template_path = AddCastNodes._get_template_path(key, sw_config)
+        if template_path is not None and os.path.exists(template_path):
+            with open(template_path, "rb") as f:
+                template.ParseFromString(f.read())
+        else:
+            template.CopyFrom(AddCastNodes._build_original_tf_node(lnf_node, sw_config))
+            if template_path is not None:
+                # Replace the file instead of writing it in place, so concurrent
+                # processes never read a partially written template
+                os.makedirs(sw_config.cache_dir, exist_ok=True)
+                tmp_path = "{0}.{1}.tmp".format(template_path, os.getpid())
+                with open(tmp_path, "wb") as f:
+                    f.write(template.SerializeToString())
+                os.replace(tmp_path, template_path)
+
+        AddCastNodes._TEMPLATE_CACHE[key] = template
+        return template
+
+    @staticmethod
+    def _get_original_tf_node(lnf_node, sw_config):
+        """
+        Returns a lgf_pb2.OriginalNode() protobuf for the cast node lnf_node.
+        The serialized tensorflow node def of a cast only depends on the node name,
+        its input name and the dtypes, so we patch a cached template instead of
+        creating a new tensorflow graph for every cast node.
+        """
+        original = lgf_pb2.OriginalNode()
+        original.CopyFrom(AddCastNodes._get_template(lnf_node, sw_config))
+
+        tf_node_def = tf.NodeDef()
+        tf_node_def.ParseFromString(original.serialized_node)
+        tf_node_def.name = lnf_node.name
+        tf_node_def.input[:] = [lnf_node.inputs[0].name]
+        original.serialized_node = tf_node_def.SerializeToString()
+
+        return original
+
     @staticmethod
     def process_cast_node(cast_node, input_node, output_node, sw_config):
         if input_node.supported and output_node.supported:
@@ -1,8 +1,28 @@
 import logging
 
+from lt_sdk.graph import lgf_graph
+from lt_sdk.graph.transform_graph import utils
 from lt_sdk.graph.transform_graph.graph_transformers import graph_transform
 from lt_sdk.graph.transform_graph.node_transformers import node_transform_map
-from lt_sdk.proto import node_filters
+from lt_sdk.proto import lgf_pb2, node_filters
+
+# Read-only graph and node transforms of a worker process,
+# set by _init_transform_worker()
+_WORKER_STATE = {}
+
+
+def _init_transform_worker(serialized_lgf_pb, node_transforms):
+    lgf_pb = lgf_pb2.LGF()
+    lgf_pb.ParseFromString(serialized_lgf_pb)
+    _WORKER_STATE["light_graph"] = lgf_graph.LightGraph.lgf_pb_to_graph(lgf_pb)
+    _WORKER_STATE["node_transforms"] = node_transforms
+
+
+def _transform_node(args):
+    transform_index, node_name = args
+    light_graph = _WORKER_STATE["light_graph"]
+    node_transform = _WORKER_STATE["node_transforms"][transform_index]
+    return node_transform.transform(light_graph.get_node_by_name(node_name), light_graph)
 
 
 class ApplyNodeMap(graph_transform.GraphTransform):
@@ -24,26 +44,51 @@ class ApplyNodeMap(graph_transform.GraphTransform):
         filter in self.node_map, for any node where the filter matches that node,
         add the transforms from self.node_map[filter].transform(node, light_graph)
         """
-        filter_nodes = {filt: [] for filt in self._node_map.keys()}
-        for node in light_graph.nodes():
-            matched = False
-            for filt in self._node_map.keys():
-                if filt.matches(node, light_graph):
-                    if matched:
-                        raise ValueError("node {0} matches more than one filter.".format(
-                            node.name))
-                    filter_nodes[filt].append(node)
-                    matched = True
-
-        results = []
-        for filt, nodes in filter_nodes.items():
+        # Filters are answered with index lookups where possible
+        node_index = light_graph.node_index()
+        filter_nodes = {
+            filt: light_graph.get_matching_nodes(filt,
+                                                 node_index=node_index)
+            for filt in self._node_map.keys()
+        }
+
+        matched_node_names = set()
+        multiple_matches = set()
+        for nodes in filter_nodes.values():
+            node_names = {node.name for node in nodes}
+            multiple_matches.update(matched_node_names.intersection(node_names))
+            matched_node_names.update(node_names)
+
+        if multiple_matches:
+            raise ValueError("node {0} matches more than one filter.".format(
+                node_index.sort_names(multiple_matches)[0]))
+
+        # (index of node transform, node) for each node to transform
+        node_transforms = list(self._node_map.values())
+        to_transform = []
+        for i, nodes in enumerate(filter_nodes.values()):
             for node in nodes:
-                if self._node_map[filt].can_transform(node, light_graph):
-                    results.append(self._node_map[filt].transform(node, light_graph))
+                if node_transforms[i].can_transform(node, light_graph):
+                    to_transform.append((i, node))
                 else:
                     logging.warning("Not transforming {0}".format(node.name))
 
-        return results
+        # Node transforms are independent, so they can run in separate processes
+        # that each get a copy of the graph once. Results are in the same order as
+        # to_transform either way
+        if self._sw_config.num_transform_processes > 1 and len(to_transform) > 1:
+            return utils.run_fn_with_multiprocessing(
+                [(i, node.name) for i, node in to_transform],
+                _transform_node,
+                num_processes=min(self._sw_config.num_transform_processes,
+                                  len(to_transform)),
+                initializer=_init_transform_worker,
+                initargs=(light_graph.as_lgf_pb().SerializeToString(),
+                          node_transforms))
+
+        return [
+            node_transforms[i].transform(node, light_graph) for i, node in to_transform
+        ]
 
     @staticmethod
     def get_node_map_from_filter_transform_map(filter_transform_map,
@@ -178,30 +178,130 @@ class FoldPhasifyConstantsNodeTransform(base_transform.BaseTransform):
         phases_node.const.sparse_rows_per_tile = sparse_rows_per_tile.val
         phases_node.const.sparsity_type.extend(sparsity_type)
 
-    def _get_phases_and_dequant_scales(self,
-                                       new_opu_node,
-                                       light_graph,
-                                       phasify_node,
-                                       phasify_subgraph_nodes,
-                                       transform_result):
-        # Create a subgraph
-        subgraph = lgf_graph.LightGraph(phasify_subgraph_nodes,
-                                        output_edges=phasify_node.outputs)
+    def _run_combined_subgraphs(self, subgraphs):
+        """
+        Runs all the given subgraphs together as a single combined graph, the
+        subgraphs must be independent, see _group_subgraphs()
+
+        Params:
+            subgraphs: a list of tuples of the form (nodes, input_edges, input_arrays,
+                output_edges) where nodes are from the same namespace for all of the
+                subgraphs
+
+        Returns:
+            a list with an entry for each subgraph, which is the list of numpy arrays
+            corresponding to the output_edges of that subgraph
+        """
+        nodes = []
+        node_names = set()
+        input_edges = []
+        input_arrays = []
+        output_edges = []
+        output_indices = {}
+        for subgraph_nodes, subgraph_input_edges, subgraph_input_arrays, \
+                subgraph_output_edges in subgraphs:
+            for node in subgraph_nodes:
+                if node.name not in node_names:
+                    nodes.append(node)
+                    node_names.add(node.name)
+            for edge, array in zip(subgraph_input_edges, subgraph_input_arrays):
+                if not any(utils.edges_match(edge, e) for e in input_edges):
+                    input_edges.append(edge)
+                    input_arrays.append(array)
+            for edge in subgraph_output_edges:
+                if (edge.name, edge.port) not in output_indices:
+                    output_indices[(edge.name, edge.port)] = len(output_edges)
+                    output_edges.append(edge)
+
+        combined_graph = lgf_graph.LightGraph(nodes,
+                                              input_edges=input_edges,
+                                              output_edges=output_edges)
 
         # Run the graph
-        subgraph_inputs = utils.create_inference_inputs([], [])
-        runner = graph_runner.GraphRunner(subgraph,
+        inputs = utils.create_inference_inputs(input_edges, input_arrays)
+        runner = graph_runner.GraphRunner(combined_graph,
                                           self._hw_specs,
                                           self._sw_config,
                                           self._sim_params)
-        out_inf = runner.run_single_batch(subgraph_inputs)
+        out_inf = runner.run_single_batch(inputs)
 
         # Get numpy arrays
-        phasify_output_arrays = [
+        output_arrays = [
             utils.tensor_pb_to_array(named_tensor.data,
                                      np.float32) for named_tensor in out_inf.results
         ]
 
+        return [[
+            output_arrays[output_indices[(edge.name,
+                                          edge.port)]] for edge in subgraph[3]
+        ] for subgraph in subgraphs]
+
+    @staticmethod
+    def _group_subgraphs(subgraphs):
+        """
+        Splits subgraphs into groups of independent subgraphs that can be run as
+        a single combined graph. A subgraph is not added to a group when one of its
+        input edges is produced by a node in the group or the other way around,
+        for example chained opu nodes, since the combined graph would be cut at
+        that edge. It is also not added when the group contains a different node
+        with the same name as one of its nodes.
+
+        Returns:
+            a list of groups, each group is a list of indices into subgraphs
+        """
+        groups = []
+        for i, (nodes, input_edges, _, _) in enumerate(subgraphs):
+            node_dict = {node.name: node for node in nodes}
+            input_names = {edge.name for edge in input_edges}
+            for indices, group_node_dict, group_input_names in groups:
+                if (input_names.isdisjoint(group_node_dict) and
+                        group_input_names.isdisjoint(node_dict) and all(
+                            group_node_dict.get(name, node) == node
+                            for name, node in node_dict.items())):
+                    indices.append(i)
+                    group_node_dict.update(node_dict)
+                    group_input_names.update(input_names)
+                    break
+            else:
+                groups.append(([i], node_dict, input_names))
+
+        return [indices for indices, _, _ in groups]
+
+    def _run_subgraphs(self, subgraphs):
+        """
+        Runs the given subgraphs with as few combined graphs as possible
+
+        Params:
+            subgraphs: a list of tuples of the form (nodes, input_edges, input_arrays,
+                output_edges)
+
+        Returns:
+            a list with an entry for each subgraph, which is the list of numpy arrays
+            corresponding to the output_edges of that subgraph
+        """
+        groups = self._group_subgraphs(subgraphs)
+        if len(groups) > 1:
+            logging.info("Running %d subgraphs as %d combined graphs",
+                         len(subgraphs),
+                         len(groups))
+
+        outputs = [None] * len(subgraphs)
+        for indices in groups:
+            group_outputs = self._run_combined_subgraphs([subgraphs[i] for i in indices])
+            for i, subgraph_outputs in zip(indices, group_outputs):
+                outputs[i] = subgraph_outputs
+
+        return outputs
+
+    def _get_phasify_subgraph(self, phasify_node, phasify_subgraph_nodes):
+        return phasify_subgraph_nodes, [], [], list(phasify_node.outputs)
+
+    def _add_phases_and_dequant_scales(self,
+                                       new_opu_node,
+                                       light_graph,
+                                       phasify_node,
+                                       phasify_output_arrays,
+                                       transform_result):
         # Get the adc scales node
         adc_scales_node = light_graph.get_node_by_name(
             phasify_node.inputs[lgf_pb2.PhasifyNode.ADC_SCALES_INPUT_INDEX].name)
@@ -241,7 +341,27 @@ class FoldPhasifyConstantsNodeTransform(base_transform.BaseTransform):
                                                  dequant_scales_node],
                                          to_replace=[new_adc_scales_node]))
 
-    def _get_dequant_bias(self, new_opu_node, light_graph, transform_result):
+    def _get_phases_and_dequant_scales(self,
+                                       new_opu_node,
+                                       light_graph,
+                                       phasify_node,
+                                       phasify_subgraph_nodes,
+                                       transform_result):
+        phasify_output_arrays = self._run_subgraphs(
+            [self._get_phasify_subgraph(phasify_node,
+                                        phasify_subgraph_nodes)])[0]
+        self._add_phases_and_dequant_scales(new_opu_node,
+                                            light_graph,
+                                            phasify_node,
+                                            phasify_output_arrays,
+                                            transform_result)
+
+    def _get_dequant_bias_subgraph(self, new_opu_node, light_graph, transform_result):
+        """
+        Adds a dequant bias with all 0's to new_opu_node, and returns a tuple
+        (zero_dequant_bias_node, subgraph) where subgraph runs zeros through
+        new_opu_node
+        """
         # Create a dequant bias with all 0's
         _, num_y, _, j = new_opu_node.inputs[
             lgf_pb2.MatMulNode.DEQUANT_SCALES_INDEX].shape.d
@@ -267,32 +387,32 @@ class FoldPhasifyConstantsNodeTransform(base_transform.BaseTransform):
             light_graph.get_node_by_name(
                 new_opu_node.inputs[lgf_pb2.MatMulNode.QUANT_PARAMS_INDEX].name))
 
-        # Create a subgraph to run the new opu node
-        subgraph = lgf_graph.LightGraph(
-            const_nodes + [new_opu_node,
-                           zero_dequant_bias_node],
-            input_edges=[new_opu_node.inputs[lgf_pb2.MatMulNode.INPUT_INDEX]],
-            output_edges=[new_opu_node.outputs[0]])
-
         # Create zero inputs
-        input_edge = subgraph.input_edges()[0]
+        input_edge = new_opu_node.inputs[lgf_pb2.MatMulNode.INPUT_INDEX]
         batch_dilation_factor = (input_edge.shape.batch_dilation_factor
                                  if input_edge.shape.batch_dilation_factor > 0 else 1)
         array = np.zeros([
             d if d != -1 else self._sim_params.compiled_batch_size *
             batch_dilation_factor for d in input_edge.shape.d
         ])
-        zero_inputs = utils.create_inference_inputs([input_edge], [array])
 
-        # Run zeros through the subgraph
-        runner = graph_runner.GraphRunner(subgraph,
-                                          self._hw_specs,
-                                          self._sw_config,
-                                          self._sim_params)
-        out_inf = runner.run_single_batch(zero_inputs)
+        # Subgraph to run zeros through the new opu node
+        subgraph = (const_nodes + [new_opu_node,
+                                   zero_dequant_bias_node],
+                    [input_edge],
+                    [array],
+                    [new_opu_node.outputs[0]])
+
+        return zero_dequant_bias_node, subgraph
+
+    def _add_dequant_bias(self,
+                          zero_dequant_bias_node,
+                          zero_outputs_array,
+                          transform_result):
+        _, num_y, _, j = zero_dequant_bias_node.outputs[0].shape.d
 
         # New bias is chosen so the outputs of a zero input will be exactly zero
-        dequant_bias = -1 * utils.tensor_pb_to_array(out_inf.results[0].data, np.float32)
+        dequant_bias = -1 * zero_outputs_array
 
         # Convert to a [1, last_dim] vector
         dequant_bias = np.reshape(dequant_bias, [-1, dequant_bias.shape[-1]])
@@ -314,6 +434,26 @@ class FoldPhasifyConstantsNodeTransform(base_transform.BaseTransform):
 
         transform_result.to_add.add().node.CopyFrom(dequant_bias_node)
 
+    def _get_dequant_bias(self, new_opu_node, light_graph, transform_result):
+        zero_dequant_bias_node, subgraph = self._get_dequant_bias_subgraph(
+            new_opu_node, light_graph, transform_result)
+
+        # Run zeros through the subgraph
+        zero_outputs_array = self._run_subgraphs([subgraph])[0][0]
+
+        self._add_dequant_bias(zero_dequant_bias_node,
+                               zero_outputs_array,
+                               transform_result)
+
+    @staticmethod
+    def _get_new_opu_node(opu_node):
+        new_opu_node = lgf_pb2.LNF()
+        new_opu_node.CopyFrom(opu_node)
+        matmul = opu_op_transform.OPUOpTransform.get_matmul_from_opu_node(new_opu_node)
+        matmul.phasify_is_folded = True
+
+        return new_opu_node, matmul
+
     def transform(self, opu_node, light_graph):
         transform_result = self.create_transform_result()
 
@@ -324,10 +464,7 @@ class FoldPhasifyConstantsNodeTransform(base_transform.BaseTransform):
             return transform_result
 
         # Create a new opu node
-        new_opu_node = lgf_pb2.LNF()
-        new_opu_node.CopyFrom(opu_node)
-        matmul = opu_op_transform.OPUOpTransform.get_matmul_from_opu_node(new_opu_node)
-        matmul.phasify_is_folded = True
+        new_opu_node, matmul = self._get_new_opu_node(opu_node)
 
         # Get phases and dequant scales
         self._get_phases_and_dequant_scales(new_opu_node,
@@ -343,6 +480,71 @@ class FoldPhasifyConstantsNodeTransform(base_transform.BaseTransform):
         transform_result.to_replace.add().node.CopyFrom(new_opu_node)
         return transform_result
 
+    def transform_batch(self, opu_nodes, light_graph):
+        """
+        Returns the same list of TransformResults as calling self.transform on
+        each of the opu_nodes. All the phasify subgraphs are folded with a single
+        run of one combined graph, and all the dequant biases are computed with
+        a second run.
+        """
+        transform_results = []
+        to_fold = []
+        for opu_node in opu_nodes:
+            transform_result = self.create_transform_result()
+            transform_results.append(transform_result)
+
+            phasify_node, phasify_subgraph_nodes = self._get_foldable_phasify_nodes(
+                opu_node, light_graph)
+            if phasify_subgraph_nodes is not None:
+                new_opu_node, matmul = self._get_new_opu_node(opu_node)
+                to_fold.append((new_opu_node,
+                                matmul,
+                                phasify_node,
+                                phasify_subgraph_nodes,
+                                transform_result))
+
+        if not to_fold:
+            return transform_results
+
+        # Get phases and dequant scales
+        logging.info("Folding %d phasify subgraphs", len(to_fold))
+        all_phasify_output_arrays = self._run_subgraphs([
+            self._get_phasify_subgraph(phasify_node,
+                                       phasify_subgraph_nodes)
+            for _, _, phasify_node, phasify_subgraph_nodes, _ in to_fold
+        ])
+        for (new_opu_node, _, phasify_node, _, transform_result), \
+                phasify_output_arrays in zip(to_fold, all_phasify_output_arrays):
+            self._add_phases_and_dequant_scales(new_opu_node,
+                                                light_graph,
+                                                phasify_node,
+                                                phasify_output_arrays,
+                                                transform_result)
+
+        # Compute the dequant biases if necessary
+        dequant_bias_subgraphs = []
+        for new_opu_node, matmul, _, _, transform_result in to_fold:
+            if matmul.using_quant_bias:
+                dequant_bias_subgraphs.append(
+                    (transform_result,) +
+                    self._get_dequant_bias_subgraph(new_opu_node,
+                                                    light_graph,
+                                                    transform_result))
+
+        if dequant_bias_subgraphs:
+            all_zero_outputs_arrays = self._run_subgraphs(
+                [subgraph for _, _, subgraph in dequant_bias_subgraphs])
+            for (transform_result, zero_dequant_bias_node, _), zero_outputs_arrays in \
+                    zip(dequant_bias_subgraphs, all_zero_outputs_arrays):
+                self._add_dequant_bias(zero_dequant_bias_node,
+                                       zero_outputs_arrays[0],
+                                       transform_result)
+
+        for new_opu_node, _, _, _, transform_result in to_fold:
+            transform_result.to_replace.add().node.CopyFrom(new_opu_node)
+
+        return transform_results
+
 
 class FoldPhasifyConstants(apply_node_map.ApplyNodeMap):
 
@@ -356,3 +558,18 @@ class FoldPhasifyConstants(apply_node_map.ApplyNodeMap):
                                                       sw_config,
                                                       sim_params)
             })
+
+    def get_transforms(self, light_graph):
+        if not self._sw_config.batch_fold_phasify_constants:
+            return super().get_transforms(light_graph)
+
+        opu_node_filter, node_transform = list(self._node_map.items())[0]
+        opu_nodes = []
+        for node in light_graph.nodes():
+            if opu_node_filter.matches(node, light_graph):
+                if node_transform.can_transform(node, light_graph):
+                    opu_nodes.append(node)
+                else:
+                    logging.warning("Not transforming {0}".format(node.name))
+
+        return node_transform.transform_batch(opu_nodes, light_graph)
@@ -0,0 +1,111 @@
+import numpy as np
+
+from lt_sdk.common import py_test_util
+from lt_sdk.graph import lgf_graph
+from lt_sdk.graph.transform_graph import utils
+from lt_sdk.graph.transform_graph.graph_transformers import fold_phasify_constants
+from lt_sdk.graph.transform_graph.node_transformers.generic_transforms import (
+    base_transform,
+    matmul_transform,
+)
+from lt_sdk.proto import graph_types_pb2, lgf_pb2
+from lt_sdk.proto.configs import (
+    generate_hw_specs,
+    generate_sim_params,
+    generate_sw_config,
+)
+
+
+class FoldPhasifyConstantsTest(py_test_util.PythonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        np.random.seed(0)
+        self.hw_specs = generate_hw_specs.generate_mosaic_delta()
+        self.sw_config = generate_sw_config.generate_mosaic_delta(
+            graph_types_pb2.TFSavedModel)
+        self.sim_params = generate_sim_params.generate_mosaic_delta()
+        self.sim_params.num_runtime_threads = 1
+
+    def _chained_matmul_graph(self, num_matmuls, size=8):
+        """
+        Returns a LightGraph with num_matmuls opu nodes, the output of each opu node
+        is the input of the next one. The opu nodes use a non zero quant bias, so
+        their folded dequant biases are not zero
+        """
+        inp = lgf_pb2.EdgeInfo()
+        inp.name = "inp"
+        inp.port = 0
+        inp.dtype.CopyFrom(self.sw_config.float_type)
+        inp.shape.d.extend([1, size])
+
+        mm_tx = matmul_transform.MatMulTransform(self.hw_specs,
+                                                 self.sw_config,
+                                                 self.sim_params)
+        nodes = []
+        edge = inp
+        for i in range(num_matmuls):
+            name = "matmul_{0}".format(i)
+            weights_node = base_transform.BaseTransform.create_const_node(
+                np.random.uniform(-1,
+                                  1,
+                                  size=(size,
+                                        size)),
+                name + "_weights",
+                self.sw_config.float_type,
+                lgf_pb2.ConstNode.GRAPH_CONST)
+
+            output_edge = lgf_pb2.EdgeInfo()
+            output_edge.CopyFrom(edge)
+            output_edge.name = name
+            output_edge.port = 0
+
+            mm_nodes = mm_tx.create_supported_nodes(name,
+                                                    edge,
+                                                    weights_node.outputs[0],
+                                                    output_edge,
+                                                    [])
+            matmul_node = mm_nodes[0]
+            matmul_node.matmul.using_quant_bias = True
+            quant_params_name = matmul_node.inputs[
+                lgf_pb2.MatMulNode.QUANT_PARAMS_INDEX].name
+            for node in mm_nodes:
+                if node.name == quant_params_name:
+                    node.const.value.CopyFrom(
+                        utils.array_to_tensor_pb(np.array([1.0,
+                                                           0.5]),
+                                                 self.sw_config.float_type))
+
+            nodes.append(weights_node)
+            nodes.extend(mm_nodes)
+            edge = matmul_node.outputs[0]
+
+        return lgf_graph.LightGraph(nodes, input_edges=[inp], output_edges=[edge])
+
+    def _fold(self, light_graph, batch_fold_phasify_constants):
+        self.sw_config.batch_fold_phasify_constants = batch_fold_phasify_constants
+        folder = fold_phasify_constants.FoldPhasifyConstants(self.hw_specs,
+                                                             self.sw_config,
+                                                             self.sim_params)
+        folded_graph = folder.process_transforms(light_graph)
+        return {node.name: node for node in folded_graph.nodes()}
+
+    def test_batched_matches_per_node_on_chained_opus(self):
+        light_graph = self._chained_matmul_graph(3)
+        per_node = self._fold(light_graph, False)
+        batched = self._fold(light_graph, True)
+
+        self.assertEqual(set(per_node), set(batched))
+        for name, node in per_node.items():
+            self.assertEqual(node, batched[name], name)
+
+        # The second and third opu nodes read the outputs of the previous ones
+        for i in range(3):
+            dequant_bias = utils.tensor_pb_to_array(
+                batched["matmul_{0}_dequant_bias".format(i)].const.value,
+                np.float32)
+            self.assertTrue(np.any(dequant_bias != 0))
+
+
+if __name__ == "__main__":
+    py_test_util.PythonTestProgram()
@@ -1,8 +1,78 @@
+from lt_sdk.common import profiler
 from lt_sdk.graph import lgf_graph
 from lt_sdk.graph.transform_graph import utils
 from lt_sdk.proto import lgf_pb2, transform_result_pb2
 
 
+class CopyOnWriteNodes(object):
+    """
+    Nodes of a graph that is being transformed. Nodes are shared with the original
+    graph until they are modified, so only the nodes that change are copied
+    """
+
+    def __init__(self, shared_nodes):
+        """
+        Params:
+            shared_nodes: a list of lgf_pb2.LNF() protobufs that must not be mutated
+        """
+        self._nodes = list(shared_nodes)
+        self._indices = {node.name: i for i, node in enumerate(self._nodes)}
+        self._owned_node_names = set()
+        self._changed_node_names = set()
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def has_node(self, node_name):
+        return node_name in self._indices
+
+    def get_node(self, node_name):
+        """Returns the node with the given name, the node must not be mutated"""
+        return self._nodes[self._indices[node_name]]
+
+    def get_mutable_node(self, node_name):
+        """Returns the node with the given name, copying it if it is still shared"""
+        if node_name not in self._owned_node_names:
+            self.set_node(self.get_node(node_name))
+
+        self._changed_node_names.add(node_name)
+        return self.get_node(node_name)
+
+    def set_node(self, node):
+        """Adds a copy of node, replacing the node with the same name if it exists"""
+        node_copy = lgf_pb2.LNF()
+        node_copy.CopyFrom(node)
+        if node.name in self._indices:
+            self._nodes[self._indices[node.name]] = node_copy
+        else:
+            self._indices[node.name] = len(self._nodes)
+            self._nodes.append(node_copy)
+
+        self._owned_node_names.add(node.name)
+        self._changed_node_names.add(node.name)
+
+    def keep_nodes(self, node_names):
+        """Removes all nodes except the given ones, which are put in the given order"""
+        self._nodes = [self.get_node(node_name) for node_name in node_names]
+        self._indices = {node.name: i for i, node in enumerate(self._nodes)}
+        self._owned_node_names.intersection_update(self._indices)
+
+    def pop_changed_node_names(self):
+        """Returns the names of the nodes added or modified since the last call"""
+        changed_node_names = self._changed_node_names
+        self._changed_node_names = set()
+        return changed_node_names
+
+    def num_copied_nodes(self):
+        return len(self._owned_node_names)
+
+    def as_list(self):
+        return list(self._nodes)
+
+
 class GraphTransform(object):
     """Interface for a graph transform object"""
 
@@ -39,12 +109,10 @@ class GraphTransform(object):
 
     @staticmethod
     def _add_nodes(to_add, nodes, input_edges, output_edges):
-        node_names = {n.name for n in nodes}
         for transform in to_add:
             new_node = transform.node
-            if new_node.name not in node_names:
-                nodes.append(new_node)
-                node_names.add(new_node.name)
+            if not nodes.has_node(new_node.name):
+                nodes.set_node(new_node)
 
         GraphTransform._update_input_edges(nodes, input_edges)
 
@@ -57,11 +125,10 @@ class GraphTransform(object):
 
     @staticmethod
     def _replace_nodes(to_replace, nodes, input_edges, output_edges):
-        node_dict = {n.name: n for n in nodes}
         for transform in to_replace:
             new_node = transform.node
-            if new_node.name in node_dict:
-                node_dict[new_node.name].CopyFrom(new_node)
+            if nodes.has_node(new_node.name):
+                nodes.set_node(new_node)
 
             GraphTransform._update_edges_replace(new_node, input_edges)
             GraphTransform._update_edges_replace(new_node, output_edges)
@@ -73,19 +140,24 @@ class GraphTransform(object):
                 e.CopyFrom(new_edge)
 
     @staticmethod
-    def _edge_reroute(nodes_to_check, old_edge, new_edge, output_edges):
+    def _edge_reroute(nodes, nodes_to_check, old_edge, new_edge, output_edges):
         for node in nodes_to_check:
             if new_edge.name == node.name:
                 # new_edge is an output of node
                 continue
 
-            GraphTransform._update_edges_reroute(old_edge, new_edge, node.inputs)
+            # Only copy nodes that are rerouted
+            if GraphTransform._edge_in_list(old_edge, node.inputs):
+                GraphTransform._update_edges_reroute(
+                    old_edge,
+                    new_edge,
+                    nodes.get_mutable_node(node.name).inputs)
 
         # Reroute can only change output_edges of the graph
         GraphTransform._update_edges_reroute(old_edge, new_edge, output_edges)
 
     @staticmethod
-    def _control_input_reroute(nodes_to_check, old_node_names, new_node_names):
+    def _control_input_reroute(nodes, nodes_to_check, old_node_names, new_node_names):
         old_node_names = set(old_node_names)
         new_node_names = set(new_node_names)
 
@@ -94,30 +166,32 @@ class GraphTransform(object):
             if old_node_names.issubset(control_inputs):
                 control_inputs.difference_update(old_node_names)
                 control_inputs.update(new_node_names)
-                node.control_inputs[:] = sorted(control_inputs)
+                nodes.get_mutable_node(node.name).control_inputs[:] = sorted(
+                    control_inputs)
 
     @staticmethod
     def _reroute_nodes(to_reroute, nodes, input_edges, output_edges):
-        node_dict = {n.name: n for n in nodes}
         for transform in to_reroute:
             # Get nodes to check
             if len(transform.dst_node_names) == 0:
-                nodes_to_check = nodes
+                nodes_to_check = list(nodes)
             else:
                 nodes_to_check = [
-                    node_dict[node_name] for node_name in transform.dst_node_names
+                    nodes.get_node(node_name) for node_name in transform.dst_node_names
                 ]
 
             # Different types of reroute procedures
             if transform.HasField(
                     transform_result_pb2.ToReroute.edge_reroute.DESCRIPTOR.name):
-                GraphTransform._edge_reroute(nodes_to_check,
+                GraphTransform._edge_reroute(nodes,
+                                             nodes_to_check,
                                              transform.edge_reroute.old_edge,
                                              transform.edge_reroute.new_edge,
                                              output_edges)
             elif transform.HasField(transform_result_pb2.ToReroute.control_input_reroute.
                                     DESCRIPTOR.name):
                 GraphTransform._control_input_reroute(
+                    nodes,
                     nodes_to_check,
                     transform.control_input_reroute.old_node_names,
                     transform.control_input_reroute.new_node_names)
@@ -147,33 +221,67 @@ class GraphTransform(object):
 
         return result
 
+    @staticmethod
+    def apply_transforms(transforms,
+                         nodes,
+                         input_edges,
+                         output_edges,
+                         output_node_names):
+        """
+        Performs the transforms on the given graph state in place
+
+        Params:
+            transforms: a transform_result_pb2.TransformResult() protobuf
+            nodes: a CopyOnWriteNodes object
+            input_edges: a list of lgf_pb2.EdgeInfo() protobufs
+            output_edges: a list of lgf_pb2.EdgeInfo() protobufs
+            output_node_names: a list of strings
+        """
+        GraphTransform._add_nodes(transforms.to_add, nodes, input_edges, output_edges)
+        GraphTransform._replace_nodes(transforms.to_replace,
+                                      nodes,
+                                      input_edges,
+                                      output_edges)
+        GraphTransform._reroute_nodes(transforms.to_reroute,
+                                      nodes,
+                                      input_edges,
+                                      output_edges)
+        GraphTransform._output_swap(transforms.to_output_swap, output_node_names)
+
     def process_transforms(self, light_graph, prune=True):
         """
         Returns a new LightGraph object which is the result of performing
         the transormations returned from self.get_transforms(light_graph)
         on the given light_graph
         """
+        with profiler.span(self.__class__.__name__, profiler.TRANSFORM):
+            return self._process_transforms(light_graph, prune)
+
+    def _process_transforms(self, light_graph, prune):
         transforms = self.concat_transforms(self.get_transforms(light_graph))
 
         # Remember light_graph is immutable, so we will mutate nodes,
-        # input_edges, output_edges, then create a new light_graph
-        nodes = light_graph.nodes()
+        # input_edges, output_edges, then create a new light_graph. Nodes
+        # are only copied when they change, the rest are shared with light_graph
+        nodes = CopyOnWriteNodes(light_graph._shared_nodes())
         input_edges = light_graph.input_edges()
         output_edges = light_graph.output_edges()
         output_node_names = light_graph.output_node_names()
         meta_graph_info = self.get_meta_graph_info(light_graph.meta_graph_info())
 
-        self._add_nodes(transforms.to_add, nodes, input_edges, output_edges)
-        self._replace_nodes(transforms.to_replace, nodes, input_edges, output_edges)
-        self._reroute_nodes(transforms.to_reroute, nodes, input_edges, output_edges)
-        self._output_swap(transforms.to_output_swap, output_node_names)
+        self.apply_transforms(transforms,
+                              nodes,
+                              input_edges,
+                              output_edges,
+                              output_node_names)
 
         # Create transformed graph and prune it
-        transformed_graph = lgf_graph.LightGraph(nodes,
-                                                 input_edges=input_edges,
-                                                 output_edges=output_edges,
-                                                 output_node_names=output_node_names,
-                                                 meta_graph_info=meta_graph_info)
+        transformed_graph = lgf_graph.LightGraph._from_shared_nodes(
+            nodes.as_list(),
+            input_edges=input_edges,
+            output_edges=output_edges,
+            output_node_names=output_node_names,
+            meta_graph_info=meta_graph_info)
         if prune:
             transformed_graph = transformed_graph.prune_graph()
 
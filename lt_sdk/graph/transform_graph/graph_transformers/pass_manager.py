@@ -0,0 +1,267 @@
+import bisect
+import logging
+import time
+
+from lt_sdk.common import profiler
+from lt_sdk.graph import lgf_graph
+from lt_sdk.graph.transform_graph.graph_transformers import graph_transform
+
+
+class WorkingLightGraph(lgf_graph.LightGraph):
+    """
+    LightGraph that is transformed in place by a PassManager. Nodes are shared with
+    the graph it was created from until a pass modifies them, and the lookup
+    dictionaries are only updated for the nodes that change
+    """
+
+    _IMMUTABLE = False
+
+    def __init__(self, light_graph):
+        """
+        Params:
+            light_graph: a LightGraph object, it is not modified
+        """
+        self._cow_nodes = graph_transform.CopyOnWriteNodes(light_graph._shared_nodes())
+        self._init_graph(self._cow_nodes.as_list(),
+                         input_edges=light_graph.input_edges(),
+                         output_edges=light_graph.output_edges(),
+                         output_node_names=light_graph.output_node_names(),
+                         meta_graph_info=light_graph.meta_graph_info())
+
+        # Maps names of nodes that are not in the graph to the names of the nodes
+        # that use them as an input
+        self._missing_input_to_node_names = {}
+        for node in self._nodes:
+            for input_name in self._get_missing_input_names(node):
+                self._missing_input_to_node_names.setdefault(input_name,
+                                                             set()).add(node.name)
+
+        self._edge_dict_is_stale = False
+
+    @staticmethod
+    def _get_all_input_names(node):
+        return {e.name for e in node.inputs}.union(node.control_inputs)
+
+    def _get_missing_input_names(self, node):
+        return {
+            input_name for input_name in self._get_all_input_names(node)
+            if input_name not in self._node_dict
+        }
+
+    def get_edge(self, name, port):
+        # The edge dictionary is rebuilt lazily since passes rarely use it
+        if self._edge_dict_is_stale:
+            self._edge_dict = {}
+            for node in self._nodes:
+                for e in list(node.inputs) + list(node.outputs):
+                    self._edge_dict[(e.name, e.port)] = e
+            self._edge_dict_is_stale = False
+
+        return super().get_edge(name, port)
+
+    def _unlink_node(self, node):
+        """Removes the edges from the inputs of node to node"""
+        for input_name in self._node_to_input_node_names[node.name]:
+            self._node_to_output_node_names[input_name].remove(node.name)
+
+        for input_name in self._get_all_input_names(node):
+            if input_name in self._missing_input_to_node_names:
+                self._missing_input_to_node_names[input_name].discard(node.name)
+
+    def _link_node(self, node):
+        """Adds the edges from the inputs of node to node"""
+        input_names = []
+        for input_name in sorted(self._get_all_input_names(node)):
+            if input_name in self._node_dict:
+                input_names.append(input_name)
+                bisect.insort(self._node_to_output_node_names[input_name], node.name)
+            else:
+                self._missing_input_to_node_names.setdefault(input_name,
+                                                             set()).add(node.name)
+
+        self._node_to_input_node_names[node.name] = input_names
+
+    def _update_nodes(self, changed_node_names):
+        """Updates the lookup dictionaries for the nodes that were added or modified"""
+        changed_node_names = sorted(changed_node_names)
+        for node_name in changed_node_names:
+            if node_name in self._node_dict:
+                self._unlink_node(self._node_dict[node_name])
+
+        new_node_names = []
+        for node_name in changed_node_names:
+            if node_name not in self._node_dict:
+                new_node_names.append(node_name)
+                self._node_to_output_node_names[node_name] = []
+            self._node_dict[node_name] = self._cow_nodes.get_node(node_name)
+
+        for node_name in changed_node_names:
+            self._link_node(self._node_dict[node_name])
+
+        # Link unchanged nodes that were waiting for a new node
+        for node_name in new_node_names:
+            for output_name in self._missing_input_to_node_names.pop(node_name, []):
+                bisect.insort(self._node_to_input_node_names[output_name], node_name)
+                bisect.insort(self._node_to_output_node_names[node_name], output_name)
+
+        self._nodes = self._cow_nodes.as_list()
+        self._edge_dict_is_stale = True
+
+    def _remove_nodes(self, node_names):
+        """Updates the lookup dictionaries for nodes that were removed"""
+        for node_name in node_names:
+            self._unlink_node(self._node_dict.pop(node_name))
+            del self._node_to_input_node_names[node_name]
+
+        for node_name in node_names:
+            for output_name in self._node_to_output_node_names.pop(node_name):
+                if output_name in self._node_dict:
+                    self._node_to_input_node_names[output_name].remove(node_name)
+                    self._missing_input_to_node_names.setdefault(
+                        node_name,
+                        set()).add(output_name)
+
+        self._edge_dict_is_stale = True
+
+    def apply(self, transformer):
+        """
+        Performs the transforms of the given GraphTransform object on this graph
+
+        Returns:
+            a tuple (num_added, num_modified) for the number of nodes added and
+            modified by the transforms
+        """
+        transforms = transformer.concat_transforms(transformer.get_transforms(self))
+        self._meta_graph_info = transformer.get_meta_graph_info(self._meta_graph_info)
+        transformer.apply_transforms(transforms,
+                                     self._cow_nodes,
+                                     self._input_edges,
+                                     self._output_edges,
+                                     self._output_node_names)
+
+        changed_node_names = self._cow_nodes.pop_changed_node_names()
+        num_added = len([name for name in changed_node_names if not self.has_node(name)])
+        self._update_nodes(changed_node_names)
+
+        return num_added, len(changed_node_names) - num_added
+
+    def prune(self):
+        """
+        Prunes this graph in place, the same as self.prune_graph() but without
+        creating a new graph
+
+        Returns:
+            the number of nodes removed
+        """
+        kept_node_names = [
+            node.name for node in self._get_pruned_nodes(self._input_edges,
+                                                         self._output_edges,
+                                                         self._output_node_names)
+        ]
+
+        # Make sure inputs and outputs come from the graph, as in self.prune_graph()
+        input_edges = [self.get_edge(e.name, e.port) for e in self._input_edges]
+        output_edges = [self.get_edge(e.name, e.port) for e in self._output_edges]
+
+        # Nothing to prune, self.prune_graph() would keep the node order
+        if (len(kept_node_names) == len(self._nodes) and input_edges == self._input_edges
+                and output_edges == self._output_edges):
+            return 0
+
+        removed_node_names = set(self._node_dict).difference(kept_node_names)
+        self._remove_nodes(removed_node_names)
+        self._cow_nodes.keep_nodes(kept_node_names)
+        self._nodes = self._cow_nodes.as_list()
+        self._input_edges = input_edges
+        self._output_edges = output_edges
+
+        return len(removed_node_names)
+
+    def as_light_graph(self):
+        """Returns an immutable LightGraph that shares the nodes of this graph"""
+        light_graph = lgf_graph.LightGraph._from_shared_nodes(
+            self._nodes,
+            input_edges=self._input_edges,
+            output_edges=self._output_edges,
+            output_node_names=self._output_node_names,
+            meta_graph_info=self._meta_graph_info)
+
+        # This graph can no longer modify the shared nodes in place
+        self._cow_nodes = graph_transform.CopyOnWriteNodes(self._nodes)
+        return light_graph
+
+
+class PassStats(object):
+    """Wall time and node change counts of a single pass"""
+
+    def __init__(self, name):
+        self.name = name
+        self.wall_time = 0.0
+        self.num_added = 0
+        self.num_modified = 0
+        self.num_pruned = 0
+
+    def __str__(self):
+        return "{0}: {1:.3f}s, {2} added, {3} modified, {4} pruned".format(
+            self.name,
+            self.wall_time,
+            self.num_added,
+            self.num_modified,
+            self.num_pruned)
+
+
+class PassManager(object):
+    """
+    Runs a sequence of GraphTransform passes on a shared WorkingLightGraph. The
+    result is the same as calling process_transforms() for each pass, but only the
+    changed nodes are copied and indexed, and the LightGraph is materialized once
+    """
+
+    def __init__(self):
+        self._passes = []
+        self.stats = []
+
+    def add_pass(self, transformer, prune=True):
+        """
+        Params:
+            transformer: a GraphTransform object
+            prune: prune the graph after the pass, same as process_transforms()
+        """
+        self._passes.append((transformer, prune))
+
+    def run(self, light_graph):
+        """Returns a new LightGraph after running all the passes on light_graph"""
+        self.stats = []
+        if not self._passes:
+            return light_graph
+
+        working_graph = WorkingLightGraph(light_graph)
+        for i, (transformer, prune) in enumerate(self._passes):
+            stats = PassStats(transformer.__class__.__name__)
+            start = time.time()
+
+            with profiler.span(stats.name, profiler.TRANSFORM):
+                stats.num_added, stats.num_modified = working_graph.apply(transformer)
+
+                # The last prune is done when the LightGraph is materialized
+                if prune and i < len(self._passes) - 1:
+                    stats.num_pruned = working_graph.prune()
+
+            stats.wall_time = time.time() - start
+            self.stats.append(stats)
+
+        transformed_graph = working_graph.as_light_graph()
+        if self._passes[-1][1]:
+            start = time.time()
+            num_nodes = len(transformed_graph._shared_nodes())
+            with profiler.span("{0} prune".format(self.stats[-1].name),
+                               profiler.TRANSFORM):
+                transformed_graph = transformed_graph.prune_graph()
+            self.stats[-1].num_pruned = num_nodes - len(
+                transformed_graph._shared_nodes())
+            self.stats[-1].wall_time += time.time() - start
+
+        for stats in self.stats:
+            logging.info(str(stats))
+
+        return transformed_graph
@@ -1,5 +1,6 @@
 import logging
 
+from lt_sdk.common import profiler
 from lt_sdk.graph.transform_graph import cached_pipeline, utils
 from lt_sdk.graph.transform_graph.calibration import (
     activation_scale_calibration,
@@ -12,6 +13,7 @@ from lt_sdk.graph.transform_graph.graph_transformers import (
     apply_node_map,
     fold_phasify_constants,
     mark_supported_const,
+    pass_manager,
     remove_pad_nodes,
 )
 from lt_sdk.proto import inference_pb2, sw_config_pb2
@@ -23,33 +25,38 @@ class BaseTransformsStage(cached_pipeline.PipelineStage):
         super().__init__("SoftwareConfig BaseTransforms", stage_args)
 
     def execute(self, light_graph):
+        # All passes run on one working graph that is materialized at the end
+        passes = pass_manager.PassManager()
+
         # Software Config Transforms
         node_map = apply_node_map.ApplyNodeMap.get_node_map_from_filter_transform_map(
             self._sw_config.filter_transform_map,
             self._hw_specs,
             self._sw_config,
             self._sim_params)
-        graph_transformer = apply_node_map.ApplyNodeMap(self._hw_specs,
-                                                        self._sw_config,
-                                                        node_map)
-        light_graph = graph_transformer.process_transforms(light_graph, prune=True)
+        passes.add_pass(
+            apply_node_map.ApplyNodeMap(self._hw_specs,
+                                        self._sw_config,
+                                        node_map),
+            prune=True)
 
         # Convert constant nodes to supported if possible
-        graph_transformer = mark_supported_const.MarkSupportedConstNodes(
-            self._hw_specs,
-            self._sw_config,
-            self._sim_params)
-        light_graph = graph_transformer.process_transforms(light_graph, prune=False)
+        passes.add_pass(
+            mark_supported_const.MarkSupportedConstNodes(self._hw_specs,
+                                                         self._sw_config,
+                                                         self._sim_params),
+            prune=False)
 
         # Add cast nodes to resolve inconsistent dtypes
-        graph_transformer = add_cast_nodes.AddCastNodes(self._sw_config)
-        light_graph = graph_transformer.process_transforms(light_graph)
+        passes.add_pass(add_cast_nodes.AddCastNodes(self._sw_config))
 
         # Remove unnecessary pad nodes
-        graph_transformer = remove_pad_nodes.RemovePadNodes(self._hw_specs,
-                                                            self._sw_config,
-                                                            self._sim_params)
-        return graph_transformer.process_transforms(light_graph)
+        passes.add_pass(
+            remove_pad_nodes.RemovePadNodes(self._hw_specs,
+                                            self._sw_config,
+                                            self._sim_params))
+
+        return passes.run(light_graph)
 
 
 class ActivationScaleCalibration(cached_pipeline.PipelineStage):
@@ -155,7 +162,8 @@ def main(light_graph, calibration_data, hw_specs, sw_config, sim_params):
     Params:
         light_graph: original LightGraph object, output from
             GraphImporter.as_light_graph()
-        calibration_data: a inference_pb2.BatchedInferenceInput() protobuf (if None
+        calibration_data: a inference_pb2.BatchedInferenceInput() protobuf or an
+            iterable of inference_pb2.BatchedInferenceInput() shards (if None
             generate random data)
         hw_specs: a hw_spec_pb2.HardwareSpecs() protobuf
         sw_config: a sw_config_pb2.SoftwareConfig() protobuf
@@ -164,6 +172,8 @@ def main(light_graph, calibration_data, hw_specs, sw_config, sim_params):
     Returns:
         A LightGraph that can be run on our inference server
     """
+    profiler.enable_from_config(sw_config)
+
     if calibration_data is None:
         calibration_data = inference_pb2.BatchedInferenceInput()
         calibration_data.batches.add().CopyFrom(
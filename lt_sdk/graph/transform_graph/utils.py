@@ -4,6 +4,8 @@ import multiprocessing
 import numpy as np
 import tensorflow as tf
 
+from lt_sdk.common import profiler
+from lt_sdk.graph import external_weights
 from lt_sdk.proto import common_pb2, dtypes_pb2, inference_pb2, lgf_pb2
 
 LT_UNSET = "_LT_UNSET_:0"
@@ -150,7 +152,7 @@ def tensor_pb_to_array(tensor_pb, dtype_np):
         array: a numpy array, the shape and contents are the same as
             as tensor_pb casted to the provided dtype
     """
-    array = np.frombuffer(tensor_pb.tensor_content,
+    array = np.frombuffer(external_weights.get_tensor_content(tensor_pb),
                           dtype=dtype_pb_to_np_dtype(tensor_pb.dtype))
     array = array.reshape(tensor_pb.shape.d).astype(dtype_np)
 
@@ -275,23 +277,44 @@ def array_to_phase_incoherent(normalized_array):
     return -np.arcsin(normalized_array)
 
 
-def run_fn_with_multiprocessing(args_list, fn, num_processes=1):
+def run_fn_with_multiprocessing(args_list,
+                                fn,
+                                num_processes=1,
+                                initializer=None,
+                                initargs=()):
     """
     Params:
         args_list: a list of args where each args object is a tuple
         fn: a function to call that takes args and returns a single object
+        initializer: optional function called with initargs once in each process
+            before fn is called, used to send data shared by all args only once
+        initargs: a tuple of args for initializer
 
     Returns:
         results: a list such that results[i] == fn(args)
     """
     results = []
-    if num_processes == 1 or len(args_list) == 1:
+    if num_processes <= 1 or len(args_list) <= 1:
+        if initializer is not None:
+            initializer(*initargs)
         for args in args_list:
             results.append(fn(args))
     else:
-        with multiprocessing.get_context("spawn").Pool(num_processes) as p:
+        if profiler.is_enabled():
+            # Workers profile into the same dirs as this process
+            initargs = (profiler.get_output_dirs(), initializer, initargs)
+            initializer = profiler.init_worker
+
+        with multiprocessing.get_context("spawn").Pool(num_processes,
+                                                       initializer=initializer,
+                                                       initargs=initargs) as p:
             results.extend(p.map(fn, args_list))
 
+            # Let the workers exit on their own instead of terminating them,
+            # so their exit handlers run
+            p.close()
+            p.join()
+
     return results
 
 
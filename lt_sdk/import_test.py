@@ -0,0 +1,73 @@
+import json
+import subprocess
+import sys
+
+from lt_sdk.common import py_test_util
+
+# Prints the import time and loaded modules of a fresh interpreter as json
+_IMPORT_SCRIPT = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+{0}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+class ImportTest(py_test_util.PythonTestCase):
+
+    # Seconds, import lt_sdk should not do any real work
+    MAX_IMPORT_TIME = 1.0
+
+    # Heavy dependencies and packages that should only be loaded when used
+    LAZY_MODULES = [
+        "tensorflow",
+        "grpc",
+        "plotly",
+        "lt_sdk.api",
+        "lt_sdk.config",
+        "lt_sdk.graph",
+    ]
+
+    @staticmethod
+    def _run_import(statement):
+        """Returns (import time, list of module names) after running statement"""
+        output = subprocess.check_output(
+            [sys.executable,
+             "-c",
+             _IMPORT_SCRIPT.format(statement)])
+        result = json.loads(output.decode().strip().splitlines()[-1])
+        return result["elapsed"], result["modules"]
+
+    def _get_lazy_modules(self, modules):
+        return [
+            m for m in modules if any(
+                m == lazy or m.startswith(lazy + ".") for lazy in self.LAZY_MODULES)
+        ]
+
+    def test_import_time(self):
+        elapsed, _ = self._run_import("import lt_sdk")
+        self.assertLess(elapsed, self.MAX_IMPORT_TIME)
+
+    def test_import_does_not_load_lazy_modules(self):
+        _, modules = self._run_import("import lt_sdk")
+        self.assertIn("lt_sdk", modules)
+        self.assertEqual(self._get_lazy_modules(modules), [])
+
+    def test_inference_runner_does_not_load_tensorflow(self):
+        _, modules = self._run_import("from lt_sdk.inference import lt_inference")
+        self.assertIn("lt_sdk.graph.graph_collections.graph_collection", modules)
+        for lazy in ["tensorflow", "grpc", "plotly"]:
+            self.assertNotIn(lazy, modules)
+
+    def test_dir_lists_lazy_names(self):
+        _, modules = self._run_import(
+            "import lt_sdk\nassert 'LightConfig' in dir(lt_sdk)")
+        self.assertEqual(self._get_lazy_modules(modules), [])
+
+
+if __name__ == "__main__":
+    py_test_util.PythonTestProgram()
@@ -0,0 +1,153 @@
+import argparse
+import logging
+import threading
+import time
+
+import numpy as np
+
+from lt_sdk.graph.transform_graph import utils
+from lt_sdk.inference import lt_inference_client, lt_inference_server
+from lt_sdk.proto import hardware_configs_pb2, inference_pb2
+
+
+def run_load(address, num_clients, num_requests, batch_size):
+    """
+    Sends Predict requests with random inputs to an inference server from
+    num_clients concurrent clients
+
+    Params:
+        address: address of the server, for example "localhost:6000"
+        num_clients: number of concurrent clients
+        num_requests: number of requests sent by each client
+        batch_size: size of unknown dims of the inputs in each request
+
+    Returns:
+        a dictionary with the throughput and latency percentiles of the requests
+    """
+    with lt_inference_client.LTInferenceClient(address) as client:
+        inputs = inference_pb2.BatchedInferenceInput()
+        inputs.batches.add().CopyFrom(
+            utils.generate_random_inference_inputs(client.get_input_spec(),
+                                                   unknown_dim_size=batch_size))
+
+        latencies = []
+        lock = threading.Lock()
+
+        def send_requests():
+            for _ in range(num_requests):
+                start = time.time()
+                client.predict(inputs)
+                latency = time.time() - start
+                with lock:
+                    latencies.append(latency)
+
+        threads = [threading.Thread(target=send_requests) for _ in range(num_clients)]
+        start = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_time = time.time() - start
+
+    return {
+        "num_requests": len(latencies),
+        "requests_per_sec": len(latencies) / wall_time,
+        "samples_per_sec": len(latencies) * batch_size / wall_time,
+        "p50_latency_ms": 1000 * np.percentile(latencies, 50),
+        "p99_latency_ms": 1000 * np.percentile(latencies, 99),
+    }
+
+
+def log_report(name, report):
+    logging.info(
+        "{0}: {1} requests, {2:.1f} requests/s, {3:.1f} samples/s, p50 {4:.2f} ms, "
+        "p99 {5:.2f} ms".format(name,
+                                report["num_requests"],
+                                report["requests_per_sec"],
+                                report["samples_per_sec"],
+                                report["p50_latency_ms"],
+                                report["p99_latency_ms"]))
+
+
+def main(lgf_path,
+         address,
+         port,
+         hw_cfg,
+         num_clients,
+         num_requests,
+         batch_size,
+         max_batch_size,
+         max_wait_time):
+    """
+    If lgf_path is given, starts a server for lgf_path with batching off and on
+    and reports the load for both, otherwise reports the load of the server at
+    address
+    """
+    reports = {}
+    if lgf_path is None:
+        reports[address] = run_load(address, num_clients, num_requests, batch_size)
+    else:
+        for name, server_batch_size in [("batching off", 0),
+                                        ("batching on", max_batch_size)]:
+            server, servicer = lt_inference_server.create_server(
+                lgf_path,
+                port,
+                hw_cfg,
+                max_batch_size=server_batch_size,
+                max_wait_time=max_wait_time,
+                num_threads=num_clients)
+            try:
+                reports[name] = run_load("localhost:{0}".format(port),
+                                         num_clients,
+                                         num_requests,
+                                         batch_size)
+            finally:
+                server.stop(0)
+                servicer.close()
+
+    utils.log_message("Inference Server Load")
+    for name, report in reports.items():
+        log_report(name, report)
+
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lgf_path",
+                        type=str,
+                        default=None,
+                        help="start local servers for this lgf pb")
+    parser.add_argument("--address",
+                        type=str,
+                        default="localhost:6000",
+                        help="address of a running server, used without --lgf_path")
+    parser.add_argument("--port",
+                        type=int,
+                        default=6001,
+                        help="port for local servers")
+    parser.add_argument("--config_name",
+                        type=str,
+                        default=hardware_configs_pb2.HardwareConfig.Name(
+                            hardware_configs_pb2.DELTA))
+    parser.add_argument("--num_clients", type=int, default=16)
+    parser.add_argument("--num_requests",
+                        type=int,
+                        default=50,
+                        help="requests sent by each client")
+    parser.add_argument("--batch_size", type=int, default=1)
+    parser.add_argument("--max_batch_size", type=int, default=16)
+    parser.add_argument("--max_wait_ms", type=float, default=5)
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    main(args.lgf_path,
+         args.address,
+         args.port,
+         hardware_configs_pb2.HardwareConfig.Value(args.config_name),
+         args.num_clients,
+         args.num_requests,
+         args.batch_size,
+         args.max_batch_size,
+         args.max_wait_ms / 1000)
@@ -1,7 +1,8 @@
 import ctypes
 import os
 
-from lt_sdk.common import context_manager_utils
+from lt_sdk.common import context_manager_utils, lazy_library
+from lt_sdk.graph import external_weights
 from lt_sdk.graph.graph_collections import graph_collection
 from lt_sdk.proto import inference_pb2
 
@@ -12,7 +13,9 @@ class PyInferenceRunner(object):
     Instances of this class should ALWAYS be created with a context manager
     """
 
-    lib = ctypes.CDLL(os.path.join(os.path.dirname(__file__), "lib_py_wrapper.so"))
+    lib = lazy_library.LazyLibrary(
+        os.path.join(os.path.dirname(__file__),
+                     "lib_py_wrapper.so"))
 
     lib.CreatePyInferenceRunner.restype = ctypes.c_void_p
     lib.DeletePyInferenceRunner.argtypes = (ctypes.c_void_p,)
@@ -51,7 +54,7 @@ class PyInferenceRunner(object):
         spec_data = hw_spec.SerializeToString()
         sw_config_data = sw_config.SerializeToString()
         params_data = sim_params.SerializeToString()
-        lgf_data = lgf_pb.SerializeToString()
+        lgf_data = external_weights.materialized(lgf_pb).SerializeToString()
         input_data = inputs.SerializeToString()
         inf_out_size = ctypes.c_uint()
 
@@ -0,0 +1,89 @@
+import grpc
+
+from lt_sdk.graph.transform_graph import utils
+from lt_sdk.proto import inference_pb2, inference_pb2_grpc
+
+
+class LTInferenceClient(object):
+    """Client for a LTInferenceServer"""
+
+    def __init__(self, address):
+        """
+        Params:
+            address: address of the server, for example "localhost:6000"
+        """
+        self._channel = grpc.insecure_channel(address)
+        self._stub = inference_pb2_grpc.LTInferenceStub(self._channel)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._channel.close()
+
+    def get_input_spec(self):
+        """Returns a list of lgf_pb2.EdgeInfo() protobufs for the graph inputs"""
+        return list(self._stub.GetInputSpec(inference_pb2.GetInputSpecRequest()).inputs)
+
+    def predict(self, inputs):
+        """
+        Params:
+            inputs: a inference_pb2.BatchedInferenceInput() protobuf
+
+        Returns:
+            a inference_pb2.BatchedInferenceOutput() protobuf
+        """
+        return self._stub.Predict(inputs)
+
+    def predict_batch(self, inputs):
+        """
+        Params:
+            inputs: a inference_pb2.InferenceInput() protobuf
+
+        Returns:
+            a inference_pb2.InferenceOutput() protobuf
+        """
+        return self._stub.PredictBatch(inputs)
+
+    def predict_stream(self, frames, input_edges=None):
+        """
+        Runs a stream of frames with a single PredictStream call, the server runs
+        several frames at the same time
+
+        Params:
+            frames: an iterable where each element is a list of numpy arrays for a
+                single frame, corresponding to input_edges
+            input_edges: a list of lgf_pb2.EdgeInfo() protobufs for the arrays of a
+                frame, if None uses self.get_input_spec()
+
+        Returns:
+            an iterator of inference_pb2.InferenceOutput() protobufs, one for each
+            frame in the same order
+        """
+        if input_edges is None:
+            input_edges = self.get_input_spec()
+
+        def requests():
+            for i, array_list in enumerate(frames):
+                if len(array_list) != len(input_edges):
+                    raise ValueError(
+                        "Edge list does not match array list: {0} != {1}".format(
+                            input_edges,
+                            array_list))
+
+                request = inference_pb2.StreamInferenceInput()
+                # Edges are only sent with the first frame
+                if i == 0:
+                    request.input_edges.extend(input_edges)
+                for e, array in zip(input_edges, array_list):
+                    tensor_pb = request.inputs.add()
+                    tensor_pb.CopyFrom(utils.array_to_tensor_pb(array, e.dtype))
+                    tensor_pb.shape.batch_dim_indx = e.shape.batch_dim_indx
+                    tensor_pb.shape.batch_dilation_factor = \
+                        e.shape.batch_dilation_factor
+                yield request
+
+        return self._stub.PredictStream(requests())
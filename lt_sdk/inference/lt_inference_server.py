@@ -1,11 +1,14 @@
 import argparse
 import logging
+import queue
+import threading
 from concurrent import futures
 
 import grpc
 
 from lt_sdk.graph import lgf_graph
 from lt_sdk.graph.run_graph import graph_runner
+from lt_sdk.inference import request_batcher, worker_pool
 from lt_sdk.proto import (
     graph_types_pb2,
     hardware_configs_pb2,
@@ -18,10 +21,105 @@ from lt_sdk.proto.configs import config
 class LTInferenceServer(inference_pb2_grpc.LTInferenceServicer):
     """gRPC server wrapping graph_runner."""
 
-    def __init__(self, lgf_path, hw_cfg=hardware_configs_pb2.DELTA):
+    def __init__(self,
+                 lgf_path,
+                 hw_cfg=hardware_configs_pb2.DELTA,
+                 max_batch_size=0,
+                 max_wait_time=0.005,
+                 num_workers=0,
+                 max_queue_size=4,
+                 stream_depth=4):
+        """
+        Params:
+            lgf_path: path to a lgf pb
+            hw_cfg: a hardware_configs_pb2.HardwareConfig enum
+            max_batch_size: if greater than 1, concurrent requests are run together
+                until they have this many rows
+            max_wait_time: maximum number of seconds a request waits for other
+                requests when batching
+            num_workers: if greater than 0, inference is run in this many worker
+                processes instead of the server process
+            max_queue_size: maximum number of pending requests for each worker,
+                requests are rejected with RESOURCE_EXHAUSTED when all workers
+                are full. When batching, at most max_queue_size * max_batch_size
+                requests for each worker wait to be batched
+            stream_depth: maximum number of frames of a single PredictStream call
+                that are run at the same time
+        """
         self._lg = lgf_graph.LightGraph.from_pb(lgf_path)
-        spec, sw, sim = config.get_config(hw_cfg, graph_types_pb2.LGFProtobuf)
-        self._runner = graph_runner.GraphRunner(self._lg, spec, sw, sim)
+
+        if num_workers > 0:
+            self._runner = None
+            self._pool = worker_pool.InferenceWorkerPool(lgf_path,
+                                                         hw_cfg,
+                                                         num_workers,
+                                                         max_queue_size)
+            run_fn = self._pool.run
+        else:
+            spec, sw, sim = config.get_config(hw_cfg, graph_types_pb2.LGFProtobuf)
+            self._runner = graph_runner.GraphRunner(self._lg, spec, sw, sim)
+            self._runner.get_prepared_graph()
+            self._pool = None
+            run_fn = self._runner.run_prepared
+
+        if max_batch_size > 1:
+            # Keep every worker busy, the in process runner runs one batch at a time
+            max_in_flight = max(num_workers, 1)
+            self._batcher = request_batcher.RequestBatcher(
+                run_fn,
+                max_batch_size,
+                max_wait_time,
+                max_in_flight=max_in_flight,
+                max_queue_size=max_queue_size * max_batch_size * max_in_flight)
+        else:
+            self._batcher = None
+
+        self._run_fn = run_fn
+        self._stream_depth = max(stream_depth, 1)
+
+    def close(self):
+        """Stops the batching thread and the worker processes"""
+        if self._batcher is not None:
+            self._batcher.close()
+        if self._pool is not None:
+            self._pool.close()
+        if self._runner is not None:
+            self._runner.close()
+
+    def _run_inputs(self, inputs):
+        if self._batcher is not None:
+            return self._batcher.run(inputs)
+        return self._run_fn(inputs)
+
+    def _run(self, request, context):
+        try:
+            return self._run_inputs(request)
+        except worker_pool.ServerOverloadedError as e:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+
+    @staticmethod
+    def _get_frame_inputs(input_edges, request):
+        """Returns a inference_pb2.BatchedInferenceInput() for a single frame"""
+        if len(request.inputs) != len(input_edges):
+            raise ValueError("Expected {0} tensors in each frame, got {1}".format(
+                len(input_edges),
+                len(request.inputs)))
+
+        inputs = inference_pb2.BatchedInferenceInput()
+        inf_inp = inputs.batches.add()
+        for e, tensor_pb in zip(input_edges, request.inputs):
+            named_tensor = inf_inp.inputs.add()
+            named_tensor.edge_info.CopyFrom(e)
+            named_tensor.edge_info.shape.CopyFrom(tensor_pb.shape)
+            named_tensor.data.CopyFrom(tensor_pb)
+
+        return inputs
+
+    def _get_stream_output(self, future, context):
+        try:
+            return future.result().batches[0]
+        except worker_pool.ServerOverloadedError as e:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
 
     def GetInputSpec(self, request, context):
         ret = inference_pb2.GetInputSpecResponse()
@@ -30,22 +128,139 @@ class LTInferenceServer(inference_pb2_grpc.LTInferenceServicer):
         return ret
 
     def Predict(self, request, context):
-        return self._runner.run(request)
+        return self._run(request, context)
 
     def PredictBatch(self, request, context):
-        return self._runner.run_single_batch(request)
+        batched_request = inference_pb2.BatchedInferenceInput()
+        batched_request.batches.add().CopyFrom(request)
+        return self._run(batched_request, context).batches[0]
 
+    def _read_stream(self, request_iterator, executor, pending, slots, stopped):
+        """
+        Submits the frames of request_iterator to executor and puts their futures
+        in pending, followed by None at the end of the stream or by the exception
+        that ended it. Waits for one of the slots before submitting each frame
+        """
+        input_edges = None
+        try:
+            for request in request_iterator:
+                if input_edges is None:
+                    input_edges = list(request.input_edges) or self._lg.input_edges()
+                    self._prepare_stream(input_edges)
+                frame_inputs = self._get_frame_inputs(input_edges, request)
 
-def serve(lgf_path, port, hw_cfg):
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    inference_pb2_grpc.add_LTInferenceServicer_to_server(
-        LTInferenceServer(lgf_path,
-                          hw_cfg=hw_cfg),
-        server)
+                if stopped.is_set():
+                    return
+                slots.acquire()
+                if stopped.is_set():
+                    return
+
+                pending.put(executor.submit(self._run_inputs, frame_inputs))
+
+            pending.put(None)
+        except Exception as e:
+            pending.put(e)
+
+    def _prepare_stream(self, input_edges):
+        """
+        Prunes, exports and loads the graph for input_edges before the first
+        frame of a stream, all the frames of the stream reuse it. Workers
+        prepare the graph for new input edges on their first frame
+        """
+        if self._runner is not None:
+            self._runner.get_prepared_graph(input_edges)
+
+    def PredictStream(self, request_iterator, context):
+        """
+        Runs the frames of a stream with up to stream_depth frames in flight and
+        yields their outputs in order. The input edges come from the first
+        message of the stream, or the graph if it does not have any. The graph is
+        only prepared once for them, see GraphRunner.get_prepared_graph().
+
+        Frames are read on a separate thread, so the output of a frame is yielded
+        as soon as it and the frames before it are done, even if the client waits
+        for it before sending the next frame
+        """
+        pending = queue.Queue()
+        slots = threading.Semaphore(self._stream_depth)
+        stopped = threading.Event()
+        with futures.ThreadPoolExecutor(max_workers=self._stream_depth) as executor:
+            reader = threading.Thread(target=self._read_stream,
+                                      args=(request_iterator,
+                                            executor,
+                                            pending,
+                                            slots,
+                                            stopped),
+                                      daemon=True)
+            reader.start()
+            try:
+                while True:
+                    future = pending.get()
+                    if future is None:
+                        break
+                    if isinstance(future, Exception):
+                        raise future
+
+                    output = self._get_stream_output(future, context)
+                    slots.release()
+                    yield output
+            finally:
+                # Unblocks the reader if the stream is cancelled
+                stopped.set()
+                slots.release()
+
+
+def create_server(lgf_path,
+                  port,
+                  hw_cfg,
+                  max_batch_size=0,
+                  max_wait_time=0.005,
+                  num_workers=0,
+                  max_queue_size=4,
+                  stream_depth=4,
+                  num_threads=10):
+    """
+    Returns a tuple (server, servicer) with a started grpc server and its
+    LTInferenceServer, see LTInferenceServer for params. The caller must call
+    servicer.close() after stopping the server
+    """
+    servicer = LTInferenceServer(lgf_path,
+                                 hw_cfg=hw_cfg,
+                                 max_batch_size=max_batch_size,
+                                 max_wait_time=max_wait_time,
+                                 num_workers=num_workers,
+                                 max_queue_size=max_queue_size,
+                                 stream_depth=stream_depth)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=num_threads))
+    inference_pb2_grpc.add_LTInferenceServicer_to_server(servicer, server)
     server.add_insecure_port("[::]:{0}".format(port))
     server.start()
+    return server, servicer
+
+
+def serve(lgf_path,
+          port,
+          hw_cfg,
+          max_batch_size=0,
+          max_wait_time=0.005,
+          num_workers=0,
+          max_queue_size=4,
+          stream_depth=4,
+          num_threads=10):
+    server, servicer = create_server(lgf_path,
+                                     port,
+                                     hw_cfg,
+                                     max_batch_size=max_batch_size,
+                                     max_wait_time=max_wait_time,
+                                     num_workers=num_workers,
+                                     max_queue_size=max_queue_size,
+                                     stream_depth=stream_depth,
+                                     num_threads=num_threads)
     logging.info("LT Inference Server started ...")
-    server.wait_for_termination()
+    try:
+        server.wait_for_termination()
+    finally:
+        servicer.close()
 
 
 def main():
@@ -57,12 +272,42 @@ def main():
                         help="path to a lgf pb",
                         default=hardware_configs_pb2.HardwareConfig.Name(
                             hardware_configs_pb2.DELTA))
+    parser.add_argument("--max_batch_size",
+                        type=int,
+                        help="max rows to run together, batching is off if <= 1",
+                        default=0)
+    parser.add_argument("--max_wait_ms",
+                        type=float,
+                        help="max time a request waits for other requests",
+                        default=5)
+    parser.add_argument("--num_threads",
+                        type=int,
+                        help="number of threads handling requests",
+                        default=10)
+    parser.add_argument("--num_workers",
+                        type=int,
+                        help="number of inference worker processes, 0 runs in process",
+                        default=0)
+    parser.add_argument("--max_queue_size",
+                        type=int,
+                        help="max pending requests per worker process",
+                        default=4)
+    parser.add_argument("--stream_depth",
+                        type=int,
+                        help="max frames of a stream run at the same time",
+                        default=4)
 
     logging.basicConfig()
     args = parser.parse_args()
     serve(args.lgf_path,
           args.port,
-          hardware_configs_pb2.HardwareConfig.Value(args.config_name))
+          hardware_configs_pb2.HardwareConfig.Value(args.config_name),
+          max_batch_size=args.max_batch_size,
+          max_wait_time=args.max_wait_ms / 1000,
+          num_workers=args.num_workers,
+          max_queue_size=args.max_queue_size,
+          stream_depth=args.stream_depth,
+          num_threads=args.num_threads)
 
 
 if __name__ == "__main__":
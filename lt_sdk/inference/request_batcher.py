@@ -0,0 +1,320 @@
+import queue
+import threading
+import time
+from concurrent import futures
+
+import numpy as np
+
+from lt_sdk.graph.transform_graph import utils
+from lt_sdk.inference import worker_pool
+from lt_sdk.proto import inference_pb2
+
+
+def _get_batch_axis(tensor_pb):
+    """
+    Returns the batch axis of tensor_pb. Inputs without a batch dim are never
+    merged, outputs without one are split along axis 0
+    """
+    return max(tensor_pb.shape.batch_dim_indx, 0)
+
+
+def _get_num_rows(inf_inp):
+    """
+    Returns the number of rows in inf_inp, or None if its inputs do not all have
+    a batch dim of the same size and inf_inp cannot be merged with other inputs
+    """
+    num_rows = set()
+    for named_tensor in inf_inp.inputs:
+        shape = named_tensor.data.shape
+        if len(shape.d) == 0 or shape.batch_dim_indx < 0:
+            return None
+        num_rows.add(shape.d[_get_batch_axis(named_tensor.data)])
+
+    if len(num_rows) != 1:
+        return None
+
+    return num_rows.pop()
+
+
+def _get_merge_key(inf_inp):
+    """Inference inputs with the same key can be concatenated along their batch axis"""
+    key = []
+    for named_tensor in inf_inp.inputs:
+        axis = _get_batch_axis(named_tensor.data)
+        shape = list(named_tensor.data.shape.d)
+        key.append((named_tensor.edge_info.name,
+                    named_tensor.edge_info.port,
+                    named_tensor.data.dtype.SerializeToString(),
+                    axis,
+                    tuple(shape[:axis] + shape[axis + 1:])))
+
+    return tuple(key)
+
+
+def _get_array(tensor_pb):
+    return utils.tensor_pb_to_array(tensor_pb,
+                                    utils.dtype_pb_to_np_dtype(tensor_pb.dtype))
+
+
+def _set_array(named_tensor, array, axis):
+    named_tensor.data.tensor_content = array.tobytes()
+    named_tensor.data.shape.d[axis] = array.shape[axis]
+    if len(named_tensor.edge_info.shape.d) > axis:
+        named_tensor.edge_info.shape.d[axis] = array.shape[axis]
+
+
+def concat_inference_inputs(inference_inputs):
+    """
+    Params:
+        inference_inputs: a list of inference_pb2.InferenceInput() protobufs with the
+            same merge key
+
+    Returns:
+        a single inference_pb2.InferenceInput() protobuf with the inputs concatenated
+        along their batch axis
+    """
+    merged = inference_pb2.InferenceInput()
+    merged.CopyFrom(inference_inputs[0])
+    if len(inference_inputs) == 1:
+        return merged
+
+    for i, named_tensor in enumerate(merged.inputs):
+        axis = _get_batch_axis(named_tensor.data)
+        array = np.concatenate(
+            [_get_array(inf_inp.inputs[i].data) for inf_inp in inference_inputs],
+            axis=axis)
+        _set_array(named_tensor, array, axis)
+
+    return merged
+
+
+def split_inference_output(inf_out, num_rows):
+    """
+    Params:
+        inf_out: a inference_pb2.InferenceOutput() protobuf for concatenated inputs
+        num_rows: a list with the number of rows of each of the concatenated inputs
+
+    Returns:
+        a list of inference_pb2.InferenceOutput() protobufs, one for each element of
+        num_rows. The stats of inf_out are copied to all of them
+    """
+    if len(num_rows) == 1:
+        return [inf_out]
+
+    split_outputs = [inference_pb2.InferenceOutput() for _ in num_rows]
+    for split_output in split_outputs:
+        split_output.CopyFrom(inf_out)
+
+    for i, named_tensor in enumerate(inf_out.results):
+        axis = _get_batch_axis(named_tensor.data)
+        array = _get_array(named_tensor.data)
+        if array.shape[axis] != sum(num_rows):
+            raise ValueError("Cannot split output {0} with shape {1} into {2}".format(
+                named_tensor.edge_info.name,
+                array.shape,
+                num_rows))
+
+        arrays = np.split(array, np.cumsum(num_rows)[:-1], axis=axis)
+        for split_output, split_array in zip(split_outputs, arrays):
+            _set_array(split_output.results[i], split_array, axis)
+
+    return split_outputs
+
+
+class _PendingRequest(object):
+    """A request waiting for its outputs"""
+
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.num_rows = sum(_get_num_rows(inf_inp) or 1 for inf_inp in inputs.batches)
+        self.outputs = [None] * len(inputs.batches)
+        self.error = None
+        self.done = threading.Event()
+
+
+class RequestBatcher(object):
+    """
+    Coalesces concurrent requests into a single call of a run function. Requests
+    are collected until they have max_batch_size rows or the first request has
+    waited max_wait_time seconds. Inference inputs with the same edges, dtypes and
+    non-batch dims are concatenated along their batch axis, run together, and the
+    rows of the outputs are scattered back to the callers.
+
+    Up to max_in_flight merged batches are run at the same time. While all of them
+    are running, new requests wait in the queue and are merged into the next batch
+    """
+
+    def __init__(self,
+                 run_fn,
+                 max_batch_size,
+                 max_wait_time,
+                 max_in_flight=1,
+                 max_queue_size=0):
+        """
+        Params:
+            run_fn: a function that takes a inference_pb2.BatchedInferenceInput()
+                protobuf and returns a inference_pb2.BatchedInferenceOutput()
+                protobuf with one output for each batch of the input, must be
+                thread safe if max_in_flight > 1
+            max_batch_size: maximum number of rows to run together
+            max_wait_time: maximum number of seconds a request waits for other
+                requests before it is run
+            max_in_flight: maximum number of merged batches run at the same time
+            max_queue_size: if greater than 0, maximum number of requests waiting
+                to be run, a worker_pool.ServerOverloadedError is raised for new
+                requests while the queue is full
+        """
+        self._run_fn = run_fn
+        self._max_batch_size = max_batch_size
+        self._max_wait_time = max_wait_time
+
+        max_in_flight = max(max_in_flight, 1)
+        self._executor = futures.ThreadPoolExecutor(max_workers=max_in_flight)
+        self._slots = threading.Semaphore(max_in_flight)
+
+        self._queue = queue.Queue(maxsize=max(max_queue_size, 0))
+        self._deferred = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+
+    def run(self, inputs):
+        """
+        Params:
+            inputs: a inference_pb2.BatchedInferenceInput() protobuf
+
+        Returns:
+            a inference_pb2.BatchedInferenceOutput() protobuf, the same as
+            run_fn(inputs)
+
+        Raises:
+            worker_pool.ServerOverloadedError: if the queue is full
+        """
+        request = _PendingRequest(inputs)
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            raise worker_pool.ServerOverloadedError(
+                "{0} requests are waiting to be batched".format(self._queue.maxsize))
+        request.done.wait()
+
+        if request.error is not None:
+            raise request.error
+
+        outputs = inference_pb2.BatchedInferenceOutput()
+        outputs.batches.extend(request.outputs)
+        return outputs
+
+    def close(self):
+        """Stops the batching thread after the pending requests are done"""
+        self._queue.put(None)
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _collect_requests(self):
+        """Returns a list of requests to run together, or None when closed"""
+        if self._deferred is not None:
+            requests = [self._deferred]
+            self._deferred = None
+        elif self._stopped:
+            return None
+        else:
+            request = self._queue.get()
+            if request is None:
+                return None
+            requests = [request]
+
+        num_rows = requests[0].num_rows
+        deadline = time.time() + self._max_wait_time
+        while num_rows < self._max_batch_size:
+            timeout = deadline - time.time()
+            if timeout <= 0:
+                break
+
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+
+            if request is None:
+                # Run what we have, then stop
+                self._stopped = True
+                break
+
+            if num_rows + request.num_rows > self._max_batch_size:
+                self._deferred = request
+                break
+
+            requests.append(request)
+            num_rows += request.num_rows
+
+        return requests
+
+    def _run_requests(self, requests):
+        # Group inference inputs that can be concatenated, groups with the same
+        # input edges are run with a single call of run_fn
+        runs = {}
+        for request in requests:
+            for j, inf_inp in enumerate(request.inputs.batches):
+                edge_key = tuple((nt.edge_info.name, nt.edge_info.port)
+                                 for nt in inf_inp.inputs)
+                num_rows = _get_num_rows(inf_inp)
+                if num_rows is None:
+                    merge_key = (request, j)
+                else:
+                    merge_key = _get_merge_key(inf_inp)
+
+                groups = runs.setdefault(edge_key, {})
+                groups.setdefault(merge_key, []).append((request, j, inf_inp, num_rows))
+
+        for groups in runs.values():
+            try:
+                merged_inputs = inference_pb2.BatchedInferenceInput()
+                for group in groups.values():
+                    merged_inputs.batches.add().CopyFrom(
+                        concat_inference_inputs([inf_inp for _, _, inf_inp, _ in group]))
+
+                merged_outputs = self._run_fn(merged_inputs)
+                if len(merged_outputs.batches) != len(merged_inputs.batches):
+                    raise ValueError("Expected {0} outputs, got {1}".format(
+                        len(merged_inputs.batches),
+                        len(merged_outputs.batches)))
+
+                for group, inf_out in zip(groups.values(), merged_outputs.batches):
+                    split_outputs = split_inference_output(
+                        inf_out,
+                        [num_rows or 1 for _, _, _, num_rows in group])
+                    for (request, j, _, _), split_output in zip(group, split_outputs):
+                        request.outputs[j] = split_output
+            except Exception as e:
+                for group in groups.values():
+                    for request, _, _, _ in group:
+                        request.error = e
+
+        for request in requests:
+            request.done.set()
+
+    def _finish_requests(self, requests, future):
+        """Done callback of the future that ran requests"""
+        self._slots.release()
+
+        error = future.exception()
+        if error is not None:
+            for request in requests:
+                if not request.done.is_set():
+                    request.error = error
+                    request.done.set()
+
+    def _run_loop(self):
+        while True:
+            # Wait for a free slot before collecting, so requests that arrive
+            # while all the slots are busy are merged together
+            self._slots.acquire()
+            requests = self._collect_requests()
+            if requests is None:
+                self._slots.release()
+                return
+
+            future = self._executor.submit(self._run_requests, requests)
+            future.add_done_callback(
+                lambda f, requests=requests: self._finish_requests(requests, f))
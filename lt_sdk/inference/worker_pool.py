@@ -0,0 +1,344 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import traceback
+
+from lt_sdk.common import profiler
+from lt_sdk.graph import lgf_graph
+from lt_sdk.graph.run_graph import graph_runner
+from lt_sdk.proto import graph_types_pb2, inference_pb2
+from lt_sdk.proto.configs import config
+
+# Request and response protobufs are passed through files in this directory,
+# a tmpfs on linux so the tensors never leave shared memory
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+class ServerOverloadedError(Exception):
+    """Exception raised when all the request slots of all the workers are in use."""
+
+
+def _get_slot_path(pool_id, worker_id, slot, suffix):
+    return os.path.join(SHM_DIR,
+                        "lt_inference_{0}_{1}_{2}.{3}".format(pool_id,
+                                                              worker_id,
+                                                              slot,
+                                                              suffix))
+
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _worker_main(pool_id,
+                 worker_id,
+                 lgf_path,
+                 hw_cfg,
+                 request_queue,
+                 response_queue,
+                 profile_dirs):
+    """
+    Loads, prunes and exports the graph once, then runs the requests for the
+    slots sent on request_queue until it gets None. Each response is a tuple
+    (worker_id, slot, error), slot is None for the ready message.
+
+    If profile_dirs is not empty, the worker is profiled and its profile is
+    written to profile_dirs when it stops
+    """
+    for profile_dir in profile_dirs:
+        profiler.enable(profile_dir)
+
+    try:
+        _run_worker(pool_id,
+                    worker_id,
+                    lgf_path,
+                    hw_cfg,
+                    request_queue,
+                    response_queue)
+    finally:
+        profiler.flush()
+
+
+def _run_worker(pool_id, worker_id, lgf_path, hw_cfg, request_queue, response_queue):
+    try:
+        light_graph = lgf_graph.LightGraph.from_pb(lgf_path)
+        spec, sw, sim = config.get_config(hw_cfg, graph_types_pb2.LGFProtobuf)
+        runner = graph_runner.GraphRunner(light_graph, spec, sw, sim)
+        runner.get_prepared_graph()
+    except Exception:
+        response_queue.put((worker_id, None, traceback.format_exc()))
+        return
+
+    response_queue.put((worker_id, None, None))
+
+    while True:
+        slot = request_queue.get()
+        if slot is None:
+            runner.close()
+            return
+
+        try:
+            inputs = inference_pb2.BatchedInferenceInput()
+            inputs.ParseFromString(_read_bytes(_get_slot_path(pool_id,
+                                                              worker_id,
+                                                              slot,
+                                                              "in")))
+            outputs = runner.run_prepared(inputs)
+            _write_bytes(_get_slot_path(pool_id, worker_id, slot, "out"),
+                         outputs.SerializeToString())
+            error = None
+        except Exception:
+            error = traceback.format_exc()
+
+        response_queue.put((worker_id, slot, error))
+
+
+class _Worker(object):
+    """Parent side state of a worker process"""
+
+    def __init__(self, worker_id, max_queue_size):
+        self.worker_id = worker_id
+        self.free_slots = list(range(max_queue_size))
+        self.pending = {}
+        self.request_queue = None
+        self.process = None
+        self.ready = False
+
+
+class _PendingRequest(object):
+
+    def __init__(self):
+        self.error = None
+        self.done = threading.Event()
+
+
+class InferenceWorkerPool(object):
+    """
+    Runs inference in persistent worker processes that each hold an already
+    loaded graph. Each worker has max_queue_size request slots, requests are sent
+    to the worker with the most free slots and a ServerOverloadedError is raised
+    right away when no slot is free, instead of queueing without bound.
+
+    A worker process that exits fails its pending requests and is replaced by a
+    new worker with a new worker id. Requests are not sent to it until it has
+    loaded the graph
+    """
+
+    def __init__(self, lgf_path, hw_cfg, num_workers, max_queue_size):
+        """
+        Params:
+            lgf_path: path to a lgf pb
+            hw_cfg: a hardware_configs_pb2.HardwareConfig enum
+            num_workers: number of worker processes
+            max_queue_size: maximum number of requests sent to a single worker
+                that are not done yet
+        """
+        self._pool_id = "{0}_{1}".format(os.getpid(), id(self))
+        self._lgf_path = lgf_path
+        self._hw_cfg = hw_cfg
+        self._max_queue_size = max_queue_size
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._response_queue = self._ctx.Queue()
+
+        # Maps worker ids to _Worker objects
+        self._workers = {}
+        self._next_worker_id = 0
+        for _ in range(num_workers):
+            self._start_worker()
+
+        # Wait for all the graphs to be loaded
+        errors = []
+        for _ in range(num_workers):
+            worker_id, _, error = self._response_queue.get()
+            if error is not None:
+                errors.append("Worker {0} failed to start:\n{1}".format(worker_id, error))
+            else:
+                self._workers[worker_id].ready = True
+
+        if errors:
+            self.close()
+            raise RuntimeError("\n".join(errors))
+
+        self._thread = threading.Thread(target=self._response_loop, daemon=True)
+        self._thread.start()
+        logging.info("Started {0} inference workers".format(num_workers))
+
+    def _start_worker(self):
+        worker = _Worker(self._next_worker_id, self._max_queue_size)
+        self._next_worker_id += 1
+
+        worker.request_queue = self._ctx.Queue()
+        worker.process = self._ctx.Process(target=_worker_main,
+                                           args=(self._pool_id,
+                                                 worker.worker_id,
+                                                 self._lgf_path,
+                                                 self._hw_cfg,
+                                                 worker.request_queue,
+                                                 self._response_queue,
+                                                 profiler.get_output_dirs()),
+                                           daemon=True)
+        worker.process.start()
+        self._workers[worker.worker_id] = worker
+
+    def _remove_slot_files(self, worker, slots):
+        for slot in slots:
+            for suffix in ["in", "out"]:
+                path = _get_slot_path(self._pool_id, worker.worker_id, slot, suffix)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _replace_dead_workers(self):
+        """
+        Fails the requests of workers that exited and starts new workers in
+        their place. Workers that exit before loading the graph are not replaced
+        """
+        for worker in list(self._workers.values()):
+            if worker.process.is_alive():
+                continue
+
+            error = "Inference worker {0} exited with code {1}".format(
+                worker.worker_id,
+                worker.process.exitcode)
+            logging.error(error)
+
+            # Files of pending slots are removed when they are released
+            del self._workers[worker.worker_id]
+            self._remove_slot_files(worker, worker.free_slots)
+            if not worker.ready:
+                continue
+
+            for request in worker.pending.values():
+                request.error = error
+                request.done.set()
+            self._start_worker()
+
+    def _acquire_slot(self):
+        with self._lock:
+            if self._closed:
+                raise ValueError("Worker pool is closed")
+
+            self._replace_dead_workers()
+            ready_workers = [w for w in self._workers.values() if w.ready]
+            if not ready_workers:
+                raise ServerOverloadedError("No inference workers are ready")
+
+            worker = max(ready_workers, key=lambda w: len(w.free_slots))
+            if not worker.free_slots:
+                raise ServerOverloadedError(
+                    "All {0} inference workers have {1} pending requests".format(
+                        len(ready_workers),
+                        len(worker.pending)))
+
+            slot = worker.free_slots.pop()
+            request = _PendingRequest()
+            worker.pending[slot] = request
+
+        return worker, slot, request
+
+    def _release_slot(self, worker, slot):
+        with self._lock:
+            del worker.pending[slot]
+            worker.free_slots.append(slot)
+            if self._workers.get(worker.worker_id) is not worker:
+                self._remove_slot_files(worker, [slot])
+
+    def run(self, inputs):
+        """
+        Params:
+            inputs: a inference_pb2.BatchedInferenceInput() protobuf
+
+        Returns:
+            a inference_pb2.BatchedInferenceOutput() protobuf from one of the workers
+
+        Raises:
+            ServerOverloadedError: if all the request slots are in use
+        """
+        worker, slot, request = self._acquire_slot()
+        try:
+            _write_bytes(_get_slot_path(self._pool_id,
+                                        worker.worker_id,
+                                        slot,
+                                        "in"),
+                         inputs.SerializeToString())
+            worker.request_queue.put(slot)
+            while not request.done.wait(1.0):
+                if not worker.process.is_alive():
+                    raise RuntimeError("Inference worker {0} exited".format(
+                        worker.worker_id))
+
+            if request.error is not None:
+                raise RuntimeError("Inference worker {0} failed:\n{1}".format(
+                    worker.worker_id,
+                    request.error))
+
+            outputs = inference_pb2.BatchedInferenceOutput()
+            outputs.ParseFromString(
+                _read_bytes(_get_slot_path(self._pool_id,
+                                           worker.worker_id,
+                                           slot,
+                                           "out")))
+            return outputs
+        finally:
+            self._release_slot(worker, slot)
+
+    def _response_loop(self):
+        while True:
+            response = self._response_queue.get()
+            if response is None:
+                return
+
+            worker_id, slot, error = response
+            with self._lock:
+                # Responses of workers that were already replaced are dropped
+                worker = self._workers.get(worker_id)
+                if worker is None:
+                    continue
+
+                if slot is None:
+                    # Ready message of a new worker
+                    if error is None:
+                        worker.ready = True
+                    else:
+                        logging.error("Worker {0} failed to start:\n{1}".format(
+                            worker_id,
+                            error))
+                        del self._workers[worker_id]
+                    continue
+
+                request = worker.pending.get(slot)
+
+            if request is not None:
+                request.error = error
+                request.done.set()
+
+    def close(self):
+        """Stops the worker processes and removes their request files"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        with self._lock:
+            workers = list(self._workers.values())
+        for worker in workers:
+            worker.request_queue.put(None)
+        for worker in workers:
+            worker.process.join()
+
+        if hasattr(self, "_thread"):
+            self._response_queue.put(None)
+            self._thread.join()
+
+        for worker in workers:
+            self._remove_slot_files(worker, worker.free_slots + list(worker.pending))
@@ -23,7 +23,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='light',
   syntax='proto3',
   serialized_options=None,
-  serialized_pb=_b('\n\x19lt_sdk/proto/common.proto\x12\x05light\x1a\x19lt_sdk/proto/dtypes.proto\x1a\x16lt_sdk/proto/ops.proto\"O\n\x0bTensorShape\x12\t\n\x01\x64\x18\x01 \x03(\x05\x12\x16\n\x0e\x62\x61tch_dim_indx\x18\x02 \x01(\x05\x12\x1d\n\x15\x62\x61tch_dilation_factor\x18\x03 \x01(\x05\"`\n\x06Tensor\x12\x16\n\x0etensor_content\x18\x01 \x01(\x0c\x12!\n\x05shape\x18\x02 \x01(\x0b\x32\x12.light.TensorShape\x12\x1b\n\x05\x64type\x18\x03 \x01(\x0b\x32\x0c.light.DType\"g\n\tListParam\x12\t\n\x01s\x18\x01 \x03(\t\x12\t\n\x01i\x18\x02 \x03(\x05\x12\t\n\x01\x66\x18\x03 \x03(\x02\x12\t\n\x01\x62\x18\x04 \x03(\x08\x12\x18\n\x01t\x18\x05 \x03(\x0b\x32\r.light.Tensor\x12\x14\n\x01o\x18\x06 \x03(\x0e\x32\t.light.Op\"E\n\x08HistKeys\x12\x0c\n\x04keys\x18\x01 \x03(\x05\x12+\n\nquant_type\x18\x02 \x01(\x0e\x32\x17.light.QuantizationType\"\xa4\x01\n\x05Param\x12\x0b\n\x01s\x18\x01 \x01(\tH\x00\x12\x0b\n\x01i\x18\x02 \x01(\x05H\x00\x12\x0b\n\x01\x66\x18\x03 \x01(\x02H\x00\x12\x0b\n\x01\x62\x18\x04 \x01(\x08H\x00\x12\x1a\n\x01t\x18\x05 \x01(\x0b\x32\r.light.TensorH\x00\x12\x16\n\x01o\x18\x06 \x01(\x0e\x32\t.light.OpH\x00\x12\x1d\n\x01l\x18\x07 \x01(\x0b\x32\x10.light.ListParamH\x00\x12\x0b\n\x01v\x18\x08 \x01(\x0cH\x00\x42\x07\n\x05value*k\n\x10QuantizationType\x12\x0e\n\nQT_INVALID\x10\x00\x12\r\n\tQT_SINGLE\x10\x01\x12\x0f\n\x0bQT_PER_TILE\x10\x02\x12\x0e\n\nQT_PER_COL\x10\x03\x12\x17\n\x13QT_PER_COL_PER_TILE\x10\x04*O\n\x14QuantizationBiasType\x12\x0e\n\nQB_INVALID\x10\x00\x12\x0b\n\x07QB_NONE\x10\x01\x12\x0b\n\x07QB_MEAN\x10\x02\x12\r\n\tQB_MEDIAN\x10\x03*\xb6\x03\n\x12QuantizationMethod\x12\x0e\n\nQM_INVALID\x10\x00\x12\x12\n\x0eQM_MAX_ABS_VAL\x10\x01\x12\x18\n\x14QM_MIN_KL_DIVERGENCE\x10\x02\x12\"\n\x1eQM_MIN_KL_DIVERGENCE_WITH_SKIP\x10\x03\x12#\n\x1fQM_MIN_TOTAL_VARIATION_DISTANCE\x10\x04\x12-\n)QM_MIN_TOTAL_VARIATION_DISTANCE_WITH_SKIP\x10\x05\x12!\n\x1dQM_MAX_HISTOGRAM_INTERSECTION\x10\x06\x12+\n\'QM_MAX_HISTOGRAM_INTERSECTION_WITH_SKIP\x10\x07\x12\x1d\n\x19QM_MIN_MEAN_SQUARED_ERROR\x10\x08\x12\'\n#QM_MIN_MEAN_SQUARED_ERROR_WITH_SKIP\x10\t\x12\x19\n\x15QM_MIN_MEAN_ABS_ERROR\x10\n\x12#\n\x1fQM_MIN_MEAN_ABS_ERROR_WITH_SKIP\x10\x0b\x12\x12\n\x0eQM_FAVOR_SMALL\x10\x0c\x62\x06proto3')
+  serialized_pb=_b('\n\x19lt_sdk/proto/common.proto\x12\x05light\x1a\x19lt_sdk/proto/dtypes.proto\x1a\x16lt_sdk/proto/ops.proto\"O\n\x0bTensorShape\x12\t\n\x01\x64\x18\x01 \x03(\x05\x12\x16\n\x0e\x62\x61tch_dim_indx\x18\x02 \x01(\x05\x12\x1d\n\x15\x62\x61tch_dilation_factor\x18\x03 \x01(\x05\"B\n\x12\x45xternalTensorData\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0e\n\x06offset\x18\x02 \x01(\x03\x12\x0e\n\x06length\x18\x03 \x01(\x03\"\x92\x01\n\x06Tensor\x12\x16\n\x0etensor_content\x18\x01 \x01(\x0c\x12!\n\x05shape\x18\x02 \x01(\x0b\x32\x12.light.TensorShape\x12\x1b\n\x05\x64type\x18\x03 \x01(\x0b\x32\x0c.light.DType\x12\x30\n\rexternal_data\x18\x04 \x01(\x0b\x32\x19.light.ExternalTensorData\"g\n\tListParam\x12\t\n\x01s\x18\x01 \x03(\t\x12\t\n\x01i\x18\x02 \x03(\x05\x12\t\n\x01\x66\x18\x03 \x03(\x02\x12\t\n\x01\x62\x18\x04 \x03(\x08\x12\x18\n\x01t\x18\x05 \x03(\x0b\x32\r.light.Tensor\x12\x14\n\x01o\x18\x06 \x03(\x0e\x32\t.light.Op\"E\n\x08HistKeys\x12\x0c\n\x04keys\x18\x01 \x03(\x05\x12+\n\nquant_type\x18\x02 \x01(\x0e\x32\x17.light.QuantizationType\"\xa4\x01\n\x05Param\x12\x0b\n\x01s\x18\x01 \x01(\tH\x00\x12\x0b\n\x01i\x18\x02 \x01(\x05H\x00\x12\x0b\n\x01\x66\x18\x03 \x01(\x02H\x00\x12\x0b\n\x01\x62\x18\x04 \x01(\x08H\x00\x12\x1a\n\x01t\x18\x05 \x01(\x0b\x32\r.light.TensorH\x00\x12\x16\n\x01o\x18\x06 \x01(\x0e\x32\t.light.OpH\x00\x12\x1d\n\x01l\x18\x07 \x01(\x0b\x32\x10.light.ListParamH\x00\x12\x0b\n\x01v\x18\x08 \x01(\x0cH\x00\x42\x07\n\x05value*k\n\x10QuantizationType\x12\x0e\n\nQT_INVALID\x10\x00\x12\r\n\tQT_SINGLE\x10\x01\x12\x0f\n\x0bQT_PER_TILE\x10\x02\x12\x0e\n\nQT_PER_COL\x10\x03\x12\x17\n\x13QT_PER_COL_PER_TILE\x10\x04*O\n\x14QuantizationBiasType\x12\x0e\n\nQB_INVALID\x10\x00\x12\x0b\n\x07QB_NONE\x10\x01\x12\x0b\n\x07QB_MEAN\x10\x02\x12\r\n\tQB_MEDIAN\x10\x03*\xb6\x03\n\x12QuantizationMethod\x12\x0e\n\nQM_INVALID\x10\x00\x12\x12\n\x0eQM_MAX_ABS_VAL\x10\x01\x12\x18\n\x14QM_MIN_KL_DIVERGENCE\x10\x02\x12\"\n\x1eQM_MIN_KL_DIVERGENCE_WITH_SKIP\x10\x03\x12#\n\x1fQM_MIN_TOTAL_VARIATION_DISTANCE\x10\x04\x12-\n)QM_MIN_TOTAL_VARIATION_DISTANCE_WITH_SKIP\x10\x05\x12!\n\x1dQM_MAX_HISTOGRAM_INTERSECTION\x10\x06\x12+\n\'QM_MAX_HISTOGRAM_INTERSECTION_WITH_SKIP\x10\x07\x12\x1d\n\x19QM_MIN_MEAN_SQUARED_ERROR\x10\x08\x12\'\n#QM_MIN_MEAN_SQUARED_ERROR_WITH_SKIP\x10\t\x12\x19\n\x15QM_MIN_MEAN_ABS_ERROR\x10\n\x12#\n\x1fQM_MIN_MEAN_ABS_ERROR_WITH_SKIP\x10\x0b\x12\x12\n\x0eQM_FAVOR_SMALL\x10\x0c\x62\x06proto3')
   ,
   dependencies=[lt__sdk_dot_proto_dot_dtypes__pb2.DESCRIPTOR,lt__sdk_dot_proto_dot_ops__pb2.DESCRIPTOR,])
 
@@ -56,8 +56,8 @@ _QUANTIZATIONTYPE = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=609,
-  serialized_end=716,
+  serialized_start=728,
+  serialized_end=835,
 )
 _sym_db.RegisterEnumDescriptor(_QUANTIZATIONTYPE)
 
@@ -87,8 +87,8 @@ _QUANTIZATIONBIASTYPE = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=718,
-  serialized_end=797,
+  serialized_start=837,
+  serialized_end=916,
 )
 _sym_db.RegisterEnumDescriptor(_QUANTIZATIONBIASTYPE)
 
@@ -154,8 +154,8 @@ _QUANTIZATIONMETHOD = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=800,
-  serialized_end=1238,
+  serialized_start=919,
+  serialized_end=1357,
 )
 _sym_db.RegisterEnumDescriptor(_QUANTIZATIONMETHOD)
 
@@ -230,6 +230,51 @@ _TENSORSHAPE = _descriptor.Descriptor(
 )
 
 
+_EXTERNALTENSORDATA = _descriptor.Descriptor(
+  name='ExternalTensorData',
+  full_name='light.ExternalTensorData',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='path', full_name='light.ExternalTensorData.path', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='offset', full_name='light.ExternalTensorData.offset', index=1,
+      number=2, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='length', full_name='light.ExternalTensorData.length', index=2,
+      number=3, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=168,
+  serialized_end=234,
+)
+
+
 _TENSOR = _descriptor.Descriptor(
   name='Tensor',
   full_name='light.Tensor',
@@ -258,6 +303,13 @@ _TENSOR = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='external_data', full_name='light.Tensor.external_data', index=3,
+      number=4, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -270,8 +322,8 @@ _TENSOR = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=168,
-  serialized_end=264,
+  serialized_start=237,
+  serialized_end=383,
 )
 
 
@@ -336,8 +388,8 @@ _LISTPARAM = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=266,
-  serialized_end=369,
+  serialized_start=385,
+  serialized_end=488,
 )
 
 
@@ -374,8 +426,8 @@ _HISTKEYS = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=371,
-  serialized_end=440,
+  serialized_start=490,
+  serialized_end=559,
 )
 
 
@@ -457,12 +509,13 @@ _PARAM = _descriptor.Descriptor(
       name='value', full_name='light.Param.value',
       index=0, containing_type=None, fields=[]),
   ],
-  serialized_start=443,
-  serialized_end=607,
+  serialized_start=562,
+  serialized_end=726,
 )
 
 _TENSOR.fields_by_name['shape'].message_type = _TENSORSHAPE
 _TENSOR.fields_by_name['dtype'].message_type = lt__sdk_dot_proto_dot_dtypes__pb2._DTYPE
+_TENSOR.fields_by_name['external_data'].message_type = _EXTERNALTENSORDATA
 _LISTPARAM.fields_by_name['t'].message_type = _TENSOR
 _LISTPARAM.fields_by_name['o'].enum_type = lt__sdk_dot_proto_dot_ops__pb2._OP
 _HISTKEYS.fields_by_name['quant_type'].enum_type = _QUANTIZATIONTYPE
@@ -494,6 +547,7 @@ _PARAM.oneofs_by_name['value'].fields.append(
   _PARAM.fields_by_name['v'])
 _PARAM.fields_by_name['v'].containing_oneof = _PARAM.oneofs_by_name['value']
 DESCRIPTOR.message_types_by_name['TensorShape'] = _TENSORSHAPE
+DESCRIPTOR.message_types_by_name['ExternalTensorData'] = _EXTERNALTENSORDATA
 DESCRIPTOR.message_types_by_name['Tensor'] = _TENSOR
 DESCRIPTOR.message_types_by_name['ListParam'] = _LISTPARAM
 DESCRIPTOR.message_types_by_name['HistKeys'] = _HISTKEYS
@@ -510,6 +564,13 @@ TensorShape = _reflection.GeneratedProtocolMessageType('TensorShape', (_message.
   })
 _sym_db.RegisterMessage(TensorShape)
 
+ExternalTensorData = _reflection.GeneratedProtocolMessageType('ExternalTensorData', (_message.Message,), {
+  'DESCRIPTOR' : _EXTERNALTENSORDATA,
+  '__module__' : 'lt_sdk.proto.common_pb2'
+  # @@protoc_insertion_point(class_scope:light.ExternalTensorData)
+  })
+_sym_db.RegisterMessage(ExternalTensorData)
+
 Tensor = _reflection.GeneratedProtocolMessageType('Tensor', (_message.Message,), {
   'DESCRIPTOR' : _TENSOR,
   '__module__' : 'lt_sdk.proto.common_pb2'
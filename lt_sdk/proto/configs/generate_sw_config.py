@@ -293,6 +293,7 @@ def set_instruction_formats(sw_config, protos=[]):
 def generate_standard_sw_config(
         graph_type,
         num_threads_scales=32,
+        num_transform_processes=1,
         activation_scale_quantization_bias_type=common_pb2.QB_NONE,
         weight_quantization_type=common_pb2.QT_PER_COL_PER_TILE,
         weight_quantization_cutoff=0,
@@ -300,10 +301,19 @@ def generate_standard_sw_config(
         activation_scale_quantization_method=common_pb2.QM_MIN_KL_DIVERGENCE,
         adc_scale_quantization_method=common_pb2.QM_MIN_TOTAL_VARIATION_DISTANCE,
         cache_dir="",
+        import_cache_dir="",
+        profile_dir="",
         skip_adc_cal=False,
         skip_activation_cal=False,
         activation_scale_num_bins=4096,
         adc_scale_num_bins=4096,
+        single_pass_calibration=False,
+        num_calibration_seed_batches=1,
+        calibration_convergence_check_interval=0,
+        calibration_convergence_tolerance=1e-3,
+        calibration_convergence_patience=2,
+        calibration_checkpoint_dir="",
+        calibration_checkpoint_interval=100,
         nodes_to_skip=[],
         float_type=create_dtype(dtypes_pb2.DT_BFLOAT,
                                 16),
@@ -312,6 +322,7 @@ def generate_standard_sw_config(
         save_hist_html_files=False,
         ops_to_skip=[],
         fold_phasify=True,
+        batch_fold_phasify=False,
         collect_bit_activity=False,
         collect_memory_layout=False,
         ignore_nodes_filter=None,
@@ -360,6 +371,8 @@ def generate_standard_sw_config(
     if fold_phasify:
         sw_config.standard_transform_stages.append(sw_config_pb2.FOLD_PHASIFY_CONSTANTS)
 
+    sw_config.batch_fold_phasify_constants = batch_fold_phasify
+
     sw_config.use_weight_sharing = False
 
     sw_config.float_type.CopyFrom(float_type)
@@ -378,6 +391,15 @@ def generate_standard_sw_config(
     sw_config.activation_scale_num_bins = activation_scale_num_bins
     sw_config.adc_scale_num_bins = adc_scale_num_bins
 
+    sw_config.single_pass_calibration = single_pass_calibration
+    sw_config.num_calibration_seed_batches = num_calibration_seed_batches
+    sw_config.calibration_convergence_check_interval = \
+        calibration_convergence_check_interval
+    sw_config.calibration_convergence_tolerance = calibration_convergence_tolerance
+    sw_config.calibration_convergence_patience = calibration_convergence_patience
+    sw_config.calibration_checkpoint_dir = calibration_checkpoint_dir
+    sw_config.calibration_checkpoint_interval = calibration_checkpoint_interval
+
     get_standard_filter_transform_map(sw_config, graph_type, hw_cfg, ignore_nodes_filter)
 
     sw_config.node_types.opu_nodes.extend([
@@ -389,6 +411,7 @@ def generate_standard_sw_config(
     sw_config.node_types.quantized_electronic_nodes.extend(quantized_electronic_nodes)
 
     sw_config.num_threads_scales = num_threads_scales
+    sw_config.num_transform_processes = num_transform_processes
 
     sw_config.debug_info.collect_checksums = False
     sw_config.debug_info.debug_dir = debug_dir
@@ -396,6 +419,8 @@ def generate_standard_sw_config(
     sw_config.max_proto_size = int(1.8e9)
 
     sw_config.cache_dir = cache_dir
+    sw_config.import_cache_dir = import_cache_dir
+    sw_config.profile_dir = profile_dir
 
     sw_config.sweep_info.py_batch_size = py_batch_size
     sw_config.sweep_info.num_py_batches = num_py_batches
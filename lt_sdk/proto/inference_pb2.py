@@ -23,7 +23,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='light',
   syntax='proto3',
   serialized_options=None,
-  serialized_pb=_b('\n\x1clt_sdk/proto/inference.proto\x12\x05light\x1a\x19lt_sdk/proto/common.proto\x1a\x16lt_sdk/proto/lgf.proto\x1a\"lt_sdk/proto/subgraph_binary.proto\"N\n\x0bNamedTensor\x12\"\n\tedge_info\x18\x01 \x01(\x0b\x32\x0f.light.EdgeInfo\x12\x1b\n\x04\x64\x61ta\x18\x02 \x01(\x0b\x32\r.light.Tensor\"4\n\x0eInferenceInput\x12\"\n\x06inputs\x18\x01 \x03(\x0b\x32\x12.light.NamedTensor\"\xdc\x02\n\x10InstructionStats\x12\x15\n\rduration_clks\x18\x01 \x01(\x03\x12\x11\n\tstart_clk\x18\x02 \x01(\x03\x12\n\n\x02pc\x18\x03 \x01(\x03\x12\x11\n\tunit_name\x18\x07 \x03(\t\x12*\n\x0binstruction\x18\x08 \x01(\x0b\x32\x15.light.OPUInstruction\x12\x15\n\rinterconnects\x18\t \x03(\x05\x12\x15\n\rdram_channels\x18\x0b \x03(\x05\x12\x10\n\x08io_ports\x18\x0c \x03(\x05\x12\x0c\n\x04opus\x18\r \x03(\x05\x12\x18\n\x10wavelengths_used\x18\x0e \x01(\x05\x12\x39\n\tchecksums\x18\n \x03(\x0b\x32&.light.InstructionStats.ChecksumsEntry\x1a\x30\n\x0e\x43hecksumsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"j\n\x0e\x45xecutionStats\x12\x14\n\x0ctotal_clocks\x18\x01 \x01(\x03\x12-\n\x0cinstructions\x18\x02 \x03(\x0b\x32\x17.light.InstructionStats\x12\x13\n\x0bnum_samples\x18\x03 \x01(\x05\"\\\n\x0fInferenceOutput\x12#\n\x07results\x18\x01 \x03(\x0b\x32\x12.light.NamedTensor\x12$\n\x05stats\x18\x02 \x01(\x0b\x32\x15.light.ExecutionStats\"?\n\x15\x42\x61tchedInferenceInput\x12&\n\x07\x62\x61tches\x18\x01 \x03(\x0b\x32\x15.light.InferenceInput\"A\n\x16\x42\x61tchedInferenceOutput\x12\'\n\x07\x62\x61tches\x18\x01 \x03(\x0b\x32\x16.light.InferenceOutput\"\x15\n\x13GetInputSpecRequest\"7\n\x14GetInputSpecResponse\x12\x1f\n\x06inputs\x18\x01 \x03(\x0b\x32\x0f.light.EdgeInfo2\xe3\x01\n\x0bLTInference\x12I\n\x0cGetInputSpec\x12\x1a.light.GetInputSpecRequest\x1a\x1b.light.GetInputSpecResponse\"\x00\x12H\n\x07Predict\x12\x1c.light.BatchedInferenceInput\x1a\x1d.light.BatchedInferenceOutput\"\x00\x12?\n\x0cPredictBatch\x12\x15.light.InferenceInput\x1a\x16.light.InferenceOutput\"\x00\x62\x06proto3')
+  serialized_pb=_b('\n\x1clt_sdk/proto/inference.proto\x12\x05light\x1a\x19lt_sdk/proto/common.proto\x1a\x16lt_sdk/proto/lgf.proto\x1a\"lt_sdk/proto/subgraph_binary.proto\"N\n\x0bNamedTensor\x12\"\n\tedge_info\x18\x01 \x01(\x0b\x32\x0f.light.EdgeInfo\x12\x1b\n\x04\x64\x61ta\x18\x02 \x01(\x0b\x32\r.light.Tensor\"4\n\x0eInferenceInput\x12\"\n\x06inputs\x18\x01 \x03(\x0b\x32\x12.light.NamedTensor\"\xdc\x02\n\x10InstructionStats\x12\x15\n\rduration_clks\x18\x01 \x01(\x03\x12\x11\n\tstart_clk\x18\x02 \x01(\x03\x12\n\n\x02pc\x18\x03 \x01(\x03\x12\x11\n\tunit_name\x18\x07 \x03(\t\x12*\n\x0binstruction\x18\x08 \x01(\x0b\x32\x15.light.OPUInstruction\x12\x15\n\rinterconnects\x18\t \x03(\x05\x12\x15\n\rdram_channels\x18\x0b \x03(\x05\x12\x10\n\x08io_ports\x18\x0c \x03(\x05\x12\x0c\n\x04opus\x18\r \x03(\x05\x12\x18\n\x10wavelengths_used\x18\x0e \x01(\x05\x12\x39\n\tchecksums\x18\n \x03(\x0b\x32&.light.InstructionStats.ChecksumsEntry\x1a\x30\n\x0e\x43hecksumsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"j\n\x0e\x45xecutionStats\x12\x14\n\x0ctotal_clocks\x18\x01 \x01(\x03\x12-\n\x0cinstructions\x18\x02 \x03(\x0b\x32\x17.light.InstructionStats\x12\x13\n\x0bnum_samples\x18\x03 \x01(\x05\"\\\n\x0fInferenceOutput\x12#\n\x07results\x18\x01 \x03(\x0b\x32\x12.light.NamedTensor\x12$\n\x05stats\x18\x02 \x01(\x0b\x32\x15.light.ExecutionStats\"?\n\x15\x42\x61tchedInferenceInput\x12&\n\x07\x62\x61tches\x18\x01 \x03(\x0b\x32\x15.light.InferenceInput\"A\n\x16\x42\x61tchedInferenceOutput\x12\'\n\x07\x62\x61tches\x18\x01 \x03(\x0b\x32\x16.light.InferenceOutput\"[\n\x14StreamInferenceInput\x12$\n\x0binput_edges\x18\x01 \x03(\x0b\x32\x0f.light.EdgeInfo\x12\x1d\n\x06inputs\x18\x02 \x03(\x0b\x32\r.light.Tensor\"\x15\n\x13GetInputSpecRequest\"7\n\x14GetInputSpecResponse\x12\x1f\n\x06inputs\x18\x01 \x03(\x0b\x32\x0f.light.EdgeInfo2\xaf\x02\n\x0bLTInference\x12I\n\x0cGetInputSpec\x12\x1a.light.GetInputSpecRequest\x1a\x1b.light.GetInputSpecResponse\"\x00\x12H\n\x07Predict\x12\x1c.light.BatchedInferenceInput\x1a\x1d.light.BatchedInferenceOutput\"\x00\x12?\n\x0cPredictBatch\x12\x15.light.InferenceInput\x1a\x16.light.InferenceOutput\"\x00\x12J\n\rPredictStream\x12\x1b.light.StreamInferenceInput\x1a\x16.light.InferenceOutput\"\x00(\x01\x30\x01\x62\x06proto3')
   ,
   dependencies=[lt__sdk_dot_proto_dot_common__pb2.DESCRIPTOR,lt__sdk_dot_proto_dot_lgf__pb2.DESCRIPTOR,lt__sdk_dot_proto_dot_subgraph__binary__pb2.DESCRIPTOR,])
 
@@ -382,6 +382,44 @@ _BATCHEDINFERENCEOUTPUT = _descriptor.Descriptor(
 )
 
 
+_STREAMINFERENCEINPUT = _descriptor.Descriptor(
+  name='StreamInferenceInput',
+  full_name='light.StreamInferenceInput',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='input_edges', full_name='light.StreamInferenceInput.input_edges', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='inputs', full_name='light.StreamInferenceInput.inputs', index=1,
+      number=2, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=945,
+  serialized_end=1036,
+)
+
+
 _GETINPUTSPECREQUEST = _descriptor.Descriptor(
   name='GetInputSpecRequest',
   full_name='light.GetInputSpecRequest',
@@ -401,8 +439,8 @@ _GETINPUTSPECREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=945,
-  serialized_end=966,
+  serialized_start=1038,
+  serialized_end=1059,
 )
 
 
@@ -432,8 +470,8 @@ _GETINPUTSPECRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=968,
-  serialized_end=1023,
+  serialized_start=1061,
+  serialized_end=1116,
 )
 
 _NAMEDTENSOR.fields_by_name['edge_info'].message_type = lt__sdk_dot_proto_dot_lgf__pb2._EDGEINFO
@@ -447,6 +485,8 @@ _INFERENCEOUTPUT.fields_by_name['results'].message_type = _NAMEDTENSOR
 _INFERENCEOUTPUT.fields_by_name['stats'].message_type = _EXECUTIONSTATS
 _BATCHEDINFERENCEINPUT.fields_by_name['batches'].message_type = _INFERENCEINPUT
 _BATCHEDINFERENCEOUTPUT.fields_by_name['batches'].message_type = _INFERENCEOUTPUT
+_STREAMINFERENCEINPUT.fields_by_name['input_edges'].message_type = lt__sdk_dot_proto_dot_lgf__pb2._EDGEINFO
+_STREAMINFERENCEINPUT.fields_by_name['inputs'].message_type = lt__sdk_dot_proto_dot_common__pb2._TENSOR
 _GETINPUTSPECRESPONSE.fields_by_name['inputs'].message_type = lt__sdk_dot_proto_dot_lgf__pb2._EDGEINFO
 DESCRIPTOR.message_types_by_name['NamedTensor'] = _NAMEDTENSOR
 DESCRIPTOR.message_types_by_name['InferenceInput'] = _INFERENCEINPUT
@@ -455,6 +495,7 @@ DESCRIPTOR.message_types_by_name['ExecutionStats'] = _EXECUTIONSTATS
 DESCRIPTOR.message_types_by_name['InferenceOutput'] = _INFERENCEOUTPUT
 DESCRIPTOR.message_types_by_name['BatchedInferenceInput'] = _BATCHEDINFERENCEINPUT
 DESCRIPTOR.message_types_by_name['BatchedInferenceOutput'] = _BATCHEDINFERENCEOUTPUT
+DESCRIPTOR.message_types_by_name['StreamInferenceInput'] = _STREAMINFERENCEINPUT
 DESCRIPTOR.message_types_by_name['GetInputSpecRequest'] = _GETINPUTSPECREQUEST
 DESCRIPTOR.message_types_by_name['GetInputSpecResponse'] = _GETINPUTSPECRESPONSE
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
@@ -516,6 +557,13 @@ BatchedInferenceOutput = _reflection.GeneratedProtocolMessageType('BatchedInfere
   })
 _sym_db.RegisterMessage(BatchedInferenceOutput)
 
+StreamInferenceInput = _reflection.GeneratedProtocolMessageType('StreamInferenceInput', (_message.Message,), {
+  'DESCRIPTOR' : _STREAMINFERENCEINPUT,
+  '__module__' : 'lt_sdk.proto.inference_pb2'
+  # @@protoc_insertion_point(class_scope:light.StreamInferenceInput)
+  })
+_sym_db.RegisterMessage(StreamInferenceInput)
+
 GetInputSpecRequest = _reflection.GeneratedProtocolMessageType('GetInputSpecRequest', (_message.Message,), {
   'DESCRIPTOR' : _GETINPUTSPECREQUEST,
   '__module__' : 'lt_sdk.proto.inference_pb2'
@@ -539,8 +587,8 @@ _LTINFERENCE = _descriptor.ServiceDescriptor(
   file=DESCRIPTOR,
   index=0,
   serialized_options=None,
-  serialized_start=1026,
-  serialized_end=1253,
+  serialized_start=1119,
+  serialized_end=1422,
   methods=[
   _descriptor.MethodDescriptor(
     name='GetInputSpec',
@@ -569,6 +617,15 @@ _LTINFERENCE = _descriptor.ServiceDescriptor(
     output_type=_INFERENCEOUTPUT,
     serialized_options=None,
   ),
+  _descriptor.MethodDescriptor(
+    name='PredictStream',
+    full_name='light.LTInference.PredictStream',
+    index=3,
+    containing_service=None,
+    input_type=_STREAMINFERENCEINPUT,
+    output_type=_INFERENCEOUTPUT,
+    serialized_options=None,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_LTINFERENCE)
 
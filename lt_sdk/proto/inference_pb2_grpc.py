@@ -29,6 +29,11 @@ class LTInferenceStub(object):
         request_serializer=lt__sdk_dot_proto_dot_inference__pb2.InferenceInput.SerializeToString,
         response_deserializer=lt__sdk_dot_proto_dot_inference__pb2.InferenceOutput.FromString,
         )
+    self.PredictStream = channel.stream_stream(
+        '/light.LTInference/PredictStream',
+        request_serializer=lt__sdk_dot_proto_dot_inference__pb2.StreamInferenceInput.SerializeToString,
+        response_deserializer=lt__sdk_dot_proto_dot_inference__pb2.InferenceOutput.FromString,
+        )
 
 
 class LTInferenceServicer(object):
@@ -56,6 +61,13 @@ class LTInferenceServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def PredictStream(self, request_iterator, context):
+    """Returns one InferenceOutput for each frame, in the same order
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
 
 def add_LTInferenceServicer_to_server(servicer, server):
   rpc_method_handlers = {
@@ -74,6 +86,11 @@ def add_LTInferenceServicer_to_server(servicer, server):
           request_deserializer=lt__sdk_dot_proto_dot_inference__pb2.InferenceInput.FromString,
           response_serializer=lt__sdk_dot_proto_dot_inference__pb2.InferenceOutput.SerializeToString,
       ),
+      'PredictStream': grpc.stream_stream_rpc_method_handler(
+          servicer.PredictStream,
+          request_deserializer=lt__sdk_dot_proto_dot_inference__pb2.StreamInferenceInput.FromString,
+          response_serializer=lt__sdk_dot_proto_dot_inference__pb2.InferenceOutput.SerializeToString,
+      ),
   }
   generic_handler = grpc.method_handlers_generic_handler(
       'light.LTInference', rpc_method_handlers)
@@ -1,6 +1,50 @@
+import bisect
+
 from lt_sdk.proto import lgf_pb2, node_filter_pb2
 
 
+class NodeIndex(object):
+    """
+    Index of the nodes of a graph used to find the nodes that match a NodeFilter
+    without evaluating the filter on every node
+    """
+
+    def __init__(self, nodes):
+        """
+        Params:
+            nodes: a list of lgf_pb2.LNF() protobufs
+        """
+        self.nodes = list(nodes)
+        self.positions = {node.name: i for i, node in enumerate(self.nodes)}
+        self.all_names = frozenset(self.positions)
+
+        self.by_oneof = {}
+        self.by_op = {}
+        self.supported = set()
+        for node in self.nodes:
+            self.by_oneof.setdefault(node.WhichOneof("node"), set()).add(node.name)
+            if node.HasField(lgf_pb2.LNF.original.DESCRIPTOR.name):
+                self.by_op.setdefault(node.original.op, set()).add(node.name)
+            if node.supported:
+                self.supported.add(node.name)
+
+        # Names with a given prefix are a contiguous range of the sorted names
+        self._sorted_names = sorted(self.positions)
+
+    def get_names_with_prefix(self, prefix):
+        start = bisect.bisect_left(self._sorted_names, prefix)
+        end = start
+        while (end < len(self._sorted_names)
+               and self._sorted_names[end].startswith(prefix)):
+            end += 1
+
+        return set(self._sorted_names[start:end])
+
+    def sort_names(self, node_names):
+        """Returns the given node names in graph order"""
+        return sorted(node_names, key=self.positions.__getitem__)
+
+
 class NodeFilter(object):
     """A wrapper implementing functionality for the node_filter protobuf"""
 
@@ -15,49 +59,85 @@ class NodeFilter(object):
         if hasattr(self._proto, "filter"):
             self._filter = NodeFilter(self._proto.filter)
 
-        # Every field name maps to a private function that implements matches
-        self._matches_map = {
-            filter_name: getattr(self,
-                                 "_{}".format(filter_name)) for filter_name in
-            node_filter_pb2.NodeFilter.DESCRIPTOR.fields_by_name.keys()
-        }
+        # The filter tree is compiled into a single function the first time
+        # it is used
+        self._predicate = None
+
+    # Every field name maps to a private function that returns a function
+    # predicate(node, light_graph) implementing matches
+
+    def _true_filter(self):
+        return lambda node, light_graph: True
+
+    def _and_filter(self):
+        predicates = [f._get_predicate() for f in self._filters]
+
+        def predicate(node, light_graph):
+            for p in predicates:
+                if not p(node, light_graph):
+                    return False
+            return True
 
-    def _true_filter(self, node, light_graph):
-        return True
+        return predicate
 
-    def _and_filter(self, node, light_graph):
-        return all(f.matches(node, light_graph) for f in self._filters)
+    def _or_filter(self):
+        predicates = [f._get_predicate() for f in self._filters]
 
-    def _or_filter(self, node, light_graph):
-        return any(f.matches(node, light_graph) for f in self._filters)
+        def predicate(node, light_graph):
+            for p in predicates:
+                if p(node, light_graph):
+                    return True
+            return False
 
-    def _not_filter(self, node, light_graph):
-        return not (self._filter.matches(node, light_graph))
+        return predicate
 
-    def _name_is_filter(self, node, light_graph):
-        return self._proto.name == node.name
+    def _not_filter(self):
+        p = self._filter._get_predicate()
+        return lambda node, light_graph: not p(node, light_graph)
 
-    def _name_in_filter(self, node, light_graph):
-        return self._proto.name in node.name
+    def _name_is_filter(self):
+        name = self._proto.name
+        return lambda node, light_graph: name == node.name
 
-    def _name_starts_with_filter(self, node, light_graph):
-        return node.name.startswith(self._proto.prefix)
+    def _name_in_filter(self):
+        name = self._proto.name
+        return lambda node, light_graph: name in node.name
 
-    def _first_node_filter(self, node, light_graph):
-        return node.name in [e.name for e in light_graph.inputs()]
+    def _name_starts_with_filter(self):
+        prefix = self._proto.prefix
+        return lambda node, light_graph: node.name.startswith(prefix)
 
-    def _last_node_filter(self, node, light_graph):
-        return node.name in [e.name for e in light_graph.outputs()]
+    def _first_node_filter(self):
+        return lambda node, light_graph: node.name in [
+            e.name for e in light_graph.inputs()
+        ]
 
-    def _op_filter(self, node, light_graph):
-        assert (node.HasField(lgf_pb2.LNF.original.DESCRIPTOR.name))
-        return node.original.op in self._proto.ops
+    def _last_node_filter(self):
+        return lambda node, light_graph: node.name in [
+            e.name for e in light_graph.outputs()
+        ]
 
-    def _supported_node_filter(self, node, light_graph):
-        return node.supported
+    def _op_filter(self):
+        ops = frozenset(self._proto.ops)
 
-    def _which_oneof_filter(self, node, light_graph):
-        return node.WhichOneof("node") in self._proto.oneofs
+        def predicate(node, light_graph):
+            assert (node.HasField(lgf_pb2.LNF.original.DESCRIPTOR.name))
+            return node.original.op in ops
+
+        return predicate
+
+    def _supported_node_filter(self):
+        return lambda node, light_graph: node.supported
+
+    def _which_oneof_filter(self):
+        oneofs = frozenset(self._proto.oneofs)
+        return lambda node, light_graph: node.WhichOneof("node") in oneofs
+
+    def _get_predicate(self):
+        if self._predicate is None:
+            self._predicate = getattr(self, "_{}".format(self._filter_type))()
+
+        return self._predicate
 
     def matches(self, node, light_graph):
         """Return true if the given node matches this filter.
@@ -67,7 +147,82 @@ class NodeFilter(object):
             light_graph: A LightGraph object
         returns: True if node matches, False otherwise.
         """
-        return self._matches_map[self._filter_type](node, light_graph)
+        return self._get_predicate()(node, light_graph)
+
+    def _get_indexed_names(self, node_index, light_graph):
+        """
+        Returns the set of names of the nodes in node_index that match this filter,
+        or None if this filter cannot be answered by node_index lookups
+        """
+        if self._filter_type == "true_filter":
+            return node_index.all_names
+        elif self._filter_type == "name_is_filter":
+            return node_index.all_names.intersection([self._proto.name])
+        elif self._filter_type == "name_starts_with_filter":
+            return node_index.get_names_with_prefix(self._proto.prefix)
+        elif self._filter_type == "op_filter":
+            return set().union(*[node_index.by_op.get(op, ()) for op in self._proto.ops])
+        elif self._filter_type == "supported_node_filter":
+            return node_index.supported
+        elif self._filter_type == "which_oneof_filter":
+            return set().union(
+                *[node_index.by_oneof.get(oneof, ()) for oneof in self._proto.oneofs])
+        elif self._filter_type == "not_filter":
+            names = self._filter._get_indexed_names(node_index, light_graph)
+            return None if names is None else node_index.all_names.difference(names)
+        elif self._filter_type == "or_filter":
+            names = [f._get_indexed_names(node_index, light_graph) for f in self._filters]
+            return None if None in names else set().union(*names)
+        elif self._filter_type == "and_filter":
+            names = []
+            other_filters = []
+            for f in self._filters:
+                filter_names = f._get_indexed_names(node_index, light_graph)
+                if filter_names is None:
+                    other_filters.append(f)
+                else:
+                    names.append(filter_names)
+
+            if not names:
+                return None if other_filters else node_index.all_names
+
+            # Only evaluate filters that are not indexed on the remaining nodes
+            names = sorted(names, key=len)
+            names = set(names[0]).intersection(*names[1:])
+            for f in other_filters:
+                predicate = f._get_predicate()
+                names = {
+                    name for name in names if predicate(
+                        node_index.nodes[node_index.positions[name]],
+                        light_graph)
+                }
+            return names
+
+        return None
+
+    def get_matching_node_names(self, light_graph, node_index=None):
+        """
+        Returns the names of the nodes in light_graph that match this filter, in
+        graph order. Filters on the node type, op, supported flag and name prefix
+        are answered with index lookups instead of checking every node, nodes
+        without an original node never match an op_filter
+
+        params:
+            light_graph: A LightGraph object
+            node_index: optional NodeIndex for light_graph, defaults to
+                light_graph.node_index()
+        """
+        if node_index is None:
+            node_index = light_graph.node_index()
+
+        names = self._get_indexed_names(node_index, light_graph)
+        if names is None:
+            predicate = self._get_predicate()
+            return [
+                node.name for node in node_index.nodes if predicate(node, light_graph)
+            ]
+
+        return node_index.sort_names(names)
 
     def as_proto(self):
         node_filter_proto = node_filter_pb2.NodeFilter()
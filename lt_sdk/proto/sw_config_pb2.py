@@ -27,7 +27,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='light',
   syntax='proto3',
   serialized_options=None,
-  serialized_pb=_b('\n\x1clt_sdk/proto/sw_config.proto\x12\x05light\x1a\x19yis_sdk/instruction.proto\x1a\x19lt_sdk/proto/dtypes.proto\x1a\x19lt_sdk/proto/common.proto\x1a\x16lt_sdk/proto/ops.proto\x1a\x1elt_sdk/proto/graph_types.proto\x1a\x1elt_sdk/proto/node_filter.proto\"k\n\rNodeTransform\x12$\n\ngraph_type\x18\x01 \x01(\x0e\x32\x10.light.GraphType\x12\x15\n\x02op\x18\x02 \x01(\x0e\x32\t.light.Op\x12\x1d\n\x15transform_module_name\x18\x03 \x01(\t\"a\n\x13\x46ilterTransformPair\x12!\n\x06\x66ilter\x18\x01 \x01(\x0b\x32\x11.light.NodeFilter\x12\'\n\ttransform\x18\x02 \x01(\x0b\x32\x14.light.NodeTransform\"B\n\tNodeTypes\x12\x11\n\topu_nodes\x18\x01 \x03(\t\x12\"\n\x1aquantized_electronic_nodes\x18\x02 \x03(\t\"9\n\tDebugInfo\x12\x11\n\tdebug_dir\x18\x02 \x01(\t\x12\x19\n\x11\x63ollect_checksums\x18\x04 \x01(\x08\"\xda\x01\n\tSweepInfo\x12\x15\n\rpy_batch_size\x18\x02 \x01(\x05\x12\x16\n\x0enum_py_batches\x18\x08 \x01(\x05\x12#\n\x1b\x63onvert_graph_to_debug_mode\x18\x03 \x01(\x08\x12\x1c\n\x14save_hist_html_files\x18\x04 \x01(\x08\x12\x1c\n\x14\x63ollect_bit_activity\x18\x06 \x01(\x08\x12\x1d\n\x15\x63ollect_memory_layout\x18\t \x01(\x08\x12\x1e\n\x16num_fine_tuning_epochs\x18\x07 \x01(\x02\"\x80\x01\n\x17\x42inaryInstructionParams\x12!\n\x19\x64\x65p_pc_distance_precision\x18\x01 \x01(\x05\x12\x1f\n\x17num_opu_tiles_precision\x18\x02 \x01(\x05\x12!\n\x19num_batch_tiles_precision\x18\x03 \x01(\x05\"8\n\x14\x43ompilerRestrictions\x12 \n\x18no_odd_image_dims_conv2d\x18\x01 \x01(\x08\" \n\nBundleType\x12\x12\n\nnode_types\x18\x01 \x03(\t\"\xfd\x01\n\x0e\x43ompilerParams\x12\x1c\n\x14\x61llow_tmem_fall_back\x18\x01 \x01(\x08\x12$\n\x1ctile_inputs_for_accumulators\x18\x02 \x01(\x08\x12\x41\n\x19\x62inary_instruction_params\x18\x03 \x01(\x0b\x32\x1e.light.BinaryInstructionParams\x12:\n\x15\x63ompiler_restrictions\x18\x04 \x01(\x0b\x32\x1b.light.CompilerRestrictions\x12(\n\rvalid_bundles\x18\x05 \x03(\x0b\x32\x11.light.BundleType\"\xc8\x0b\n\x0eSoftwareConfig\x12/\n\x19standard_transform_stages\x18\x15 \x03(\x0e\x32\x0c.light.Stage\x12\x38\n\x14\x66ilter_transform_map\x18\x01 \x03(\x0b\x32\x1a.light.FilterTransformPair\x12\x1c\n\x14\x63onst_transform_name\x18$ \x01(\t\x12\x1a\n\x12use_weight_sharing\x18\x02 \x01(\x08\x12 \n\nfloat_type\x18\x04 \x01(\x0b\x32\x0c.light.DType\x12)\n!quantized_electronic_op_precision\x18\x05 \x01(\x05\x12$\n\nnode_types\x18\x07 \x01(\x0b\x32\x10.light.NodeTypes\x12\x1a\n\x12num_threads_scales\x18\x08 \x01(\x05\x12$\n\ndebug_info\x18\n \x01(\x0b\x32\x10.light.DebugInfo\x12\x11\n\tcache_dir\x18\x0c \x01(\t\x12L\n\'activation_scale_quantization_bias_type\x18\x18 \x01(\x0e\x32\x1b.light.QuantizationBiasType\x12\x39\n\x18weight_quantization_type\x18\x06 \x01(\x0e\x32\x17.light.QuantizationType\x12\"\n\x1aweight_quantization_cutoff\x18\x1a \x01(\x02\x12<\n\x1b\x61\x64\x63_scale_quantization_type\x18\x0e \x01(\x0e\x32\x17.light.QuantizationType\x12!\n\x19use_unsigned_quant_scheme\x18\x1c \x01(\x08\x12G\n$activation_scale_quantization_method\x18\x11 \x01(\x0e\x32\x19.light.QuantizationMethod\x12@\n\x1d\x61\x64\x63_scale_quantization_method\x18\x12 \x01(\x0e\x32\x19.light.QuantizationMethod\x12\x1f\n\x17ignore_empty_histograms\x18\x19 \x01(\x08\x12!\n\x19\x61\x63tivation_scale_num_bins\x18\x16 \x01(\x05\x12\x1a\n\x12\x61\x64\x63_scale_num_bins\x18\x17 \x01(\x05\x12$\n\nsweep_info\x18\x10 \x01(\x0b\x32\x10.light.SweepInfo\x12\x16\n\x0emax_proto_size\x18\x13 \x01(\x05\x12.\n\x13ignore_nodes_filter\x18\x1b \x01(\x0b\x32\x11.light.NodeFilter\x12\x37\n\x13instruction_formats\x18! \x03(\x0b\x32\x1a.yis_sdk.InstructionFormat\x12\x39\n\x0bop_code_map\x18  \x03(\x0b\x32$.light.SoftwareConfig.OpCodeMapEntry\x12@\n\x0frev_op_code_map\x18\x1f \x03(\x0b\x32\'.light.SoftwareConfig.RevOpCodeMapEntry\x12@\n\x0f\x61lu_op_code_map\x18# \x03(\x0b\x32\'.light.SoftwareConfig.AluOpCodeMapEntry\x12.\n\x0f\x63ompiler_params\x18\x1e \x01(\x0b\x32\x15.light.CompilerParams\x12\x1e\n\x16\x64isable_block_sparsity\x18\" \x01(\x08\x1a\x30\n\x0eOpCodeMapEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\x1a\x33\n\x11RevOpCodeMapEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1a\x33\n\x11\x41luOpCodeMapEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01*\x82\x01\n\x05Stage\x12\x0b\n\x07INVALID\x10\x00\x12\x13\n\x0f\x42\x41SE_TRANSFORMS\x10\x01\x12 \n\x1c\x41\x43TIVATION_SCALE_CALIBRATION\x10\x02\x12\x19\n\x15\x41\x44\x43_SCALE_CALIBRATION\x10\x03\x12\x1a\n\x16\x46OLD_PHASIFY_CONSTANTS\x10\x04\x62\x06proto3')
+  serialized_pb=_b('\n\x1clt_sdk/proto/sw_config.proto\x12\x05light\x1a\x19yis_sdk/instruction.proto\x1a\x19lt_sdk/proto/dtypes.proto\x1a\x19lt_sdk/proto/common.proto\x1a\x16lt_sdk/proto/ops.proto\x1a\x1elt_sdk/proto/graph_types.proto\x1a\x1elt_sdk/proto/node_filter.proto\"k\n\rNodeTransform\x12$\n\ngraph_type\x18\x01 \x01(\x0e\x32\x10.light.GraphType\x12\x15\n\x02op\x18\x02 \x01(\x0e\x32\t.light.Op\x12\x1d\n\x15transform_module_name\x18\x03 \x01(\t\"a\n\x13\x46ilterTransformPair\x12!\n\x06\x66ilter\x18\x01 \x01(\x0b\x32\x11.light.NodeFilter\x12\'\n\ttransform\x18\x02 \x01(\x0b\x32\x14.light.NodeTransform\"B\n\tNodeTypes\x12\x11\n\topu_nodes\x18\x01 \x03(\t\x12\"\n\x1aquantized_electronic_nodes\x18\x02 \x03(\t\"9\n\tDebugInfo\x12\x11\n\tdebug_dir\x18\x02 \x01(\t\x12\x19\n\x11\x63ollect_checksums\x18\x04 \x01(\x08\"\xda\x01\n\tSweepInfo\x12\x15\n\rpy_batch_size\x18\x02 \x01(\x05\x12\x16\n\x0enum_py_batches\x18\x08 \x01(\x05\x12#\n\x1b\x63onvert_graph_to_debug_mode\x18\x03 \x01(\x08\x12\x1c\n\x14save_hist_html_files\x18\x04 \x01(\x08\x12\x1c\n\x14\x63ollect_bit_activity\x18\x06 \x01(\x08\x12\x1d\n\x15\x63ollect_memory_layout\x18\t \x01(\x08\x12\x1e\n\x16num_fine_tuning_epochs\x18\x07 \x01(\x02\"\x80\x01\n\x17\x42inaryInstructionParams\x12!\n\x19\x64\x65p_pc_distance_precision\x18\x01 \x01(\x05\x12\x1f\n\x17num_opu_tiles_precision\x18\x02 \x01(\x05\x12!\n\x19num_batch_tiles_precision\x18\x03 \x01(\x05\"8\n\x14\x43ompilerRestrictions\x12 \n\x18no_odd_image_dims_conv2d\x18\x01 \x01(\x08\" \n\nBundleType\x12\x12\n\nnode_types\x18\x01 \x03(\t\"\xfd\x01\n\x0e\x43ompilerParams\x12\x1c\n\x14\x61llow_tmem_fall_back\x18\x01 \x01(\x08\x12$\n\x1ctile_inputs_for_accumulators\x18\x02 \x01(\x08\x12\x41\n\x19\x62inary_instruction_params\x18\x03 \x01(\x0b\x32\x1e.light.BinaryInstructionParams\x12:\n\x15\x63ompiler_restrictions\x18\x04 \x01(\x0b\x32\x1b.light.CompilerRestrictions\x12(\n\rvalid_bundles\x18\x05 \x03(\x0b\x32\x11.light.BundleType\"\xd7\x0e\n\x0eSoftwareConfig\x12/\n\x19standard_transform_stages\x18\x15 \x03(\x0e\x32\x0c.light.Stage\x12\x38\n\x14\x66ilter_transform_map\x18\x01 \x03(\x0b\x32\x1a.light.FilterTransformPair\x12\x1c\n\x14\x63onst_transform_name\x18$ \x01(\t\x12\x1a\n\x12use_weight_sharing\x18\x02 \x01(\x08\x12 \n\nfloat_type\x18\x04 \x01(\x0b\x32\x0c.light.DType\x12)\n!quantized_electronic_op_precision\x18\x05 \x01(\x05\x12$\n\nnode_types\x18\x07 \x01(\x0b\x32\x10.light.NodeTypes\x12\x1a\n\x12num_threads_scales\x18\x08 \x01(\x05\x12\x1f\n\x17num_transform_processes\x18, \x01(\x05\x12$\n\ndebug_info\x18\n \x01(\x0b\x32\x10.light.DebugInfo\x12\x11\n\tcache_dir\x18\x0c \x01(\t\x12\x18\n\x10import_cache_dir\x18+ \x01(\t\x12\x13\n\x0bprofile_dir\x18- \x01(\t\x12L\n\'activation_scale_quantization_bias_type\x18\x18 \x01(\x0e\x32\x1b.light.QuantizationBiasType\x12\x39\n\x18weight_quantization_type\x18\x06 \x01(\x0e\x32\x17.light.QuantizationType\x12\"\n\x1aweight_quantization_cutoff\x18\x1a \x01(\x02\x12<\n\x1b\x61\x64\x63_scale_quantization_type\x18\x0e \x01(\x0e\x32\x17.light.QuantizationType\x12!\n\x19use_unsigned_quant_scheme\x18\x1c \x01(\x08\x12G\n$activation_scale_quantization_method\x18\x11 \x01(\x0e\x32\x19.light.QuantizationMethod\x12@\n\x1d\x61\x64\x63_scale_quantization_method\x18\x12 \x01(\x0e\x32\x19.light.QuantizationMethod\x12\x1f\n\x17ignore_empty_histograms\x18\x19 \x01(\x08\x12!\n\x19\x61\x63tivation_scale_num_bins\x18\x16 \x01(\x05\x12\x1a\n\x12\x61\x64\x63_scale_num_bins\x18\x17 \x01(\x05\x12\x1f\n\x17single_pass_calibration\x18& \x01(\x08\x12$\n\x1cnum_calibration_seed_batches\x18\' \x01(\x05\x12.\n&calibration_convergence_check_interval\x18( \x01(\x05\x12)\n!calibration_convergence_tolerance\x18) \x01(\x02\x12(\n calibration_convergence_patience\x18* \x01(\x05\x12\"\n\x1a\x63\x61libration_checkpoint_dir\x18. \x01(\t\x12\'\n\x1f\x63\x61libration_checkpoint_interval\x18/ \x01(\x05\x12$\n\nsweep_info\x18\x10 \x01(\x0b\x32\x10.light.SweepInfo\x12\x16\n\x0emax_proto_size\x18\x13 \x01(\x05\x12.\n\x13ignore_nodes_filter\x18\x1b \x01(\x0b\x32\x11.light.NodeFilter\x12\x37\n\x13instruction_formats\x18! \x03(\x0b\x32\x1a.yis_sdk.InstructionFormat\x12\x39\n\x0bop_code_map\x18  \x03(\x0b\x32$.light.SoftwareConfig.OpCodeMapEntry\x12@\n\x0frev_op_code_map\x18\x1f \x03(\x0b\x32\'.light.SoftwareConfig.RevOpCodeMapEntry\x12@\n\x0f\x61lu_op_code_map\x18# \x03(\x0b\x32\'.light.SoftwareConfig.AluOpCodeMapEntry\x12.\n\x0f\x63ompiler_params\x18\x1e \x01(\x0b\x32\x15.light.CompilerParams\x12\x1e\n\x16\x64isable_block_sparsity\x18\" \x01(\x08\x12$\n\x1c\x62\x61tch_fold_phasify_constants\x18% \x01(\x08\x1a\x30\n\x0eOpCodeMapEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\x1a\x33\n\x11RevOpCodeMapEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1a\x33\n\x11\x41luOpCodeMapEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01*\x82\x01\n\x05Stage\x12\x0b\n\x07INVALID\x10\x00\x12\x13\n\x0f\x42\x41SE_TRANSFORMS\x10\x01\x12 \n\x1c\x41\x43TIVATION_SCALE_CALIBRATION\x10\x02\x12\x19\n\x15\x41\x44\x43_SCALE_CALIBRATION\x10\x03\x12\x1a\n\x16\x46OLD_PHASIFY_CONSTANTS\x10\x04\x62\x06proto3')
   ,
   dependencies=[yis__sdk_dot_instruction__pb2.DESCRIPTOR,lt__sdk_dot_proto_dot_dtypes__pb2.DESCRIPTOR,lt__sdk_dot_proto_dot_common__pb2.DESCRIPTOR,lt__sdk_dot_proto_dot_ops__pb2.DESCRIPTOR,lt__sdk_dot_proto_dot_graph__types__pb2.DESCRIPTOR,lt__sdk_dot_proto_dot_node__filter__pb2.DESCRIPTOR,])
 
@@ -60,8 +60,8 @@ _STAGE = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=2727,
-  serialized_end=2857,
+  serialized_start=3126,
+  serialized_end=3256,
 )
 _sym_db.RegisterEnumDescriptor(_STAGE)
 
@@ -505,8 +505,8 @@ _SOFTWARECONFIG_OPCODEMAPENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2570,
-  serialized_end=2618,
+  serialized_start=2969,
+  serialized_end=3017,
 )
 
 _SOFTWARECONFIG_REVOPCODEMAPENTRY = _descriptor.Descriptor(
@@ -542,8 +542,8 @@ _SOFTWARECONFIG_REVOPCODEMAPENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2620,
-  serialized_end=2671,
+  serialized_start=3019,
+  serialized_end=3070,
 )
 
 _SOFTWARECONFIG_ALUOPCODEMAPENTRY = _descriptor.Descriptor(
@@ -579,8 +579,8 @@ _SOFTWARECONFIG_ALUOPCODEMAPENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2673,
-  serialized_end=2724,
+  serialized_start=3072,
+  serialized_end=3123,
 )
 
 _SOFTWARECONFIG = _descriptor.Descriptor(
@@ -647,152 +647,229 @@ _SOFTWARECONFIG = _descriptor.Descriptor(
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='debug_info', full_name='light.SoftwareConfig.debug_info', index=8,
+      name='num_transform_processes', full_name='light.SoftwareConfig.num_transform_processes', index=8,
+      number=44, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='debug_info', full_name='light.SoftwareConfig.debug_info', index=9,
       number=10, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='cache_dir', full_name='light.SoftwareConfig.cache_dir', index=9,
+      name='cache_dir', full_name='light.SoftwareConfig.cache_dir', index=10,
       number=12, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='activation_scale_quantization_bias_type', full_name='light.SoftwareConfig.activation_scale_quantization_bias_type', index=10,
+      name='import_cache_dir', full_name='light.SoftwareConfig.import_cache_dir', index=11,
+      number=43, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='profile_dir', full_name='light.SoftwareConfig.profile_dir', index=12,
+      number=45, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='activation_scale_quantization_bias_type', full_name='light.SoftwareConfig.activation_scale_quantization_bias_type', index=13,
       number=24, type=14, cpp_type=8, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='weight_quantization_type', full_name='light.SoftwareConfig.weight_quantization_type', index=11,
+      name='weight_quantization_type', full_name='light.SoftwareConfig.weight_quantization_type', index=14,
       number=6, type=14, cpp_type=8, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='weight_quantization_cutoff', full_name='light.SoftwareConfig.weight_quantization_cutoff', index=12,
+      name='weight_quantization_cutoff', full_name='light.SoftwareConfig.weight_quantization_cutoff', index=15,
       number=26, type=2, cpp_type=6, label=1,
       has_default_value=False, default_value=float(0),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='adc_scale_quantization_type', full_name='light.SoftwareConfig.adc_scale_quantization_type', index=13,
+      name='adc_scale_quantization_type', full_name='light.SoftwareConfig.adc_scale_quantization_type', index=16,
       number=14, type=14, cpp_type=8, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='use_unsigned_quant_scheme', full_name='light.SoftwareConfig.use_unsigned_quant_scheme', index=14,
+      name='use_unsigned_quant_scheme', full_name='light.SoftwareConfig.use_unsigned_quant_scheme', index=17,
       number=28, type=8, cpp_type=7, label=1,
       has_default_value=False, default_value=False,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='activation_scale_quantization_method', full_name='light.SoftwareConfig.activation_scale_quantization_method', index=15,
+      name='activation_scale_quantization_method', full_name='light.SoftwareConfig.activation_scale_quantization_method', index=18,
       number=17, type=14, cpp_type=8, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='adc_scale_quantization_method', full_name='light.SoftwareConfig.adc_scale_quantization_method', index=16,
+      name='adc_scale_quantization_method', full_name='light.SoftwareConfig.adc_scale_quantization_method', index=19,
       number=18, type=14, cpp_type=8, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='ignore_empty_histograms', full_name='light.SoftwareConfig.ignore_empty_histograms', index=17,
+      name='ignore_empty_histograms', full_name='light.SoftwareConfig.ignore_empty_histograms', index=20,
       number=25, type=8, cpp_type=7, label=1,
       has_default_value=False, default_value=False,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='activation_scale_num_bins', full_name='light.SoftwareConfig.activation_scale_num_bins', index=18,
+      name='activation_scale_num_bins', full_name='light.SoftwareConfig.activation_scale_num_bins', index=21,
       number=22, type=5, cpp_type=1, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='adc_scale_num_bins', full_name='light.SoftwareConfig.adc_scale_num_bins', index=19,
+      name='adc_scale_num_bins', full_name='light.SoftwareConfig.adc_scale_num_bins', index=22,
       number=23, type=5, cpp_type=1, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='sweep_info', full_name='light.SoftwareConfig.sweep_info', index=20,
+      name='single_pass_calibration', full_name='light.SoftwareConfig.single_pass_calibration', index=23,
+      number=38, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='num_calibration_seed_batches', full_name='light.SoftwareConfig.num_calibration_seed_batches', index=24,
+      number=39, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='calibration_convergence_check_interval', full_name='light.SoftwareConfig.calibration_convergence_check_interval', index=25,
+      number=40, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='calibration_convergence_tolerance', full_name='light.SoftwareConfig.calibration_convergence_tolerance', index=26,
+      number=41, type=2, cpp_type=6, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='calibration_convergence_patience', full_name='light.SoftwareConfig.calibration_convergence_patience', index=27,
+      number=42, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='calibration_checkpoint_dir', full_name='light.SoftwareConfig.calibration_checkpoint_dir', index=28,
+      number=46, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='calibration_checkpoint_interval', full_name='light.SoftwareConfig.calibration_checkpoint_interval', index=29,
+      number=47, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='sweep_info', full_name='light.SoftwareConfig.sweep_info', index=30,
       number=16, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='max_proto_size', full_name='light.SoftwareConfig.max_proto_size', index=21,
+      name='max_proto_size', full_name='light.SoftwareConfig.max_proto_size', index=31,
       number=19, type=5, cpp_type=1, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='ignore_nodes_filter', full_name='light.SoftwareConfig.ignore_nodes_filter', index=22,
+      name='ignore_nodes_filter', full_name='light.SoftwareConfig.ignore_nodes_filter', index=32,
       number=27, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='instruction_formats', full_name='light.SoftwareConfig.instruction_formats', index=23,
+      name='instruction_formats', full_name='light.SoftwareConfig.instruction_formats', index=33,
       number=33, type=11, cpp_type=10, label=3,
       has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='op_code_map', full_name='light.SoftwareConfig.op_code_map', index=24,
+      name='op_code_map', full_name='light.SoftwareConfig.op_code_map', index=34,
       number=32, type=11, cpp_type=10, label=3,
       has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='rev_op_code_map', full_name='light.SoftwareConfig.rev_op_code_map', index=25,
+      name='rev_op_code_map', full_name='light.SoftwareConfig.rev_op_code_map', index=35,
       number=31, type=11, cpp_type=10, label=3,
       has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='alu_op_code_map', full_name='light.SoftwareConfig.alu_op_code_map', index=26,
+      name='alu_op_code_map', full_name='light.SoftwareConfig.alu_op_code_map', index=36,
       number=35, type=11, cpp_type=10, label=3,
       has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='compiler_params', full_name='light.SoftwareConfig.compiler_params', index=27,
+      name='compiler_params', full_name='light.SoftwareConfig.compiler_params', index=37,
       number=30, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='disable_block_sparsity', full_name='light.SoftwareConfig.disable_block_sparsity', index=28,
+      name='disable_block_sparsity', full_name='light.SoftwareConfig.disable_block_sparsity', index=38,
       number=34, type=8, cpp_type=7, label=1,
       has_default_value=False, default_value=False,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='batch_fold_phasify_constants', full_name='light.SoftwareConfig.batch_fold_phasify_constants', index=39,
+      number=37, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -806,7 +883,7 @@ _SOFTWARECONFIG = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=1244,
-  serialized_end=2724,
+  serialized_end=3123,
 )
 
 _NODETRANSFORM.fields_by_name['graph_type'].enum_type = lt__sdk_dot_proto_dot_graph__types__pb2._GRAPHTYPE
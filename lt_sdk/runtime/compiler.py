@@ -1,7 +1,8 @@
 import ctypes
 import os
 
-from lt_sdk.common import context_manager_utils
+from lt_sdk.common import context_manager_utils, lazy_library
+from lt_sdk.graph import external_weights
 from lt_sdk.proto import subgraph_binary_pb2
 
 
@@ -11,7 +12,9 @@ class PyCompiler(object):
     Instances of this class should ALWAYS be created with a context manager
     """
 
-    lib = ctypes.CDLL(os.path.join(os.path.dirname(__file__), "lib_compiler.so"))
+    lib = lazy_library.LazyLibrary(
+        os.path.join(os.path.dirname(__file__),
+                     "lib_compiler.so"))
 
     lib.CreatePyCompiler.restype = ctypes.c_void_p
     lib.DeletePyCompiler.argtypes = (ctypes.c_void_p,)
@@ -47,7 +50,7 @@ class PyCompiler(object):
         spec_data = hw_spec.SerializeToString()
         sw_config_data = sw_config.SerializeToString()
         params_data = sim_params.SerializeToString()
-        lgf_data = lgf_pb.SerializeToString()
+        lgf_data = external_weights.materialized(lgf_pb).SerializeToString()
         comp_sub_out_size = ctypes.c_uint()
 
         comp_sub_out_ptr = self.lib.Compile(self._obj,
@@ -5,7 +5,7 @@ import shutil
 import numpy as np
 
 from lt_sdk.common import py_file_utils
-from lt_sdk.graph import full_graph_pipeline, lgf_graph
+from lt_sdk.graph import external_weights, full_graph_pipeline, lgf_graph
 from lt_sdk.graph.graph_collections import graph_collection
 from lt_sdk.graph.import_graph import graph_importer_map
 from lt_sdk.graph.run_graph import graph_runner, histogram_graph_runner
@@ -56,7 +56,9 @@ class PerformanceSweep(object):
         """
         Returns:
             calibration_inputs: an inference_pb2.BatchedInferenceInput() object
-                corresponding padded and batched calibration data
+                corresponding padded and batched calibration data, or an iterable
+                of inference_pb2.BatchedInferenceInput() shards such as a
+                batch.ShardedBatchedInferenceInput()
         """
         raise NotImplementedError()
 
@@ -280,9 +282,10 @@ class PerformanceSweep(object):
 
         # Special cases
         if sw_config.sweep_info.convert_graph_to_debug_mode:
+            hist_arrays = graph_coll.histogram_collection().get_histogram_arrays(
+                debug_kwargs["plot_title_map"])
             cal_hist_pb_map = {
-                k: graph_coll.histogram_collection().get_histogram(k)
-                for k in debug_kwargs["plot_title_map"]
+                k: hist_arrays.get_histogram(k) for k in debug_kwargs["plot_title_map"]
             }
             debug_kwargs.update({"cal_hist_pb_map": cal_hist_pb_map})
 
@@ -388,7 +391,8 @@ class PerformanceSweep(object):
                 graph_coll.simulation_metrics_collection().get_simulation_metrics())
 
         # Save graph and debug info
-        performance_data.graph.CopyFrom(light_graph.as_lgf_pb())
+        performance_data.graph.CopyFrom(
+            external_weights.materialized(light_graph.as_lgf_pb()))
         self._save_debug_info(performance_data, **debug_kwargs)
 
     def run_single_config(self, config, indx):
@@ -11,10 +11,12 @@ from lt_sdk.verification import performance_sweep
 class StreamedStandardDataBase(performance_sweep.PerformanceSweep):
     """Standard Data Base that streams test files from disk"""
 
-    # TODO: support streamed calibration data? would require a lot more plumbing
-    # Also, change to protobuf? or keep as numpy?
+    # TODO: change to protobuf? or keep as numpy?
+    # Calibration data is either a single file or sharded like the test data,
+    # shards are streamed from disk during calibration
     CALIBRATION_DATA_FILE = "calibration_data.npy"
     CALIBRATION_LABELS_FILE = "calibration_labels.npy"
+    CALIBRATION_DATA_FILE_FORMAT = "calibration_data_shard_{}.npy"
     TEST_DATA_FILE_FORMAT = "test_data_shard_{}.npy"
     TEST_LABELS_FILE_FORMAT = "test_labels_shard_{}.npy"
     FINE_TUNING_DATA_FILE_FORMAT = "fine_tuning_data_shard_{}.npy"
@@ -52,7 +54,8 @@ class StreamedStandardDataBase(performance_sweep.PerformanceSweep):
                     filenames,
                     sw_config,
                     allow_padding=True,
-                    dtype=dtypes_pb2.DT_FLOAT):
+                    dtype=dtypes_pb2.DT_FLOAT,
+                    use_subset=True):
         assert len(filenames) == len(self.input_names())
 
         names = self.input_names()
@@ -64,7 +67,8 @@ class StreamedStandardDataBase(performance_sweep.PerformanceSweep):
         def get_subset(arr):
             return self.data_subset(arr, sw_config)
 
-        named_tensors.apply_all(get_subset)
+        if use_subset:
+            named_tensors.apply_all(get_subset)
 
         batched_inputs = batch.batch_inputs(
             named_tensors,
@@ -73,14 +77,43 @@ class StreamedStandardDataBase(performance_sweep.PerformanceSweep):
 
         return batched_inputs
 
+    def _sorted_paths(self, file_format):
+        return sorted(glob.glob(os.path.join(self._data_dir, file_format.format("*"))))
+
+    def num_calibration_shards(self):
+        return len(self._sorted_paths(self.CALIBRATION_DATA_FILE_FORMAT))
+
+    def get_calibration_shard(self, sw_config, i):
+        """
+        Returns all the batches of the calibration shard i, data_subset() is not
+        applied since the batch limit is over all the shards
+        """
+        return self._get_inputs(
+            [self._sorted_paths(self.CALIBRATION_DATA_FILE_FORMAT)[i]],
+            sw_config,
+            allow_padding=False,
+            use_subset=False)
+
     def get_calibration_inputs(self, sw_config):
+        """
+        Returns a batch.ShardedBatchedInferenceInput() if the calibration data is
+        sharded, otherwise a single inference_pb2.BatchedInferenceInput()
+
+        If sw_config.sweep_info.num_py_batches > 0, at most num_py_batches batches
+        are used in total, whether or not the calibration data is sharded
+        """
+        num_shards = self.num_calibration_shards()
+        if num_shards:
+            num_py_batches = sw_config.sweep_info.num_py_batches
+            return batch.ShardedBatchedInferenceInput(
+                num_shards,
+                lambda i: self.get_calibration_shard(sw_config, i),
+                max_batches=num_py_batches if num_py_batches > 0 else None)
+
         return self._get_inputs([self.CALIBRATION_DATA_FILE],
                                 sw_config,
                                 allow_padding=False)
 
-    def _sorted_paths(self, file_format):
-        return sorted(glob.glob(os.path.join(self._data_dir, file_format.format("*"))))
-
     def num_test_shards(self):
         return len(self._sorted_paths(self.TEST_DATA_FILE_FORMAT))
 
@@ -0,0 +1,95 @@
+import json
+
+# Trace event phases, see the Chrome Trace Event Format specification
+PHASE_COMPLETE = "X"
+PHASE_METADATA = "M"
+
+
+class ChromeTraceWriter(object):
+    """
+    Writes events in the Chrome Trace Event JSON format to a file incrementally,
+    so a trace never has to be held in memory as a whole.
+
+    Tracks are chrome processes, created lazily the first time they are used
+    and displayed in creation order.
+    """
+
+    def __init__(self, f):
+        """
+        Params:
+            f: a file object opened for writing text
+        """
+        self._f = f
+        self._num_events = 0
+        self._track_pids = {}
+        self._closed = False
+
+        self._f.write("{\"traceEvents\":[")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _write_event(self, event):
+        if self._num_events:
+            self._f.write(",\n")
+        self._f.write(json.dumps(event, separators=(",", ":")))
+        self._num_events += 1
+
+    def get_pid(self, track_name):
+        """Returns the pid of the given track, creating the track if necessary."""
+        if track_name not in self._track_pids:
+            pid = len(self._track_pids)
+            self._track_pids[track_name] = pid
+            self._write_event({
+                "name": "process_name",
+                "ph": PHASE_METADATA,
+                "pid": pid,
+                "args": {
+                    "name": track_name
+                }
+            })
+            self._write_event({
+                "name": "process_sort_index",
+                "ph": PHASE_METADATA,
+                "pid": pid,
+                "args": {
+                    "sort_index": pid
+                }
+            })
+
+        return self._track_pids[track_name]
+
+    def add_track(self, track_name):
+        """Creates an empty track so tracks are displayed in a fixed order."""
+        self.get_pid(track_name)
+
+    def add_region(self, track_name, name, start, duration, category="Op", args=None):
+        """
+        Adds a complete event to the given track
+
+        Params:
+            track_name: name of the track for the event
+            name: name of the event
+            start: start timestamp of the event in micros
+            duration: duration of the event in micros
+            category: category of the event
+            args: optional dictionary of extra information about the event
+        """
+        self._write_event({
+            "ph": PHASE_COMPLETE,
+            "cat": category,
+            "name": name,
+            "pid": self.get_pid(track_name),
+            "tid": 0,
+            "ts": start,
+            "dur": duration,
+            "args": args or {},
+        })
+
+    def close(self):
+        if not self._closed:
+            self._f.write("]}\n")
+            self._closed = True
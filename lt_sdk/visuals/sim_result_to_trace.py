@@ -1,14 +1,9 @@
 import argparse
 import os
 
-from tensorflow.core.framework import step_stats_pb2
-from tensorflow.python.client import timeline
-
 from lt_sdk.proto import inference_pb2, lgf_pb2, performance_data_pb2
 from lt_sdk.proto.configs import generate_hw_specs, generate_sim_params, utils
-
-# timeline label is: name = op(arg, arg, ...)
-TIMELINE_LABEL_FORMAT = "{0} = {1}({2})"
+from lt_sdk.visuals import chrome_trace
 
 INSTRUCTION_TRACE = "instructions.trace"
 UMEM_TRACE = "umem.trace"
@@ -18,6 +13,13 @@ ITX = "ITX"
 DRAM = "DRAM"
 IO_PORT = "IO PORT"
 
+OPU_INSTRUCTIONS = "INSTRUCTIONS - OPU"
+CPU_INSTRUCTIONS = "INSTRUCTIONS - CPU"
+UARCH_PREFIX = "UARCH - "
+
+# Track names match the ones from the tensorflow timeline we used to generate
+TRACK_FORMAT = "{0} Compute"
+
 
 def get_instr_name(opu_inst):
     return opu_inst.node.WhichOneof("node")
@@ -27,118 +29,156 @@ def clocks_to_nanos(clks, sim_params):
     return int(1e3 * clks / (sim_params.arch_params.clock_frequency))
 
 
-def _add_uarch_nodes(sim_params, devices, inst, op_name):
-    for unit in inst.unit_name:
-        dev = devices[unit]
-        node = dev.node_stats.add()
+def _get_track_name(device):
+    return TRACK_FORMAT.format(device)
 
-        node.node_name = "[{0}] - {1}".format(inst.pc, op_name)
-        node.timeline_label = TIMELINE_LABEL_FORMAT.format(node.node_name, op_name, "")
-        node.all_start_micros = clocks_to_nanos(inst.start_clk, sim_params)
-        node.all_end_rel_micros = clocks_to_nanos(inst.duration_clks, sim_params)
 
+def _get_resource_device(name, channel):
+    return "{} {}".format(name, channel)
 
-def _add_resource_nodes(sim_params, resources, inst, units_used):
-    for name, units in units_used.items():
-        for channel in units:
-            dev = resources[name][channel]
-            node = dev.node_stats.add()
 
-            node.node_name = "[{0}] - {1}".format(inst.pc, "USED")
-            node.timeline_label = TIMELINE_LABEL_FORMAT.format(
-                node.node_name,
-                "USED",
-                "")
-            node.all_start_micros = clocks_to_nanos(inst.start_clk, sim_params)
-            node.all_end_rel_micros = clocks_to_nanos(inst.duration_clks, sim_params)
+def _add_region(writer, device, node_name, op_name, inputs, inst, sim_params):
+    args = {"name": node_name, "op": op_name}
+    for i, inp in enumerate(inputs):
+        args["input{}".format(i)] = inp
+
+    writer.add_region(_get_track_name(device),
+                      op_name,
+                      clocks_to_nanos(inst.start_clk,
+                                      sim_params),
+                      clocks_to_nanos(inst.duration_clks,
+                                      sim_params),
+                      args=args)
 
 
-def _create_resources(step_stats, num_units_map):
-    resources = {}
+def _add_uarch_nodes(writer, sim_params, inst, op_name, units):
+    for unit in inst.unit_name:
+        if units is None or unit in units:
+            _add_region(writer,
+                        UARCH_PREFIX + unit,
+                        "[{0}] - {1}".format(inst.pc,
+                                             op_name),
+                        op_name,
+                        [],
+                        inst,
+                        sim_params)
+
+
+def _add_resource_nodes(writer, sim_params, inst, units_used):
+    for name, units in units_used.items():
+        for channel in units:
+            _add_region(writer,
+                        _get_resource_device(name,
+                                             channel),
+                        "[{0}] - {1}".format(inst.pc,
+                                             "USED"),
+                        "USED",
+                        [],
+                        inst,
+                        sim_params)
+
+
+def _create_resources(writer, num_units_map):
     for name, num_units in num_units_map.items():
-        devices = resources.setdefault(name, [])
         for i in range(num_units):
-            dev_stats = step_stats.dev_stats.add()
-            devices.append(dev_stats)
-            dev_stats.device = "{} {}".format(name, i)
-
-    return resources
-
-
-def instruction_trace(tracepath, sim_result, hw_specs, sim_params):
-    step_stats = step_stats_pb2.StepStats()
-    opu_dev_stats = step_stats.dev_stats.add()
-    opu_dev_stats.device = "INSTRUCTIONS - OPU"
-    cpu_dev_stats = step_stats.dev_stats.add()
-    cpu_dev_stats.device = "INSTRUCTIONS - CPU"
-
-    resources = _create_resources(
-        step_stats,
-        {
-            ITX: sim_params.arch_params.num_rings,
-            DRAM: sim_params.arch_params.num_memory_channels,
-            IO_PORT: sim_params.arch_params.num_io_ports,
-        })
-
-    uarch_devices = {}
+            writer.add_track(_get_track_name(_get_resource_device(name, i)))
+
+
+def _in_window(inst, start_clk, end_clk):
+    if start_clk is not None and inst.start_clk + inst.duration_clks < start_clk:
+        return False
+    if end_clk is not None and inst.start_clk > end_clk:
+        return False
+
+    return True
+
+
+def instruction_trace(tracepath,
+                      sim_result,
+                      hw_specs,
+                      sim_params,
+                      start_clk=None,
+                      end_clk=None,
+                      units=None):
+    """
+    Writes the instruction, uarch and resource tracks of sim_result to tracepath
+    in the chrome tracing format. Events are streamed to the file one instruction
+    at a time.
+
+    Params:
+        tracepath: path of the output trace file
+        sim_result: an inference_pb2.ExecutionStats() protobuf
+        hw_specs: a hw_spec_pb2.HardwareSpecs() protobuf
+        sim_params: a sim_params_pb2.SimulationParams() protobuf
+        start_clk: if provided, skip instructions that end before this clock
+        end_clk: if provided, skip instructions that start after this clock
+        units: if provided, a collection of unit names, only instructions that run
+            on at least one of these units are written and only these units get
+            uarch tracks
+    """
+    if units is not None:
+        units = set(units)
 
     pc_to_instr = {i.instruction.pc: i.instruction for i in sim_result.instructions}
 
-    for i, inst in enumerate(sim_result.instructions):
-        _add_resource_nodes(sim_params,
-                            resources,
-                            inst,
-                            {
-                                ITX: inst.interconnects,
-                                DRAM: inst.dram_channels,
-                                IO_PORT: inst.io_ports,
-                            })
-
-        if inst.pc not in pc_to_instr:
-            print(inst)
-            print(pc_to_instr)
-            raise ValueError("Something wrong: {0} {1} ".format(tracepath, inst))
-        name = get_instr_name(pc_to_instr[inst.pc])
-
-        node = opu_dev_stats.node_stats.add()
-        op_name = name
-
-        if pc_to_instr[inst.pc].node.HasField(lgf_pb2.LNF.bundle.DESCRIPTOR.name):
-            op_name += (" [" + ", ".join(
-                n.WhichOneof("node")
-                for n in pc_to_instr[inst.pc].node.bundle.subgraph.nodes) + "]")
-
-        for unit in inst.unit_name:
-            if unit not in uarch_devices:
-                instr_dev_stats = step_stats.dev_stats.add()
-                instr_dev_stats.device = "UARCH - " + unit
-                uarch_devices[unit] = instr_dev_stats
-        _add_uarch_nodes(sim_params, uarch_devices, inst, name)
-
-        try:
-            tensor_name = pc_to_instr[inst.pc].tensor_name or pc_to_instr[
-                inst.pc].dest_addr[0].info.name
-        except IndexError:
-            tensor_name = "unknown"
-
-        dep_instr_names = []
-        for dep_pc_diff in pc_to_instr[inst.pc].dependent_pcs_distance:
-            dep_pc = inst.pc - dep_pc_diff
-            if dep_pc in pc_to_instr:
-                dep_instr_names.append(get_instr_name(pc_to_instr[dep_pc]))
-
-        node.node_name = "[{0}] - {1}".format(inst.pc, tensor_name)
-        node.timeline_label = TIMELINE_LABEL_FORMAT.format(node.node_name,
-                                                           op_name,
-                                                           ", ".join(dep_instr_names))
-        node.all_start_micros = clocks_to_nanos(inst.start_clk, sim_params)
-        node.all_end_rel_micros = clocks_to_nanos(inst.duration_clks, sim_params)
-
-    trace = timeline.Timeline(step_stats=step_stats)
-    with open(tracepath, "w") as f:
-        f.write(trace.generate_chrome_trace_format())
-
-    return trace
+    with open(tracepath, "w") as f, chrome_trace.ChromeTraceWriter(f) as writer:
+        writer.add_track(_get_track_name(OPU_INSTRUCTIONS))
+        writer.add_track(_get_track_name(CPU_INSTRUCTIONS))
+        _create_resources(
+            writer,
+            {
+                ITX: sim_params.arch_params.num_rings,
+                DRAM: sim_params.arch_params.num_memory_channels,
+                IO_PORT: sim_params.arch_params.num_io_ports,
+            })
+
+        for inst in sim_result.instructions:
+            if not _in_window(inst, start_clk, end_clk):
+                continue
+            if units is not None and not units.intersection(inst.unit_name):
+                continue
+
+            _add_resource_nodes(writer,
+                                sim_params,
+                                inst,
+                                {
+                                    ITX: inst.interconnects,
+                                    DRAM: inst.dram_channels,
+                                    IO_PORT: inst.io_ports,
+                                })
+
+            if inst.pc not in pc_to_instr:
+                raise ValueError("Something wrong: {0} {1} ".format(tracepath, inst))
+            name = get_instr_name(pc_to_instr[inst.pc])
+
+            op_name = name
+            if pc_to_instr[inst.pc].node.HasField(lgf_pb2.LNF.bundle.DESCRIPTOR.name):
+                op_name += (" [" + ", ".join(
+                    n.WhichOneof("node")
+                    for n in pc_to_instr[inst.pc].node.bundle.subgraph.nodes) + "]")
+
+            _add_uarch_nodes(writer, sim_params, inst, name, units)
+
+            try:
+                tensor_name = pc_to_instr[inst.pc].tensor_name or pc_to_instr[
+                    inst.pc].dest_addr[0].info.name
+            except IndexError:
+                tensor_name = "unknown"
+
+            dep_instr_names = []
+            for dep_pc_diff in pc_to_instr[inst.pc].dependent_pcs_distance:
+                dep_pc = inst.pc - dep_pc_diff
+                if dep_pc in pc_to_instr:
+                    dep_instr_names.append(get_instr_name(pc_to_instr[dep_pc]))
+
+            _add_region(writer,
+                        OPU_INSTRUCTIONS,
+                        "[{0}] - {1}".format(inst.pc,
+                                             tensor_name),
+                        op_name,
+                        dep_instr_names,
+                        inst,
+                        sim_params)
 
 
 def get_trace_file_name(user_path, tracedir):
@@ -175,7 +215,13 @@ def main(args):
     else:
         raise ValueError("Must specify either sim_result_path or perf_data_path")
 
-    instruction_trace(trace_path, sim_result, hw_specs, sim_params)
+    instruction_trace(trace_path,
+                      sim_result,
+                      hw_specs,
+                      sim_params,
+                      start_clk=args.start_clk,
+                      end_clk=args.end_clk,
+                      units=args.units)
 
 
 if __name__ == "__main__":
@@ -212,5 +258,20 @@ if __name__ == "__main__":
                         type=str,
                         help="Name of sim params that was run on.")
 
+    # Optional filters
+    parser.add_argument("--start_clk",
+                        default=None,
+                        type=int,
+                        help="Skip instructions that end before this clock.")
+    parser.add_argument("--end_clk",
+                        default=None,
+                        type=int,
+                        help="Skip instructions that start after this clock.")
+    parser.add_argument("--units",
+                        default=None,
+                        nargs="+",
+                        type=str,
+                        help="Only trace instructions that run on these units.")
+
     args = parser.parse_args()
     main(args)